@@ -1,13 +1,42 @@
-from typing import Generator
+from typing import Generator, Union
+from fastapi import Request
 from sql_model.model import SQLiteModel
+from sql_model.async_model import AsyncModel
+from sql_model.pool import ConnectionPool
+from sql_model.writer import WriteQueueModel
 
-def get_model() -> Generator[SQLiteModel, None, None]:
+# Методы, которые не изменяют данные и могут работать на соединении-читателе
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+def get_pool(request: Request) -> ConnectionPool:
+    """Returns the connection pool opened at application startup."""
+    return request.app.state.pool
+
+def get_model(request: Request) -> Generator[Union[SQLiteModel, WriteQueueModel], None, None]:
     """
-    Creates a new SQLiteModel instance for each request
-    and ensures the connection is closed after the request is processed.
+    Checks out a pooled model for the duration of the request.
+    Read-only requests get a SQLiteModel on a reader connection; everything else
+    gets a WriteQueueModel whose repository calls run on the single writer queue.
+    The connection is returned to the pool after the request is processed.
     """
-    model = SQLiteModel()
-    try:
+    pool = get_pool(request)
+    checkout = pool.reader if request.method in READ_METHODS else pool.writer
+    with checkout() as model:
         yield model
-    finally:
-        model.close()
+
+async def get_async_model(request: Request) -> AsyncModel:
+    """
+    Returns an awaitable facade of the model for async routes.
+    Reads run on the bounded DB thread pool, writes on the writer queue,
+    so the event loop is never blocked by sqlite3.
+    """
+    pool = get_pool(request)
+    return pool.async_model(write=request.method not in READ_METHODS)
+
+async def get_async_reader(request: Request) -> AsyncModel:
+    """
+    Returns the read-only awaitable facade whatever the HTTP method.
+    For POST endpoints that only query (a check with a request body),
+    so they run on reader connections instead of the writer queue.
+    """
+    return get_pool(request).async_model(write=False)
@@ -29,6 +29,21 @@ class ProductCreate(ProductBase):
 class ProductResponse(ProductBase):
     id: int
     materials: List[ProductIngredient] = []
+
+class ProductCost(BaseModel):
+    product_id: int
+    name: str
+    price: float
+    cost: float
+    margin: float
+
+class ProductionPlanItem(BaseModel):
+    product_id: int
+    quantity: float
+
+class ProductionPlan(BaseModel):
+    items: List[ProductionPlanItem]
+
 # --- Stock Models ---
 
 class StockItem(BaseModel):
@@ -37,6 +52,8 @@ class StockItem(BaseModel):
     category_id: int
     category_name: Optional[str] = None
     quantity: float
+    reserved: float = 0.0
+    available: Optional[float] = None
     unit_id: int
     unit_name: Optional[str] = None
 
@@ -62,6 +79,7 @@ class Sale(BaseModel):
     quantity: float
     discount: int
     date: str
+    net_amount: Optional[float] = None
 
 class SaleCreate(BaseModel):
     product_id: int
@@ -152,6 +170,19 @@ class OrderItemResponse(BaseModel):
     quantity: float
     price: float
 
+class OrderShortage(BaseModel):
+    name: str
+    required: float
+    available: float
+
+class StockAvailability(BaseModel):
+    stock_id: int
+    name: str
+    quantity: float
+    reserved: float
+    available: float
+    required: float
+
 class OrderResponse(BaseModel):
     id: int
     created_date: str
@@ -159,3 +190,48 @@ class OrderResponse(BaseModel):
     status: str
     additional_info: Optional[str]
     items: List[OrderItemResponse]
+    shortages: List[OrderShortage] = []
+
+class OrderBatchComplete(BaseModel):
+    order_ids: List[int]
+
+class OrderCompletionResult(BaseModel):
+    order_id: int
+    completed: bool
+    error: Optional[str] = None
+    shortages: List[OrderShortage] = []
+
+class ReportSeries(BaseModel):
+    key: Optional[int] = None
+    name: Optional[str] = None
+    values: List[float]
+
+class TimeseriesReport(BaseModel):
+    metric: str
+    bucket: str
+    group_by: Optional[str] = None
+    buckets: List[str]
+    series: List[ReportSeries]
+
+class PeriodSummary(BaseModel):
+    period: str
+    income: float
+    expenses: float
+    writeoff_losses: float
+    closed_at: str
+
+class PeriodClose(BaseModel):
+    period: str
+
+class ProfitAndLossPart(BaseModel):
+    income: float
+    expenses: float
+    writeoff_losses: float
+    profit: float
+
+class ProfitAndLoss(BaseModel):
+    closed_until: Optional[str] = None
+    open_from: Optional[str] = None
+    closed: ProfitAndLossPart
+    open: ProfitAndLossPart
+    total: ProfitAndLossPart
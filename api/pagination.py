@@ -0,0 +1,40 @@
+from typing import Optional
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from sql_model.pagination import DEFAULT_PAGE_SIZE
+
+# Response header carrying the cursor of the next page for JSON clients
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Description of the `limit` query parameter of the list endpoints
+LIMIT_DESCRIPTION = (
+    "Page size. JSON requests without `after` and `limit` return every row; "
+    f"HTML pages and requests with `after` default to {DEFAULT_PAGE_SIZE} rows."
+)
+
+
+def page_size(limit: Optional[int], after: Optional[str], html: bool) -> Optional[int]:
+    """
+    Page size of a list request. HTML pages scroll in pages of DEFAULT_PAGE_SIZE;
+    a JSON client that asks for neither `after` nor `limit` gets the full list (None).
+    """
+    if limit is None and (after or html):
+        return DEFAULT_PAGE_SIZE
+    return limit
+
+
+def next_page_url(request: Request, cursor: Optional[str]) -> Optional[str]:
+    """URL of the next page: the current query string with `after` set to the cursor."""
+    if not cursor:
+        return None
+    params = dict(request.query_params)
+    params["after"] = cursor
+    return f"{request.url.path}?{urlencode(params)}"
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]):
+    """Exposes the next page cursor in the response headers."""
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
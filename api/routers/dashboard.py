@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, Request
 from fastapi.templating import Jinja2Templates
-from api.dependencies import get_model
-from sql_model.model import SQLiteModel
+from api.dependencies import get_async_model
+from sql_model.async_model import AsyncModel
 from datetime import datetime, timedelta
 
+# Items with less stock than this are reported as running low
+LOW_STOCK_THRESHOLD = 10
+
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 templates = Jinja2Templates(directory="templates")
 
@@ -12,15 +15,14 @@ async def get_dashboard(request: Request):
     return templates.TemplateResponse(request, "dashboard/index.html", {})
 
 @router.get("/stats")
-async def get_dashboard_stats(request: Request, model: SQLiteModel = Depends(get_model)):
-    # Calculate daily revenue
+async def get_dashboard_stats(request: Request, model: AsyncModel = Depends(get_async_model)):
+    # Today's revenue from the daily sales summary
     today = datetime.now().strftime("%Y-%m-%d")
-    sales = model.sales().data()
-    daily_revenue = sum(s.price * s.quantity * (1 - s.discount / 100) for s in sales if s.date.startswith(today))
+    revenue = await model.sales().revenue_by_day(today, today)
+    daily_revenue = revenue.get(today, 0)
     
     # Low stock items
-    stock = model.stock().data()
-    low_stock_count = len([item for item in stock if item.quantity < 10])
+    low_stock_count = await model.stock().count_below(LOW_STOCK_THRESHOLD)
     
     # Just a placeholder for profit margin for now, or calculate if possible
     profit_margin = 0 # Need costs vs sales
@@ -32,19 +34,19 @@ async def get_dashboard_stats(request: Request, model: SQLiteModel = Depends(get
     })
 
 @router.get("/chart")
-async def get_dashboard_chart(request: Request, model: SQLiteModel = Depends(get_model)):
+async def get_dashboard_chart(request: Request, model: AsyncModel = Depends(get_async_model)):
     now = datetime.now()
-    sales = model.sales().data()
+    first_day = (now - timedelta(days=6)).strftime("%Y-%m-%d")
+    # Seven days of the daily sales summary, read by its (day, product) key
+    revenue = await model.sales().revenue_by_day(first_day, now.strftime("%Y-%m-%d"))
     
     weekly_sales = [0] * 7
-    weekday_names = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
+    weekday_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
     labels = []
     
     for i in range(7):
         date = now - timedelta(days=6-i)
-        date_str = date.strftime("%Y-%m-%d")
-        day_sales = sum(s.price * s.quantity * (1 - s.discount / 100) for s in sales if s.date.startswith(date_str))
-        weekly_sales[i] = day_sales
+        weekly_sales[i] = revenue.get(date.strftime("%Y-%m-%d"), 0)
         labels.append(weekday_names[date.weekday()])
 
     max_val = max(weekly_sales) if weekly_sales and max(weekly_sales) > 0 else 1
@@ -60,10 +62,9 @@ async def get_dashboard_chart(request: Request, model: SQLiteModel = Depends(get
     return templates.TemplateResponse(request, "dashboard/chart.html", {"chart_data": chart_data})
 
 @router.get("/recent-activity")
-async def get_recent_activity(request: Request, model: SQLiteModel = Depends(get_model)):
-    sales = model.sales().data()
-    # Sort by date descending and take top 5
-    recent_sales = sorted(sales, key=lambda x: x.date, reverse=True)[:5]
+async def get_recent_activity(request: Request, model: AsyncModel = Depends(get_async_model)):
+    # Newest five sales straight from the date index
+    recent_sales = await model.sales().data(limit=5)
     
     activities = []
     for s in recent_sales:
@@ -77,8 +78,8 @@ async def get_recent_activity(request: Request, model: SQLiteModel = Depends(get
     return templates.TemplateResponse(request, "dashboard/recent_activity.html", {"activities": activities})
 
 @router.get("/pending-orders")
-async def get_pending_orders(request: Request, model: SQLiteModel = Depends(get_model)):
-    orders = model.orders().get_pending()
+async def get_pending_orders(request: Request, model: AsyncModel = Depends(get_async_model)):
+    orders = await model.orders().get_pending()
     
     order_data = []
     for order in orders:
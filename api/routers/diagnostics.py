@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+from api.dependencies import get_pool
+from sql_model.pool import ConnectionPool
+
+router = APIRouter(prefix="/api/diagnostics", tags=["diagnostics"])
+
+@router.get("/pool")
+def get_pool_stats(pool: ConnectionPool = Depends(get_pool)):
+    return pool.stats()
+
+@router.get("/db")
+def get_db_settings(pool: ConnectionPool = Depends(get_pool)):
+    return pool.db_settings()
+
+@router.get("/writer")
+def get_writer_stats(pool: ConnectionPool = Depends(get_pool)):
+    return pool.write_executor().stats()
+
+@router.get("/reference-cache")
+def get_reference_cache_stats(pool: ConnectionPool = Depends(get_pool)):
+    return pool.reference_stats()
+
+@router.get("/recipe-cache")
+def get_recipe_cache_stats(pool: ConnectionPool = Depends(get_pool)):
+    return pool.recipe_stats()
+
+@router.get("/bom")
+def get_bom_stats(pool: ConnectionPool = Depends(get_pool)):
+    return pool.bom_stats()
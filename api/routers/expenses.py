@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Header, Query
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from api.dependencies import get_model
+from api.dependencies import get_model, get_async_model
 from api.models import (
     ExpenseType, ExpenseTypeCreate, 
     ExpenseCategoryCreate, ExpenseDocumentCreate, ExpenseDocumentResponse 
 )
 from sql_model.model import SQLiteModel
+from api.pagination import LIMIT_DESCRIPTION, next_page_url, page_size, set_next_cursor
+from sql_model.async_model import AsyncModel
+from sql_model.pagination import MAX_PAGE_SIZE, next_cursor
 
 router = APIRouter(prefix="/api/expenses", tags=["expenses"])
 templates = Jinja2Templates(directory="templates")
@@ -18,34 +21,39 @@ templates = Jinja2Templates(directory="templates")
 @router.get("/documents", response_model=List[ExpenseDocumentResponse])
 async def get_expense_documents(
     request: Request,
+    response: Response,
     search: Optional[str] = None,
+    after: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
     hx_request: Optional[str] = Header(None, alias="HX-Request"),
     hx_target: Optional[str] = Header(None, alias="HX-Target"),
     accept: Optional[str] = Header(None, alias="Accept"),
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
+    limit = page_size(limit, after, html=bool(hx_request or (accept and "text/html" in accept)))
     try:
-        docs = model.expense_documents().get_documents_with_details()
-        
-        # Filter if search
-        if search:
-            s = search.lower()
-            docs = [d for d in docs if (d.supplier_name and s in d.supplier_name.lower()) or (d.comment and s in d.comment.lower())]
+        # Search is part of the query, so every page holds `limit` matching documents
+        docs = await model.expense_documents().get_documents_with_details(after=after, limit=limit, search=search)
+        cursor = next_cursor(docs, limit, 'date')
 
         if hx_request or (accept and "text/html" in accept):
-            if hx_target == "expenses-table-body":
-                 return templates.TemplateResponse(request, "expenses/rows_only.html", {"documents": docs})
-            return templates.TemplateResponse(request, "expenses/list.html", {"documents": docs})
+            context = {"documents": docs, "next_url": next_page_url(request, cursor)}
+            if after or hx_target == "expenses-table-body":
+                 return templates.TemplateResponse(request, "expenses/rows_only.html", context)
+            return templates.TemplateResponse(request, "expenses/list.html", context)
 
+        set_next_cursor(response, cursor)
         return docs
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/documents/new", response_class=HTMLResponse)
-async def get_new_expense_document_form(request: Request, model: SQLiteModel = Depends(get_model)):
-    suppliers = model.suppliers().data()
-    categories = model.utils().get_expense_category_names()
-    types = model.expense_types().data()
+async def get_new_expense_document_form(request: Request, model: AsyncModel = Depends(get_async_model)):
+    suppliers = await model.suppliers().data()
+    categories = await model.utils().get_expense_category_names()
+    types = await model.expense_types().data()
     current_date = datetime.now().strftime("%Y-%m-%dT%H:%M")
     
     return templates.TemplateResponse(request, "expenses/document_form.html", {
@@ -57,14 +65,13 @@ async def get_new_expense_document_form(request: Request, model: SQLiteModel = D
     })
 
 @router.get("/documents/{id}", response_class=HTMLResponse)
-async def get_expense_document_details(id: int, request: Request, model: SQLiteModel = Depends(get_model)):
+async def get_expense_document_details(id: int, request: Request, model: AsyncModel = Depends(get_async_model)):
     """Display expense document details in read-only view"""
-    all_docs = model.expense_documents().get_documents_with_details()
-    doc = next((d for d in all_docs if d['id'] == id), None)
+    doc = await model.expense_documents().get_document(id)
     if not doc:
         return HTMLResponse("Document not found", status_code=404)
         
-    items = model.expense_documents().get_document_items(id)
+    items = await model.expense_documents().get_document_items(id)
 
     return templates.TemplateResponse(request, "expenses/document_detail.html", {
         "doc": doc, 
@@ -74,7 +81,7 @@ async def get_expense_document_details(id: int, request: Request, model: SQLiteM
 @router.post("/documents")
 async def create_expense_document(
     request: Request,
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         # JSON Support
@@ -88,7 +95,7 @@ async def create_expense_document(
                 total_amount += item.quantity * item.price_per_unit
                 items_data.append(item.dict())
             
-            doc_id = model.expense_documents().add(
+            doc_id = await model.expense_documents().add(
                 date=doc.date,
                 supplier_id=doc.supplier_id,
                 total_amount=total_amount,
@@ -137,7 +144,7 @@ async def create_expense_document(
                 "unit_id": int(item['unit_id'])
             })
             
-        doc_id = model.expense_documents().add(
+        doc_id = await model.expense_documents().add(
             date=date.replace("T", " "), # Fix format
             supplier_id=supplier_id,
             total_amount=total_amount,
@@ -146,13 +153,12 @@ async def create_expense_document(
         )
 
         # Return the new row
-        # We need the inserted doc object. 
-        # get_documents_with_details() fetches all. Inefficient but safe.
-        all_docs = model.expense_documents().get_documents_with_details()
-        new_doc = next((d for d in all_docs if d['id'] == doc_id), None)
+        new_doc = await model.expense_documents().get_document(doc_id)
         
         return templates.TemplateResponse(request, "expenses/document_row.html", {"doc": new_doc})
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -165,10 +171,10 @@ def get_expense_document_items(id: int, model: SQLiteModel = Depends(get_model))
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/documents/{id}")
-async def delete_expense_document(id: int, model: SQLiteModel = Depends(get_model)):
+async def delete_expense_document(id: int, model: AsyncModel = Depends(get_async_model)):
     """Delete expense document and rollback stock changes"""
     try:
-        model.expense_documents().delete(id)
+        await model.expense_documents().delete(id)
         # Return empty response - HTMX will remove the row
         return HTMLResponse(content="", status_code=200)
     except ValueError as e:
@@ -184,14 +190,14 @@ async def get_new_category_form(request: Request):
     return templates.TemplateResponse(request, "expenses/category_form.html", {})
 
 @router.get("/types/new", response_class=HTMLResponse)
-async def get_new_type_form(request: Request, model: SQLiteModel = Depends(get_model)):
-    categories = model.utils().get_expense_category_names()
+async def get_new_type_form(request: Request, model: AsyncModel = Depends(get_async_model)):
+    categories = await model.utils().get_expense_category_names()
     return templates.TemplateResponse(request, "expenses/type_form.html", {"categories": categories})
 
 @router.post("/categories")
 async def create_expense_category(
     request: Request,
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         if request.headers.get("content-type") == "application/json":
@@ -201,9 +207,7 @@ async def create_expense_category(
              form = await request.form()
              name = form.get("name")
 
-        cursor = model._conn.cursor()
-        cursor.execute("INSERT INTO expense_categories (name) VALUES (?)", (name,))
-        model._conn.commit()
+        await model.utils().add_expense_category(name)
         
         # If HTMX request, we might want to return something else or empty to close modal, 
         # but the template has hx-on::after-request handling.
@@ -214,13 +218,13 @@ async def create_expense_category(
 @router.post("/types")
 async def create_expense_type(
     request: Request,
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         if request.headers.get("content-type") == "application/json":
             data = await request.json()
             type_data = ExpenseTypeCreate(**data)
-            model.expense_types().add(
+            await model.expense_types().add(
                 name=type_data.name,
                 default_price=type_data.default_price,
                 category_name=type_data.category_name,
@@ -233,7 +237,7 @@ async def create_expense_type(
             category_name = form.get("category_name")
             stock = form.get("stock") == "true"
             
-            model.expense_types().add(
+            await model.expense_types().add(
                 name=name,
                 default_price=default_price,
                 category_name=category_name,
@@ -250,18 +254,18 @@ async def create_expense_type(
 async def get_expense_type_options(
     request: Request,
     category_filter: Optional[str] = None,
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     """Return HTML options for expense types, optionally filtered by category"""
     try:
-        data = model.expense_types().data()
+        data = await model.expense_types().data()
         utils = model.utils()
         
         # Filter by category if specified
         if category_filter:
             filtered_data = []
             for et in data:
-                cat_name = utils.get_expense_category_name_by_id(et.category_id)
+                cat_name = await utils.get_expense_category_name_by_id(et.category_id)
                 if cat_name == category_filter:
                     filtered_data.append(et)
             data = filtered_data
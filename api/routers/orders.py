@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Header
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Header, Query
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from typing import List, Optional
-from api.dependencies import get_model
-from api.models import OrderCreate, OrderResponse, OrderItemResponse
+from api.dependencies import get_model, get_async_model, get_async_reader
+from api.models import OrderCreate, OrderResponse, OrderItemResponse, OrderBatchComplete, OrderCompletionResult, StockAvailability
+from api.pagination import LIMIT_DESCRIPTION, next_page_url, page_size, set_next_cursor
 from sql_model.model import SQLiteModel
+from sql_model.async_model import AsyncModel
+from sql_model.pagination import MAX_PAGE_SIZE, next_cursor
 
 router = APIRouter(prefix="/api/orders", tags=["orders"])
 templates = Jinja2Templates(directory="templates")
@@ -12,33 +15,33 @@ templates = Jinja2Templates(directory="templates")
 @router.get("/", response_model=List[OrderResponse])
 def get_orders(
     request: Request,
+    response: Response,
     search: Optional[str] = None,
+    after: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
     hx_request: Optional[str] = Header(None, alias="HX-Request"),
     hx_target: Optional[str] = Header(None, alias="HX-Target"),
     accept: Optional[str] = Header(None, alias="Accept"),
     model: SQLiteModel = Depends(get_model)
 ):
+    limit = page_size(limit, after, html=bool(hx_request or (accept and "text/html" in accept)))
     try:
-        orders_data = model.orders().data()
-        
-        # Filter by search
-        if search:
-            s = search.lower()
-            orders_data = [o for o in orders_data if s in str(o.id) or (o.additional_info and s in o.additional_info.lower())]
+        # Search is part of the query, so every page holds `limit` matching orders
+        orders_data = model.orders().data(after=after, limit=limit, search=search)
+        cursor = next_cursor(orders_data, limit, ('status', 'created_date'))
 
-        orders_data.sort(key=lambda x: x.status, reverse=True)
-        
         if hx_request or (accept and "text/html" in accept):
-            if hx_target == "orders-table-body":
-                return templates.TemplateResponse(request, "orders/rows.html", {"orders": orders_data}) # This uses rows in a loop? No, list.html does.
+            next_url = next_page_url(request, cursor)
+            if after or hx_target == "orders-table-body":
+                return templates.TemplateResponse(request, "orders/rows.html", {"orders": orders_data, "next_url": next_url}) # This uses rows in a loop? No, list.html does.
                 # Actually, I should probably create orders/rows.html like I did for products.
             
             if not hx_request and accept and "text/html" in accept:
                 # Wrap in html for standard browser requests (full page)
-                content = templates.get_template("orders/list.html").render({"request": request, "orders": orders_data})
+                content = templates.get_template("orders/list.html").render({"request": request, "orders": orders_data, "next_url": next_url})
                 return HTMLResponse(f"<!DOCTYPE html><html><body>{content}</body></html>")
                 
-            return templates.TemplateResponse(request, "orders/list.html", {"orders": orders_data})
+            return templates.TemplateResponse(request, "orders/list.html", {"orders": orders_data, "next_url": next_url})
             
         # For JSON response, convert to dicts that match OrderResponse
         results = []
@@ -51,7 +54,10 @@ def get_orders(
                 "additional_info": order.additional_info,
                 "items": order.items
             })
+        set_next_cursor(response, cursor)
         return results
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -96,7 +102,7 @@ def get_order(order_id: int, model: SQLiteModel = Depends(get_model)):
 @router.post("/", response_model=OrderResponse)
 async def create_order(
     request: Request,
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         # JSON Support
@@ -116,7 +122,11 @@ async def create_order(
             additional_info = form.get("additional_info")
             complete_now = form.get("complete_now") == "true"
 
-        new_order = model.orders().add(
+        # Warn about ingredients already committed to other pending orders
+        availability = await model.orders().availability(items)
+        shortages = [line for line in availability if line["required"] > line["available"]]
+
+        new_order = await model.orders().add(
             items=items,
             completion_date=completion_date,
             additional_info=additional_info,
@@ -124,7 +134,7 @@ async def create_order(
         )
         
         # Get full order with items
-        full_order = model.orders().by_id(new_order.id)
+        full_order = await model.orders().by_id(new_order.id)
         
         if request.headers.get("HX-Request"):
              return templates.TemplateResponse(request, "orders/row.html", {"order": full_order})
@@ -135,24 +145,56 @@ async def create_order(
             "completion_date": full_order.completion_date,
             "status": full_order.status,
             "additional_info": full_order.additional_info,
-            "items": full_order.items
+            "items": full_order.items,
+            "shortages": shortages
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/availability", response_model=List[StockAvailability])
+async def check_availability(order_data: OrderCreate, model: AsyncModel = Depends(get_async_reader)):
+    """
+    Available-to-promise check for prospective order items: ingredient demand
+    against stock on hand minus reservations of pending orders.
+    Read-only, so it runs on a reader connection despite being a POST.
+    """
+    try:
+        items = [{"product_id": item.product_id, "quantity": item.quantity} for item in order_data.items]
+        return await model.orders().availability(items)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/complete", response_model=List[OrderCompletionResult])
+async def complete_orders(
+    batch: OrderBatchComplete,
+    model: AsyncModel = Depends(get_async_model)
+):
+    """
+    Complete a batch of orders in one transaction.
+    Orders that cannot be served report the error or the short ingredients.
+    """
+    try:
+        return await model.orders().complete_many(batch.order_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/{order_id}/complete")
 async def complete_order(
     request: Request,
     order_id: int, 
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
-        success = model.orders().complete(order_id)
+        success = await model.orders().complete(order_id)
         if success:
             if request.headers.get("HX-Request"):
-                order = model.orders().by_id(order_id)
+                order = await model.orders().by_id(order_id)
                 return templates.TemplateResponse(request, "orders/row.html", {"order": order})
             return {"message": f"Order {order_id} completed successfully"}
         else:
@@ -182,10 +224,10 @@ def get_order_info(request: Request, order_id: int, model: SQLiteModel = Depends
 async def delete_order(
     request: Request,
     order_id: int, 
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
-        success = model.orders().delete(order_id)
+        success = await model.orders().delete(order_id)
         if success:
             if request.headers.get("HX-Request"):
                 return HTMLResponse("")
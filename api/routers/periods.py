@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from api.dependencies import get_async_model
+from api.models import PeriodClose, PeriodSummary, ProfitAndLoss
+from sql_model.async_model import AsyncModel
+
+router = APIRouter(prefix="/api/periods", tags=["periods"])
+
+@router.get("/", response_model=List[PeriodSummary])
+async def get_periods(model: AsyncModel = Depends(get_async_model)):
+    return await model.periods().data()
+
+@router.post("/close", response_model=List[PeriodSummary], status_code=201)
+async def close_period(body: PeriodClose, model: AsyncModel = Depends(get_async_model)):
+    """
+    Close a finished month (YYYY-MM) and every open month before it. Their income,
+    expenses and write-off losses are frozen, and back-dated sales, expenses and
+    write-offs in closed months are rejected from then on.
+    """
+    try:
+        return await model.periods().close(body.period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/{period}")
+async def reopen_period(period: str, model: AsyncModel = Depends(get_async_model)):
+    """Reopen a closed month and every month after it so that corrections can be made."""
+    try:
+        reopened = await model.periods().reopen(period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not reopened:
+        raise HTTPException(status_code=404, detail="Period is not closed")
+    return {"reopened": reopened}
+
+@router.get("/pnl", response_model=ProfitAndLoss)
+async def get_profit_and_loss(model: AsyncModel = Depends(get_async_model)):
+    """All-time profit and loss: closed-month snapshots plus a live query over the open period."""
+    return await model.periods().profit_and_loss()
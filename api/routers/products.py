@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from typing import List, Optional
-from api.dependencies import get_model
-from api.models import ProductCreate, ProductResponse
+from api.dependencies import get_model, get_async_model
+from api.models import ProductCreate, ProductResponse, ProductCost, ProductionPlan, StockAvailability
 from sql_model.model import SQLiteModel
+from sql_model.async_model import AsyncModel
 
 router = APIRouter(prefix="/api/products", tags=["products"])
 templates = Jinja2Templates(directory="templates")
@@ -16,10 +17,10 @@ async def get_products(
     hx_request: Optional[str] = Header(None, alias="HX-Request"),
     hx_target: Optional[str] = Header(None, alias="HX-Target"),
     accept: Optional[str] = Header(None, alias="Accept"),
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
-        products_data = model.products().data()
+        products_data = await model.products().data()
         
         # Filter if search is present
         if search:
@@ -56,9 +57,27 @@ async def get_products(
 async def get_new_product_form(request: Request):
     return templates.TemplateResponse(request, "products/form.html", {"product": None})
 
+@router.get("/costs", response_model=List[ProductCost])
+def get_product_costs(model: SQLiteModel = Depends(get_model)):
+    """Unit cost and margin of every product from its recipe."""
+    try:
+        return model.products().costs()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/plan", response_model=List[StockAvailability])
+def plan_production(plan: ProductionPlan, model: SQLiteModel = Depends(get_model)):
+    """Ingredient demand of a production batch against available stock."""
+    try:
+        return model.products().plan([item.dict() for item in plan.items])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{product_id}/edit", response_class=HTMLResponse)
-async def get_edit_product_form(product_id: int, request: Request, model: SQLiteModel = Depends(get_model)):
-    p = model.products().by_id(product_id)
+async def get_edit_product_form(product_id: int, request: Request, model: AsyncModel = Depends(get_async_model)):
+    p = await model.products().by_id(product_id)
     if not p:
         return HTMLResponse("Product not found", status_code=404)
     return templates.TemplateResponse(request, "products/form.html", {"product": p})
@@ -66,7 +85,7 @@ async def get_edit_product_form(product_id: int, request: Request, model: SQLite
 @router.post("/", response_model=ProductResponse)
 async def create_product(
     request: Request,
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         # Check for JSON content type (Legacy SPA support)
@@ -74,8 +93,8 @@ async def create_product(
             data = await request.json()
             product = ProductCreate(**data)
             materials_list = [i.dict() for i in product.materials]
-            new_product = model.products().add(product.name, product.price, materials_list)
-            materials = model.products().get_materials_for_product(new_product.id)
+            new_product = await model.products().add(product.name, product.price, materials_list)
+            materials = await model.products().get_materials_for_product(new_product.id)
             return {
                 "id": new_product.id,
                 "name": new_product.name,
@@ -112,8 +131,8 @@ async def create_product(
                     "quantity": float(m['quantity'])
                 })
         
-        new_product = model.products().add(name, price, materials_list)
-        materials = model.products().get_materials_for_product(new_product.id)
+        new_product = await model.products().add(name, price, materials_list)
+        materials = await model.products().get_materials_for_product(new_product.id)
         
         product_dict = {
             "id": new_product.id,
@@ -150,7 +169,7 @@ def get_product(product_id: int, model: SQLiteModel = Depends(get_model)):
 async def update_product(
     product_id: int, 
     request: Request, 
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         # Check for JSON content type (Legacy SPA support)
@@ -158,8 +177,8 @@ async def update_product(
             data = await request.json()
             product = ProductCreate(**data)
             materials_list = [i.dict() for i in product.materials]
-            updated = model.products().update(product_id, product.name, product.price, materials_list)
-            materials = model.products().get_materials_for_product(updated.id)
+            updated = await model.products().update(product_id, product.name, product.price, materials_list)
+            materials = await model.products().get_materials_for_product(updated.id)
             return {"id": updated.id, "name": updated.name, "price": updated.price, "materials": materials}
 
         # HTMX Form Data
@@ -194,10 +213,10 @@ async def update_product(
                     })
             else:
                 # If nothing provided in form, keep existing
-                materials_list = model.products().get_materials_for_product(product_id)
+                materials_list = await model.products().get_materials_for_product(product_id)
 
-        updated = model.products().update(product_id, name, price, materials_list)
-        materials = model.products().get_materials_for_product(updated.id)
+        updated = await model.products().update(product_id, name, price, materials_list)
+        materials = await model.products().get_materials_for_product(updated.id)
         
         product_dict = {
             "id": updated.id,
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from api.dependencies import get_async_model
+from api.models import TimeseriesReport
+from sql_model.async_model import AsyncModel
+
+router = APIRouter(prefix="/api/reports", tags=["reports"])
+
+@router.get("/timeseries", response_model=TimeseriesReport)
+async def get_timeseries(
+    metric: str = Query("revenue"),
+    bucket: str = Query("day"),
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    group_by: Optional[str] = Query(None),
+    model: AsyncModel = Depends(get_async_model)
+):
+    """
+    Revenue or expenses per day, week (starting Monday) or month, optionally split
+    by product (revenue) or by expense category or supplier (expenses).
+    The response is columnar: `buckets` holds the period starts and every series
+    has one value per bucket. Periods without data are left out.
+    """
+    try:
+        return await model.reports().timeseries(
+            metric=metric, bucket=bucket, date_from=date_from, date_to=date_to, group_by=group_by
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
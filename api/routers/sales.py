@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Header, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Header, Query
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from typing import List, Optional
-from api.dependencies import get_model
+from api.dependencies import get_async_model
 from api.models import Sale, SaleCreate
-from sql_model.model import SQLiteModel
+from api.pagination import LIMIT_DESCRIPTION, next_page_url, page_size, set_next_cursor
+from sql_model.async_model import AsyncModel
+from sql_model.pagination import MAX_PAGE_SIZE, next_cursor
 
 router = APIRouter(prefix="/api/sales", tags=["sales"])
 templates = Jinja2Templates(directory="templates")
@@ -12,35 +14,66 @@ templates = Jinja2Templates(directory="templates")
 @router.get("/", response_model=List[Sale])
 async def get_sales(
     request: Request,
+    response: Response,
     hx_request: Optional[str] = Header(None, alias="HX-Request"),
     hx_target: Optional[str] = Header(None, alias="HX-Target"),
     search: Optional[str] = Query(None),
-    model: SQLiteModel = Depends(get_model)
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    product_id: Optional[int] = Query(None),
+    order: str = Query("desc"),
+    after: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    model: AsyncModel = Depends(get_async_model)
 ):
+    limit = page_size(limit, after, html=bool(hx_request))
     try:
-        if search:
-            sales = model.sales().search(search)
+        if date_from or date_to or product_id is not None or order != "desc":
+            sales = await model.sales().query(
+                date_from=date_from, date_to=date_to, product_id=product_id,
+                product=search, order=order, limit=limit, after=after
+            )
+        elif search:
+            sales = await model.sales().search(search, after=after, limit=limit)
         else:
-            sales = model.sales().data()
+            sales = await model.sales().data(after=after, limit=limit)
+        cursor = next_cursor(sales, limit, 'date_ts')
         
         if hx_request:
-            if hx_target == "sales-table-body":
-                 return templates.TemplateResponse(request, "sales/rows_only.html", {"sales": sales})
-            return templates.TemplateResponse(request, "sales/list.html", {"sales": sales})
+            context = {"sales": sales, "next_url": next_page_url(request, cursor)}
+            if after or hx_target == "sales-table-body":
+                 return templates.TemplateResponse(request, "sales/rows_only.html", context)
+            return templates.TemplateResponse(request, "sales/list.html", context)
 
+        set_next_cursor(response, cursor)
         return sales
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/new", response_class=HTMLResponse)
-async def get_new_sale_form(request: Request, model: SQLiteModel = Depends(get_model)):
-    products = model.products().data()
+async def get_new_sale_form(request: Request, model: AsyncModel = Depends(get_async_model)):
+    products = await model.products().data()
     return templates.TemplateResponse(request, "sales/form.html", {"products": products})
 
+@router.post("/bulk", response_model=List[Sale], status_code=201)
+async def create_sales_bulk(lines: List[SaleCreate], model: AsyncModel = Depends(get_async_model)):
+    """
+    Record a batch of sales (a busy checkout or an offline terminal backlog) in one
+    round trip. Lines are validated against the catalog together, ingredients are
+    deducted once for the whole batch, and the created rows are returned in order.
+    Nothing is recorded if any line is invalid or any ingredient is short.
+    """
+    try:
+        return await model.sales().add_many([line.dict() for line in lines])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/")
 async def create_sale(
     request: Request,
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         # Check if it's a JSON request (backward compatibility) or Form request (HTMX)
@@ -55,14 +88,14 @@ async def create_sale(
             quantity = float(form.get("quantity"))
             discount = int(form.get("discount", 0))
 
-        product = model.products().by_id(product_id)
+        product = await model.products().by_id(product_id)
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
             
-        model.sales().add(product.name, product.price, quantity, discount)
-        
-        # Get the latest sale back for the row template
-        new_sale = model.sales().data()[0] 
+        # The created row comes back from INSERT ... RETURNING
+        new_sale, = await model.sales().add_many(
+            [{"product_id": product_id, "quantity": quantity, "discount": discount}]
+        )
         
         if request.headers.get("HX-Request"):
             return templates.TemplateResponse(request, "sales/row.html", {"sale": new_sale})
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Header, Query
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from typing import List, Optional
-from api.dependencies import get_model
+from api.dependencies import get_model, get_async_model
 from api.models import StockItem, StockCreate, StockUpdate, StockSet
 from sql_model.model import SQLiteModel
+from sql_model.async_model import AsyncModel
 
 router = APIRouter(prefix="/api/stock", tags=["stock"])
 templates = Jinja2Templates(directory="templates")
@@ -17,21 +18,14 @@ def get_categories(model: SQLiteModel = Depends(get_model)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/materials", response_model=List[StockItem])
-def get_materials(model: SQLiteModel = Depends(get_model)):
+def get_materials(
+    search: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    model: SQLiteModel = Depends(get_model)
+):
     try:
-        items = model.stock().data()
-        results = []
-        utils = model.utils()
-        for item in items:
-            cat_name = utils.get_stock_category_name_by_id(item.category_id)
-            unit_name = utils.get_unit_name_by_id(item.unit_id)
-
-            # Using dict mapping to fill Pydantic model
-            item_dict = item.__dict__.copy()
-            item_dict['category_name'] = cat_name
-            item_dict['unit_name'] = unit_name
-            results.append(item_dict)
-        return results
+        return model.stock().listing(search=search, category=category, limit=limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -39,64 +33,52 @@ def get_materials(model: SQLiteModel = Depends(get_model)):
 async def get_stock(
     request: Request,
     search: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
     hx_request: Optional[str] = Header(None, alias="HX-Request"),
     hx_target: Optional[str] = Header(None, alias="HX-Target"),
     accept: Optional[str] = Header(None, alias="Accept"),
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
-        items = model.stock().data()
-        results = []
-        
-        # Filter if search
-        if search:
-            s = search.lower()
-            items = [i for i in items if s in i.name.lower()]
-
-        utils = model.utils()
-        for item in items:
-            cat_name = utils.get_stock_category_name_by_id(item.category_id)
-            unit_name = utils.get_unit_name_by_id(item.unit_id)
-            
-            # Using dict mapping to fill Pydantic model
-            item_dict = item.__dict__.copy()
-            item_dict['category_name'] = cat_name
-            item_dict['unit_name'] = unit_name
-            results.append(item_dict)
+        results = await model.stock().listing(search=search, category=category, limit=limit)
             
         if hx_request or (accept and "text/html" in accept):
             if hx_target == "stock-table-body":
                  return templates.TemplateResponse(request, "stock/rows.html", {"stock": results})
+
+            categories = await model.utils().get_stock_category_names()
+            context = {"stock": results, "categories": categories}
             
             if not hx_request and accept and "text/html" in accept:
-                 content = templates.get_template("stock/list.html").render({"request": request, "stock": results})
+                 content = templates.get_template("stock/list.html").render({"request": request, **context})
                  return HTMLResponse(f"<!DOCTYPE html><html><body>{content}</body></html>")
 
-            return templates.TemplateResponse(request, "stock/list.html", {"stock": results})
+            return templates.TemplateResponse(request, "stock/list.html", context)
 
         return results
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/new", response_class=HTMLResponse)
-async def get_new_stock_form(request: Request, model: SQLiteModel = Depends(get_model)):
-    categories = model.utils().get_stock_category_names()
+async def get_new_stock_form(request: Request, model: AsyncModel = Depends(get_async_model)):
+    categories = await model.utils().get_stock_category_names()
     return templates.TemplateResponse(request, "stock/form.html", {"item": None, "categories": categories})
 
 @router.get("/{stock_id}/edit", response_class=HTMLResponse)
-async def get_edit_stock_form(stock_id: int, request: Request, model: SQLiteModel = Depends(get_model)):
-    p = model.stock().by_id(stock_id)
+async def get_edit_stock_form(stock_id: int, request: Request, model: AsyncModel = Depends(get_async_model)):
+    p = await model.stock().by_id(stock_id)
     if not p:
          return HTMLResponse("Stock item not found", status_code=404)
     
-    cat_name = model.utils().get_stock_category_name_by_id(p.category_id)
-    unit_name = model.utils().get_unit_name_by_id(p.unit_id)
+    cat_name = await model.utils().get_stock_category_name_by_id(p.category_id)
+    unit_name = await model.utils().get_unit_name_by_id(p.unit_id)
     
     item_dict = p.__dict__.copy()
     item_dict['category_name'] = cat_name
     item_dict['unit_name'] = unit_name
 
-    categories = model.utils().get_stock_category_names()
+    categories = await model.utils().get_stock_category_names()
 
     return templates.TemplateResponse(request, "stock/form.html", {"item": item_dict, "categories": categories})
 
@@ -125,15 +107,15 @@ def get_stock_id(stock_id: int, model: SQLiteModel = Depends(get_model)):
 @router.post("/", response_model=StockItem)
 async def add_stock(
     request: Request,
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         # JSON Support
         if request.headers.get("content-type") == "application/json":
             data = await request.json()
             item = StockCreate(**data)
-            model.stock().add(item.name, item.category_name, item.quantity, item.unit_name)
-            return model.stock().get(item.name)
+            await model.stock().add(item.name, item.category_name, item.quantity, item.unit_name)
+            return await model.stock().get(item.name)
 
         # Form Support
         form = await request.form()
@@ -142,8 +124,8 @@ async def add_stock(
         quantity = float(form.get("quantity"))
         unit_name = form.get("unit_name")
         
-        model.stock().add(name, category_name, quantity, unit_name)
-        new_item = model.stock().get(name)
+        await model.stock().add(name, category_name, quantity, unit_name)
+        new_item = await model.stock().get(name)
 
         # Enrich with names for template
         item_dict = new_item.__dict__.copy()
@@ -173,29 +155,29 @@ def update_stock_quantity(name: str, update: StockUpdate, model: SQLiteModel = D
 async def set_stock_quantity(
     name: str, 
     request: Request,
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         # JSON Support
         if request.headers.get("content-type") == "application/json":
             data = await request.json()
             update = StockSet(**data)
-            model.stock().set(name, update.quantity)
-            return model.stock().get(name)
+            await model.stock().set(name, update.quantity)
+            return await model.stock().get(name)
 
         # Form Support
         form = await request.form()
         quantity = float(form.get("quantity"))
         
-        model.stock().set(name, quantity)
-        updated = model.stock().get(name)
+        await model.stock().set(name, quantity)
+        updated = await model.stock().get(name)
         
         # We need category and unit names for the row template
         # Ideally repo.get() returns them or we fetch them
         # repo.get() returns StockItem Entity which has ids.
         
-        cat_name = model.utils().get_stock_category_name_by_id(updated.category_id)
-        unit_name = model.utils().get_unit_name_by_id(updated.unit_id)
+        cat_name = await model.utils().get_stock_category_name_by_id(updated.category_id)
+        unit_name = await model.utils().get_unit_name_by_id(updated.unit_id)
         
         item_dict = updated.__dict__.copy()
         item_dict['category_name'] = cat_name
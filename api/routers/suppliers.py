@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, Request, Header, Query
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from typing import List, Optional
-from api.dependencies import get_model
+from api.dependencies import get_model, get_async_model
 from api.models import Supplier
 from sql_model.model import SQLiteModel
+from sql_model.async_model import AsyncModel
 
 router = APIRouter(prefix="/api/suppliers", tags=["suppliers"])
 templates = Jinja2Templates(directory="templates")
@@ -15,13 +16,13 @@ async def get_suppliers(
     hx_request: Optional[str] = Header(None, alias="HX-Request"),
     hx_target: Optional[str] = Header(None, alias="HX-Target"),
     search: Optional[str] = Query(None),
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         if search:
-            suppliers = model.suppliers().search(search)
+            suppliers = await model.suppliers().search(search)
         else:
-            suppliers = model.suppliers().data()
+            suppliers = await model.suppliers().data()
         
         if hx_request:
             if hx_target == "suppliers-table-body":
@@ -37,8 +38,8 @@ async def get_new_supplier_form(request: Request):
     return templates.TemplateResponse(request, "suppliers/form.html", {"supplier": None})
 
 @router.get("/{supplier_id}/edit", response_class=HTMLResponse)
-async def get_edit_supplier_form(supplier_id: int, request: Request, model: SQLiteModel = Depends(get_model)):
-    supplier = model.suppliers().by_id(supplier_id)
+async def get_edit_supplier_form(supplier_id: int, request: Request, model: AsyncModel = Depends(get_async_model)):
+    supplier = await model.suppliers().by_id(supplier_id)
     if not supplier:
          return HTMLResponse("Supplier not found", status_code=404)
     return templates.TemplateResponse(request, "suppliers/form.html", {"supplier": supplier})
@@ -46,7 +47,7 @@ async def get_edit_supplier_form(supplier_id: int, request: Request, model: SQLi
 @router.post("/", response_model=Supplier)
 async def create_supplier(
     request: Request,
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         content_type = request.headers.get("content-type")
@@ -56,7 +57,7 @@ async def create_supplier(
             data = await request.json()
             # Валидируем данные вручную через Pydantic модель
             supplier_data = Supplier(**data) 
-            new_supplier = model.suppliers().add(
+            new_supplier = await model.suppliers().add(
                 supplier_data.name, 
                 supplier_data.contact_person, 
                 supplier_data.phone, 
@@ -67,7 +68,7 @@ async def create_supplier(
 
         # 2. Если пришла Форма (HTMX)
         form = await request.form()
-        new_supplier = model.suppliers().add(
+        new_supplier = await model.suppliers().add(
             name=form.get("name"),
             contact_person=form.get("contact_person"),
             phone=form.get("phone"),
@@ -92,7 +93,7 @@ async def create_supplier(
 async def update_supplier(
     supplier_id: int,
     request: Request,
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         form = await request.form()
@@ -102,7 +103,7 @@ async def update_supplier(
         email = form.get("email")
         address = form.get("address")
 
-        updated_supplier = model.suppliers().update(supplier_id, name, contact_person, phone, email, address)
+        updated_supplier = await model.suppliers().update(supplier_id, name, contact_person, phone, email, address)
         return templates.TemplateResponse(request, "suppliers/row.html", {"supplier": updated_supplier})
         
     except ValueError as e:
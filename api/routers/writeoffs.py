@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Header
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Header, Query
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from typing import List, Optional
 from pydantic import BaseModel
-from api.dependencies import get_model
-from sql_model.model import SQLiteModel
+from api.dependencies import get_async_model
+from api.pagination import LIMIT_DESCRIPTION, next_page_url, page_size, set_next_cursor
+from sql_model.async_model import AsyncModel
 from sql_model.entities import WriteOff
+from sql_model.pagination import MAX_PAGE_SIZE, next_cursor
 
 router = APIRouter(prefix="/api/writeoffs", tags=["writeoffs"])
 templates = Jinja2Templates(directory="templates")
@@ -21,6 +23,8 @@ class WriteOffRead(BaseModel):
     product_id: Optional[int] = None
     stock_item_id: Optional[int] = None
     item_name: Optional[str] = None # Added for UI convenience
+    item_type: Optional[str] = None
+    unit_name: Optional[str] = None
     quantity: float
     reason: str
     unit_id: Optional[int] = None
@@ -29,45 +33,46 @@ class WriteOffRead(BaseModel):
 @router.get("/", response_model=List[WriteOffRead])
 async def get_writeoffs(
     request: Request,
+    response: Response,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    reason: Optional[str] = Query(None),
+    after: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
     hx_request: Optional[str] = Header(None, alias="HX-Request"),
+    hx_target: Optional[str] = Header(None, alias="HX-Target"),
     accept: Optional[str] = Header(None, alias="Accept"),
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
+    limit = page_size(limit, after, html=bool(hx_request or (accept and "text/html" in accept)))
     try:
-        data = model.writeoffs().data()
-        results = []
-        for wo in data:
-            item_name = "Unknown"
-            if wo.product_id:
-                p = model.products().by_id(wo.product_id)
-                item_name = p.name if p else f"Product #{wo.product_id}"
-            elif wo.stock_item_id:
-                cursor = model._conn.cursor()
-                cursor.execute("SELECT name FROM stock WHERE id = ?", (wo.stock_item_id,))
-                row = cursor.fetchone()
-                if row:
-                    item_name = row[0]
-            
-            wo_dict = wo.__dict__.copy()
-            wo_dict['item_name'] = item_name
-            results.append(wo_dict)
+        results = await model.writeoffs().journal(
+            date_from=date_from, date_to=date_to, reason=reason, after=after, limit=limit
+        )
+        cursor = next_cursor(results, limit, 'date')
         
         if hx_request or (accept and "text/html" in accept):
-            return templates.TemplateResponse(request, "writeoffs/list.html", {"writeoffs": results})
+            context = {"writeoffs": results, "next_url": next_page_url(request, cursor)}
+            if after or hx_target == "writeoffs-table-body":
+                return templates.TemplateResponse(request, "writeoffs/rows_only.html", context)
+            return templates.TemplateResponse(request, "writeoffs/list.html", context)
             
+        set_next_cursor(response, cursor)
         return results
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/new", response_class=HTMLResponse)
-async def get_new_writeoff_form(request: Request, model: SQLiteModel = Depends(get_model)):
-    categories = model.utils().get_stock_category_names()
+async def get_new_writeoff_form(request: Request, model: AsyncModel = Depends(get_async_model)):
+    categories = await model.utils().get_stock_category_names()
     return templates.TemplateResponse(request, "writeoffs/form.html", {"categories": categories})
 
 @router.post("/", response_model=WriteOffRead)
 async def add_writeoff(
     request: Request,
-    model: SQLiteModel = Depends(get_model)
+    model: AsyncModel = Depends(get_async_model)
 ):
     try:
         # JSON Support
@@ -84,25 +89,20 @@ async def add_writeoff(
             quantity = float(form.get("quantity"))
             reason = form.get("reason")
 
-        model.writeoffs().add(
+        writeoff_id = await model.writeoffs().add(
             item_name=item_name,
             item_type=item_type,
             quantity=quantity,
             reason=reason
         )
         
-        # Get the latest record
-        all_wo = model.writeoffs().data()
-        latest = all_wo[0]
-        
-        # Enrich for template
-        latest_dict = latest.__dict__.copy()
-        latest_dict['item_name'] = item_name
+        # Read back just the inserted record, with names resolved, by primary key
+        created, = await model.writeoffs().journal(writeoff_id=writeoff_id)
         
         if request.headers.get("HX-Request"):
-            return templates.TemplateResponse(request, "writeoffs/row.html", {"wo": latest_dict})
+            return templates.TemplateResponse(request, "writeoffs/row.html", {"wo": created})
             
-        return latest_dict
+        return created
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
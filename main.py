@@ -1,11 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from api.routers import products, stock, sales, expenses, suppliers, writeoffs, orders, dashboard
+from api.routers import products, stock, sales, expenses, suppliers, writeoffs, orders, dashboard, diagnostics, reports, periods
+from sql_model.pool import ConnectionPool
 
 from fastapi.templating import Jinja2Templates
 
-app = FastAPI(title="Bakery Manager API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connections are opened and the schema is initialized once per process
+    app.state.pool = ConnectionPool()
+    app.state.pool.open()
+    try:
+        yield
+    finally:
+        app.state.pool.close()
+
+app = FastAPI(title="Bakery Manager API", lifespan=lifespan)
 
 templates = Jinja2Templates(directory="templates")
 
@@ -18,6 +30,9 @@ app.include_router(suppliers.router)
 app.include_router(writeoffs.router)
 app.include_router(orders.router)
 app.include_router(dashboard.router)
+app.include_router(diagnostics.router)
+app.include_router(reports.router)
+app.include_router(periods.router)
 
 # Mount Static Files
 app.mount("/static", StaticFiles(directory="static"), name="static")
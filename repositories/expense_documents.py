@@ -1,6 +1,8 @@
 import sqlite3
 from typing import List, Dict, Optional, Any
 from sql_model.entities import ExpenseDocument, ExpenseItem
+from sql_model.pagination import decode_cursor, keyset_condition
+from sql_model.reference import ReferenceSnapshot
 
 class ExpenseDocumentsRepository:
     def __init__(self, conn: sqlite3.Connection, model_instance: Any):
@@ -15,8 +17,13 @@ class ExpenseDocumentsRepository:
         Args:
             items: Список словарей [{'expense_type_id': int, 'quantity': float, 'price_per_unit': int, 'unit_id': int}]
         """
+        # Документ задним числом в закрытый месяц изменил бы его итоги
+        self._model.periods().ensure_open(date)
         cursor = self._conn.cursor()
-        try:
+        # Типы и категории расходов берутся из кэша справочников одним снимком на документ
+        reference = self._model.reference.snapshot()
+        # Документ, позиции и пополнение склада - одна единица работы
+        with self._conn.transaction():
              # 1. Создаем документ
              cursor.execute("""
                 INSERT INTO expense_documents (date, supplier_id, total_amount, comment) 
@@ -27,29 +34,25 @@ class ExpenseDocumentsRepository:
              
              # 2. Добавляем позиции
              for item in items:
-                 self._add_item(cursor, doc_id, item)
+                 self._add_item(cursor, doc_id, item, reference)
 
-             self._conn.commit()
-             return doc_id
-        except Exception as e:
-            self._conn.rollback()
-            raise e
+        return doc_id
 
-    def _add_item(self, cursor: sqlite3.Cursor, doc_id: int, item_data: Dict[str, Any]):
+    def _add_item(self, cursor: sqlite3.Cursor, doc_id: int, item_data: Dict[str, Any],
+                  reference: ReferenceSnapshot):
         exp_type_id = item_data['expense_type_id']
         quantity = item_data['quantity']
         price = item_data['price_per_unit']
         unit_id = item_data['unit_id']
         
         # Получаем информацию о типе расхода
-        cursor.execute("SELECT name, stock, category_id FROM expense_types WHERE id = ?", (exp_type_id,))
-        et_row = cursor.fetchone()
-        if not et_row:
+        expense_type = reference.expense_types.get(exp_type_id)
+        if not expense_type:
              raise ValueError(f"Expense Type ID {exp_type_id} not found")
         
-        et_name = et_row[0]
-        et_stock = bool(et_row[1]) if et_row[1] is not None else False
-        et_cat_id = et_row[2]
+        et_name = expense_type.name
+        et_stock = expense_type.stock
+        et_cat_id = expense_type.category_id
 
         stock_item_id = None
         
@@ -66,16 +69,12 @@ class ExpenseDocumentsRepository:
              else:
                  # Создаем новый товар на складе
                  # Пытаемся сопоставить категорию расхода с категорией склада по имени
-                 cursor.execute("SELECT name FROM expense_categories WHERE id = ?", (et_cat_id,))
-                 ec_name = cursor.fetchone()[0]
-                 
-                 cursor.execute("SELECT id FROM stock_categories WHERE name = ?", (ec_name,))
-                 sc_row = cursor.fetchone()
+                 ec_name = reference.expense_categories.names.get(et_cat_id)
                  
                  # Если категории совпадают (например 'Materials'), берем ID. 
                  # Если нет — берем первую попавшуюся (например Materials, id=1) или создаем ошибку?
                  # Для надежности используем ID=1 (Materials) как дефолт.
-                 sc_id = sc_row[0] if sc_row else 1 
+                 sc_id = reference.stock_categories.ids.get(ec_name, 1)
                  
                  cursor.execute("""
                     INSERT INTO stock (name, category_id, quantity, unit_id) 
@@ -92,29 +91,65 @@ class ExpenseDocumentsRepository:
             VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (doc_id, exp_type_id, stock_item_id, unit_id, quantity, price, total_price))
 
-    def get_documents_with_details(self) -> List[Dict[str, Any]]:
-        """Возвращает список документов с именем поставщика и количеством позиций."""
+    # Документ с именем поставщика и количеством позиций. Количество позиций
+    # считается подзапросом по индексу document_id, поэтому список идет по
+    # индексу даты без сортировки всей таблицы
+    _DOCUMENT_SELECT = """
+        SELECT d.id, d.date, d.total_amount, d.comment, s.name as supplier_name,
+               (SELECT COUNT(*) FROM expense_items i WHERE i.document_id = d.id) as items_count
+        FROM expense_documents d
+        LEFT JOIN suppliers s ON d.supplier_id = s.id
+    """
+
+    @staticmethod
+    def _document_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row[0],
+            "date": row[1],
+            "total_amount": row[2],
+            "comment": row[3],
+            "supplier_name": row[4],
+            "items_count": row[5]
+        }
+
+    def get_documents_with_details(self, after: Optional[str] = None, limit: Optional[int] = None,
+                                   search: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Возвращает список документов с именем поставщика и количеством позиций, сначала новые.
+
+        Args:
+            after: Курсор последнего документа предыдущей страницы.
+            limit: Размер страницы (None - все документы).
+            search: Часть имени поставщика или комментария (без учета регистра).
+                    Фильтр применяется в запросе, поэтому страница содержит
+                    limit подходящих документов, а курсор - последний из них.
+        """
+        sql = self._DOCUMENT_SELECT
+        conditions, params = [], []
+        if search:
+            conditions.append("(instr(casefold(s.name), ?) > 0 OR instr(casefold(d.comment), ?) > 0)")
+            params.extend([search.casefold()] * 2)
+        if after:
+            key, last_id = decode_cursor(after)
+            conditions.append(keyset_condition('d.date', id_column='d.id'))
+            params.extend([key, key, last_id])
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY d.date DESC, d.id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
         cursor = self._conn.cursor()
-        cursor.execute("""
-            SELECT d.id, d.date, d.total_amount, d.comment, s.name as supplier_name, COUNT(i.id) as items_count
-            FROM expense_documents d
-            LEFT JOIN suppliers s ON d.supplier_id = s.id
-            LEFT JOIN expense_items i ON d.id = i.document_id
-            GROUP BY d.id
-            ORDER BY d.date DESC
-        """)
-        rows = cursor.fetchall()
-        result = []
-        for row in rows:
-            result.append({
-                "id": row[0],
-                "date": row[1],
-                "total_amount": row[2],
-                "comment": row[3],
-                "supplier_name": row[4],
-                "items_count": row[5]
-            })
-        return result
+        cursor.execute(sql, params)
+        return [self._document_to_dict(row) for row in cursor.fetchall()]
+
+    def get_document(self, document_id: int) -> Optional[Dict[str, Any]]:
+        """Возвращает документ по ID (в том же виде, что и список) или None."""
+        cursor = self._conn.cursor()
+        cursor.execute(self._DOCUMENT_SELECT + " WHERE d.id = ?", (document_id,))
+        row = cursor.fetchone()
+        return self._document_to_dict(row) if row else None
 
     def get_document_items(self, document_id: int) -> List[Dict[str, Any]]:
         """Возвращает позиции конкретного документа."""
@@ -147,6 +182,10 @@ class ExpenseDocumentsRepository:
         """
         cursor = self._conn.cursor()
         try:
+            row = cursor.execute("SELECT date FROM expense_documents WHERE id = ?", (document_id,)).fetchone()
+            if row:
+                self._model.periods().ensure_open(row[0])
+
             # 1. Получаем все позиции документа с информацией о stock
             cursor.execute("""
                 SELECT i.id, i.quantity, i.stock_item_id, et.stock, et.name
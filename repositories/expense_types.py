@@ -1,14 +1,18 @@
 import sqlite3
+from dataclasses import replace
 from typing import Optional, List
 
 from sql_model.entities import ExpenseType
-from sql_model.database import get_expense_category_by_name
+from sql_model.connection import ManagedConnection
+from sql_model.reference import ReferenceCache, ReferenceData
 
 
 class ExpenseTypesRepository:
 
-    def __init__(self, conn: sqlite3.Connection):
-        self._conn = conn
+    def __init__(self, conn: sqlite3.Connection, reference: Optional[ReferenceData] = None):
+        # Отдельно созданный репозиторий получает обертку ради after_commit
+        self._conn = conn if isinstance(conn, ManagedConnection) else ManagedConnection(conn)
+        self._reference = reference or ReferenceData(ReferenceCache(), self._conn)
 
     # --- Вспомогательные методы ---
 
@@ -24,13 +28,18 @@ class ExpenseTypesRepository:
             stock=bool(row['stock']) if 'stock' in row.keys() else False
         )
 
+    @staticmethod
+    def _copy(expense_type: Optional[ExpenseType]) -> Optional[ExpenseType]:
+        """Копия объекта из кэша: объекты снимка общие для всех соединений процесса."""
+        return replace(expense_type) if expense_type else None
+
     # --- CRUD Методы ---
 
     def add(self, name: str, default_price: int, category_name: str, stock: bool = False):
         """Добавляет новый тип расхода."""
         cursor = self._conn.cursor()
         
-        category_id = get_expense_category_by_name(self._conn, category_name)
+        category_id = self._reference.snapshot().expense_categories.ids.get(category_name)
         if category_id is None:
             raise ValueError(f"Категория расходов '{category_name}' не найдена.")
         
@@ -43,6 +52,7 @@ class ExpenseTypesRepository:
                 (name, default_price, category_id, stock)
             )
             self._conn.commit()
+            self._conn.after_commit(self._reference.invalidate)
         except sqlite3.IntegrityError:
             self._conn.rollback()
             # Интегральность (UNIQUE) нарушена, тип расхода уже есть
@@ -53,11 +63,13 @@ class ExpenseTypesRepository:
 
 
     def get(self, name: str) -> Optional[ExpenseType]:
-        """Получает тип расхода по имени."""
-        cursor = self._conn.cursor()
-        cursor.execute("SELECT * FROM expense_types WHERE name = ?", (name,))
-        row = cursor.fetchone()
-        return self._row_to_entity(row)
+        """Получает тип расхода по имени (из кэша справочников)."""
+        snapshot = self._reference.snapshot()
+        return self._copy(snapshot.expense_types.get(snapshot.expense_type_ids.get(name)))
+
+    def by_id(self, type_id: int) -> Optional[ExpenseType]:
+        """Получает тип расхода по ID (из кэша справочников)."""
+        return self._copy(self._reference.snapshot().expense_types.get(type_id))
 
     def delete(self, name: str):
         """
@@ -71,6 +83,7 @@ class ExpenseTypesRepository:
         try:
             cursor.execute("DELETE FROM expense_types WHERE name = ?", (name,))
             self._conn.commit()
+            self._conn.after_commit(self._reference.invalidate)
         except Exception as e:
             self._conn.rollback()
             raise e
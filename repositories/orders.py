@@ -1,7 +1,15 @@
 import sqlite3
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from sql_model.entities import Order, OrderItem
+from sql_model.pagination import decode_cursor, keyset_condition, split_key
+from repositories.stock import DEMAND_PRECISION
+
+# Order of statuses in the order list: pending orders come first
+STATUS_ORDER = ('pending', 'completed')
+
+# Maximum number of bound ids in one IN (...) lookup
+IN_BATCH_SIZE = 500
 from types import SimpleNamespace
 
 class OrdersRepository:
@@ -33,31 +41,32 @@ class OrdersRepository:
             
         created_date = datetime.now().strftime("%Y-%m-%d %H:%M")
         
-        # Insert order
-        cursor.execute(
-            """
-            INSERT INTO orders (created_date, completion_date, status, additional_info)
-            VALUES (?, ?, ?, ?)
-            """,
-            (created_date, completion_date, status, additional_info)
-        )
-        order_id = cursor.lastrowid
-        
-        # Insert order items
-        for item in items:
-            product = self.model.products().by_id(item['product_id'])
-            if not product:
-                raise ValueError(f"Product with ID {item['product_id']} not found")
-            
+        # The order and its stock reservation are written together; entry
+        # touches only the products and stock items of this order
+        with self.conn.transaction():
+            # Insert order
             cursor.execute(
                 """
-                INSERT INTO order_items (order_id, product_id, product_name, quantity, price)
-                VALUES (?, ?, ?, ?, ?)
+                INSERT INTO orders (created_date, completion_date, status, additional_info)
+                VALUES (?, ?, ?, ?)
                 """,
-                (order_id, product.id, product.name, item['quantity'], product.price)
+                (created_date, completion_date, status, additional_info)
             )
-        
-        self.conn.commit()
+            order_id = cursor.lastrowid
+            
+            # Insert order items
+            basket = self._basket(items)
+            for recipe, quantity in basket:
+                cursor.execute(
+                    """
+                    INSERT INTO order_items (order_id, product_id, product_name, quantity, price)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (order_id, recipe.product_id, recipe.name, quantity, recipe.price)
+                )
+            
+            # Reserve ingredient demand for the pending order
+            self.model.stock().reserve(order_id, self._demand(basket))
         
         if complete_now:
             self.complete(order_id)
@@ -72,25 +81,85 @@ class OrdersRepository:
             additional_info=additional_info
         )
     
-    def data(self) -> List[SimpleNamespace]:
-        """Get all orders with their items."""
+    def data(self, after: Optional[str] = None, limit: Optional[int] = None,
+             search: Optional[str] = None) -> List[SimpleNamespace]:
+        """
+        Get orders with their items: pending orders first, then newest first.
+
+        Each status is read with its own range seek on (status, created_date),
+        and the items of the whole page are loaded with one query.
+
+        Args:
+            after: Cursor of the last order on the previous page
+                   (sort key is 'status|created_date')
+            limit: Page size (None returns all orders)
+            search: Part of the order id or of its additional info (case-insensitive).
+                    The filter is part of the query, so a page holds `limit`
+                    matching orders and the cursor points at the last of them.
+        """
+        statuses = list(STATUS_ORDER)
+        keyset = None
+        if after:
+            key, last_id = decode_cursor(after)
+            status, created_date = split_key(key, 2)
+            if status not in STATUS_ORDER:
+                raise ValueError(f"Invalid page cursor '{after}'")
+            statuses = statuses[STATUS_ORDER.index(status):]
+            keyset = (created_date, last_id)
+
         cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            SELECT id, created_date, completion_date, status, additional_info
-            FROM orders
-            ORDER BY created_date DESC
-            """
-        )
-        
-        orders = []
-        for row in cursor.fetchall():
-            order_dict = dict(row)
-            order_dict['items'] = self._get_order_items(order_dict['id'])
-            orders.append(SimpleNamespace(**order_dict))
-        
-        return orders
+        rows = []
+        for status in statuses:
+            sql = """
+                SELECT id, created_date, completion_date, status, additional_info
+                FROM orders
+                WHERE status = ?"""
+            params = [status]
+            if search:
+                sql += " AND (instr(CAST(id AS TEXT), ?) > 0 OR instr(casefold(additional_info), ?) > 0)"
+                params.extend([search, search.casefold()])
+            if keyset and status == statuses[0]:
+                sql += " AND " + keyset_condition('created_date')
+                params.extend([keyset[0], keyset[0], keyset[1]])
+            sql += " ORDER BY created_date DESC, id DESC"
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(limit - len(rows))
+
+            cursor.execute(sql, params)
+            rows.extend(cursor.fetchall())
+            if limit is not None and len(rows) >= limit:
+                break
+
+        return self._with_items(rows)
     
+    def availability(self, items: List[dict]) -> List[Dict[str, Any]]:
+        """
+        Check ingredient demand of prospective order items against available
+        stock (on hand minus reservations of other pending orders).
+
+        Args:
+            items: List of dicts with 'product_id' and 'quantity'
+
+        Returns:
+            One line per stock item: {'stock_id', 'name', 'quantity', 'reserved', 'available', 'required'}
+        """
+        return self.model.stock().availability(self._demand(self._basket(items)))
+
+    def _basket(self, items: List[dict]) -> List[tuple]:
+        """Resolve order items to (recipe, quantity) pairs via the recipe cache."""
+        basket = []
+        for item in items:
+            recipe = self.model.recipes.by_id(item['product_id'])
+            if not recipe:
+                raise ValueError(f"Product with ID {item['product_id']} not found")
+            basket.append((recipe, item['quantity']))
+        return basket
+
+    def _demand(self, basket: List[tuple]) -> Dict[int, float]:
+        """Ingredient demand of (recipe, quantity) pairs via the recipe matrix."""
+        return self.model.bom.demand((recipe.product_id, quantity) for recipe, quantity in basket)
+
     def get_pending(self) -> List[SimpleNamespace]:
         """Get all pending orders."""
         cursor = self.conn.cursor()
@@ -102,14 +171,7 @@ class OrdersRepository:
             ORDER BY completion_date ASC
             """
         )
-        
-        orders = []
-        for row in cursor.fetchall():
-            order_dict = dict(row)
-            order_dict['items'] = self._get_order_items(order_dict['id'])
-            orders.append(SimpleNamespace(**order_dict))
-        
-        return orders
+        return self._with_items(cursor.fetchall())
     
     def by_id(self, order_id: int) -> Optional[SimpleNamespace]:
         """Get order by ID with items."""
@@ -131,6 +193,28 @@ class OrdersRepository:
         order_dict['items'] = self._get_order_items(order_dict['id'])
         return SimpleNamespace(**order_dict)
     
+    def _with_items(self, rows: List[sqlite3.Row]) -> List[SimpleNamespace]:
+        """Attach items to a list of order rows, loading them in batched IN (...) queries."""
+        items = {row['id']: [] for row in rows}
+        order_ids = list(items)
+        cursor = self.conn.cursor()
+        for start in range(0, len(order_ids), IN_BATCH_SIZE):
+            batch = order_ids[start:start + IN_BATCH_SIZE]
+            cursor.execute(
+                f"""
+                SELECT id, order_id, product_id, product_name, quantity, price
+                FROM order_items
+                WHERE order_id IN ({', '.join('?' * len(batch))})
+                ORDER BY order_id, id
+                """,
+                batch
+            )
+            for item in cursor.fetchall():
+                item = dict(item)
+                items[item.pop('order_id')].append(item)
+
+        return [SimpleNamespace(**dict(row), items=items[row['id']]) for row in rows]
+
     def _get_order_items(self, order_id: int) -> List[dict]:
         """Get items for a specific order."""
         cursor = self.conn.cursor()
@@ -164,18 +248,13 @@ class OrdersRepository:
             raise ValueError(f"Order {order_id} is already completed")
         
         cursor = self.conn.cursor()
-        try:
-            # For each item in order:
-            # 1. Create sale record
-            # 2. Deduct ingredients from stock
-            for item in order.items:
-                # Create sale
-                self.model.sales().add(
-                    name=item['product_name'],
-                    price=item['price'],
-                    quantity=item['quantity'],
-                    discount=0
-                )
+        # The whole completion is one unit of work: every sale and stock
+        # deduction joins it, so it commits once or rolls back entirely
+        with self.conn.transaction():
+            # Sell the whole order as one basket at the order's prices:
+            # ingredient demand of all items is deducted in a single statement
+            self.model.sales().add_many(self._sale_lines(order))
+            self.model.stock().release([order_id])
             
             # Update order status
             completion_date = datetime.now().strftime("%Y-%m-%d %H:%M")
@@ -187,18 +266,138 @@ class OrdersRepository:
                 """,
                 (completion_date, order_id)
             )
-            
-            self.conn.commit()
-            return True
-        except Exception as e:
-            self.conn.rollback()
-            raise e
+        return True
     
+    def complete_many(self, order_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Complete a batch of orders in one transaction.
+
+        Ingredient demand of every order is summed and checked against stock
+        read once. Orders are served in the given sequence; an order whose
+        demand no longer fits the remaining stock is skipped and reports its
+        shortages. Sales, status changes and the aggregated stock deduction
+        of all served orders are written together with a single commit.
+
+        Args:
+            order_ids: IDs of the orders to complete
+
+        Returns:
+            One result per distinct order id, in request order:
+            {'order_id', 'completed', 'error', 'shortages': [{'name', 'required', 'available'}]}
+        """
+        results = {
+            order_id: {'order_id': order_id, 'completed': False, 'error': None, 'shortages': []}
+            for order_id in dict.fromkeys(order_ids)
+        }
+        if not results:
+            return []
+
+        with self.conn.transaction():
+            orders = {order.id: order for order in self._load_many(list(results))}
+
+            # 1. Resolve recipes (recipe cache) and the demand of each order
+            candidates = []
+            for order_id, result in results.items():
+                order = orders.get(order_id)
+                if not order:
+                    result['error'] = f"Order {order_id} not found"
+                elif order.status == 'completed':
+                    result['error'] = f"Order {order_id} is already completed"
+                else:
+                    basket, error = [], None
+                    for item in order.items:
+                        recipe = self.model.recipes.by_id(item['product_id'])
+                        if not recipe or recipe.empty:
+                            error = f"Product '{item['product_name']}' cannot be sold: no recipe"
+                            break
+                        basket.append((recipe, item['quantity']))
+                    if error:
+                        result['error'] = error
+                    else:
+                        candidates.append((order, self._demand(basket)))
+
+            # 2. Check availability once and allocate stock to orders in sequence
+            stock_ids = sorted({stock_id for _, demand in candidates for stock_id in demand})
+            available = self._stock_levels(stock_ids)
+            served = []
+            for order, demand in candidates:
+                short = [
+                    (stock_id, round(need, DEMAND_PRECISION))
+                    for stock_id, need in demand.items()
+                    if round(need, DEMAND_PRECISION) > available.get(stock_id, ('', 0.0))[1]
+                ]
+                if short:
+                    results[order.id]['shortages'] = [
+                        {'name': available.get(stock_id, (f"#{stock_id}", 0.0))[0], 'required': need,
+                         'available': available.get(stock_id, ('', 0.0))[1]}
+                        for stock_id, need in short
+                    ]
+                    continue
+                for stock_id, need in demand.items():
+                    name, quantity = available[stock_id]
+                    available[stock_id] = (name, quantity - need)
+                served.append(order)
+
+            # 3. Write sales (one aggregated deduction) and status changes
+            if served:
+                self.model.sales().add_many([line for order in served for line in self._sale_lines(order)])
+                completion_date = datetime.now().strftime("%Y-%m-%d %H:%M")
+                served_ids = [order.id for order in served]
+                self.model.stock().release(served_ids)
+                for start in range(0, len(served_ids), IN_BATCH_SIZE):
+                    batch = served_ids[start:start + IN_BATCH_SIZE]
+                    self.conn.execute(
+                        f"""
+                        UPDATE orders SET status = 'completed', completion_date = ?
+                        WHERE id IN ({', '.join('?' * len(batch))})
+                        """,
+                        [completion_date, *batch]
+                    )
+                for order_id in served_ids:
+                    results[order_id]['completed'] = True
+
+        return list(results.values())
+
+    @staticmethod
+    def _sale_lines(order: SimpleNamespace) -> List[dict]:
+        """Sale lines of an order at the prices fixed when it was placed."""
+        return [
+            {'product_id': item['product_id'], 'quantity': item['quantity'], 'discount': 0, 'price': item['price']}
+            for item in order.items
+        ]
+
+    def _load_many(self, order_ids: List[int]) -> List[SimpleNamespace]:
+        """Load orders with items by id using batched IN (...) queries."""
+        rows = []
+        for start in range(0, len(order_ids), IN_BATCH_SIZE):
+            batch = order_ids[start:start + IN_BATCH_SIZE]
+            rows.extend(self.conn.execute(
+                f"""
+                SELECT id, created_date, completion_date, status, additional_info
+                FROM orders
+                WHERE id IN ({', '.join('?' * len(batch))})
+                """,
+                batch
+            ).fetchall())
+        return self._with_items(rows)
+
+    def _stock_levels(self, stock_ids: List[int]) -> Dict[int, tuple]:
+        """Current (name, quantity) of the given stock items."""
+        levels = {}
+        for start in range(0, len(stock_ids), IN_BATCH_SIZE):
+            batch = stock_ids[start:start + IN_BATCH_SIZE]
+            for row in self.conn.execute(
+                f"SELECT id, name, quantity FROM stock WHERE id IN ({', '.join('?' * len(batch))})", batch
+            ):
+                levels[row[0]] = (row[1], row[2])
+        return levels
+
     def delete(self, order_id: int) -> bool:
-        """Delete an order."""
+        """Delete an order and release its stock reservation."""
         cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM orders WHERE id = ?", (order_id,))
-        self.conn.commit()
+        with self.conn.transaction():
+            self.model.stock().release([order_id])
+            cursor.execute("DELETE FROM orders WHERE id = ?", (order_id,))
         return cursor.rowcount > 0
     
     def update_status(self, order_id: int, status: str) -> bool:
@@ -206,14 +405,24 @@ class OrdersRepository:
         if status not in ['pending', 'completed']:
             raise ValueError("Status must be 'pending' or 'completed'")
         
+        order = self.by_id(order_id)
+        if not order:
+            return False
+
         cursor = self.conn.cursor()
-        cursor.execute(
-            """
-            UPDATE orders
-            SET status = ?
-            WHERE id = ?
-            """,
-            (status, order_id)
-        )
-        self.conn.commit()
+        with self.conn.transaction():
+            cursor.execute(
+                """
+                UPDATE orders
+                SET status = ?
+                WHERE id = ?
+                """,
+                (status, order_id)
+            )
+            # Keep the reservation in step with the status: only pending orders hold stock
+            if order.status == 'pending' and status == 'completed':
+                self.model.stock().release([order_id])
+            elif order.status == 'completed' and status == 'pending':
+                basket = self._basket(order.items)
+                self.model.stock().reserve(order_id, self._demand(basket))
         return cursor.rowcount > 0
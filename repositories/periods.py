@@ -0,0 +1,252 @@
+import re
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sql_model.entities import PeriodSummary
+
+_PERIOD = re.compile(r"^(\d{4})-(0[1-9]|1[0-2])$")
+
+
+class ClosedPeriodError(ValueError):
+    """Запись задним числом в закрытый месяц."""
+
+    def __init__(self, period: str):
+        self.period = period
+        super().__init__(f"Период {period} закрыт: изменения задним числом запрещены.")
+
+
+def next_period(period: str) -> str:
+    """Следующий месяц: '2026-12' -> '2027-01'."""
+    year, month = int(period[:4]), int(period[5:7])
+    return f"{year + month // 12:04d}-{month % 12 + 1:02d}"
+
+
+class PeriodsRepository:
+    """
+    Закрытие месяцев и отчет о прибылях и убытках.
+
+    Итоги закрытого месяца (выручка, расходы, потери от списаний) хранятся
+    в period_summary (миграция 10) и больше не пересчитываются. Закрытые
+    месяцы - непрерывный префикс истории, поэтому итоги за все время - сумма
+    снимков плюс запросы только по открытому периоду, начиная с первого
+    дня после последнего закрытого месяца.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, model_instance: Any):
+        self._conn = conn
+        self._model = model_instance # Ссылка на Model для доступа к ценам запасов и матрице рецептов
+
+    def _row_to_entity(self, row: sqlite3.Row) -> PeriodSummary:
+        return PeriodSummary(
+            period=row['period'],
+            income=row['income'],
+            expenses=row['expenses'],
+            writeoff_losses=row['writeoff_losses'],
+            closed_at=row['closed_at'],
+        )
+
+    # --- Закрытые периоды ---
+
+    def data(self) -> List[PeriodSummary]:
+        """Итоги закрытых месяцев по порядку."""
+        rows = self._conn.execute("SELECT * FROM period_summary ORDER BY period").fetchall()
+        return [self._row_to_entity(row) for row in rows]
+
+    def closed_until(self) -> Optional[str]:
+        """Последний закрытый месяц ('ГГГГ-ММ') или None."""
+        return self._conn.execute("SELECT MAX(period) FROM period_summary").fetchone()[0]
+
+    def open_from(self) -> Optional[str]:
+        """Первый день открытого периода ('ГГГГ-ММ-ДД') или None, если закрытых месяцев нет."""
+        closed = self.closed_until()
+        return f"{next_period(closed)}-01" if closed else None
+
+    def ensure_open(self, date: str):
+        """
+        Проверяет, что дата ('ГГГГ-ММ-ДД ...') относится к открытому периоду.
+
+        Raises:
+            ClosedPeriodError: Месяц даты закрыт.
+        """
+        closed = self.closed_until()
+        if closed and date[:7] <= closed:
+            raise ClosedPeriodError(date[:7])
+
+    def close(self, period: str) -> List[PeriodSummary]:
+        """
+        Закрывает месяц period ('ГГГГ-ММ') и все открытые месяцы до него.
+
+        Итоги каждого месяца считаются тремя GROUP BY по индексам дат и
+        записываются в period_summary в одной транзакции. После этого
+        триггеры запрещают изменения в закрытых месяцах.
+
+        Returns:
+            List[PeriodSummary]: Итоги закрытых этим вызовом месяцев.
+
+        Raises:
+            ValueError: Неверный формат, месяц еще не закончился или уже закрыт.
+        """
+        if not _PERIOD.match(period):
+            raise ValueError(f"Неверный период '{period}'. Ожидается ГГГГ-ММ.")
+        if period >= datetime.now().strftime("%Y-%m"):
+            raise ValueError(f"Период {period} еще не закончился.")
+        closed = self.closed_until()
+        if closed and period <= closed:
+            raise ValueError(f"Период {period} уже закрыт (закрыто по {closed}).")
+
+        first = next_period(closed) if closed else min(self._first_period() or period, period)
+        start, end = f"{first}-01", f"{next_period(period)}-01"
+        income = self._income(start, end)
+        expenses = self._expenses(start, end)
+        losses = self._losses(start, end)
+
+        closed_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+        summaries = []
+        month = first
+        while month <= period:
+            summaries.append(PeriodSummary(
+                period=month,
+                income=income.get(month, 0.0),
+                expenses=expenses.get(month, 0.0),
+                writeoff_losses=losses.get(month, 0.0),
+                closed_at=closed_at,
+            ))
+            month = next_period(month)
+
+        with self._conn.transaction():
+            self._conn.executemany(
+                """
+                INSERT INTO period_summary (period, income, expenses, writeoff_losses, closed_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [(s.period, s.income, s.expenses, s.writeoff_losses, s.closed_at) for s in summaries]
+            )
+        return summaries
+
+    def reopen(self, period: str) -> int:
+        """
+        Открывает месяц period и все месяцы после него (для исправлений).
+
+        Returns:
+            int: Число открытых месяцев (0, если period не был закрыт).
+        """
+        if not _PERIOD.match(period):
+            raise ValueError(f"Неверный период '{period}'. Ожидается ГГГГ-ММ.")
+        with self._conn.transaction():
+            cursor = self._conn.execute("DELETE FROM period_summary WHERE period >= ?", (period,))
+        return cursor.rowcount
+
+    # --- Прибыли и убытки ---
+
+    def income(self) -> float:
+        """Выручка за все время: снимки закрытых месяцев и открытый период."""
+        return self._closed_total('income') + sum(self._income(self.open_from()).values(), 0.0)
+
+    def expenses(self) -> float:
+        """Расходы за все время."""
+        return self._closed_total('expenses') + sum(self._expenses(self.open_from()).values(), 0.0)
+
+    def writeoff_losses(self) -> float:
+        """Потери от списаний за все время (по себестоимости)."""
+        return self._closed_total('writeoff_losses') + sum(self._losses(self.open_from()).values(), 0.0)
+
+    def profit_and_loss(self) -> Dict[str, Any]:
+        """
+        Отчет о прибылях и убытках: итоги закрытых месяцев, открытого периода и всего.
+        Прибыль - выручка минус расходы; потери от списаний показаны отдельно:
+        списанные запасы уже вошли в расходы при закупке.
+        """
+        open_from = self.open_from()
+        closed = self._conn.execute(
+            """
+            SELECT COALESCE(SUM(income), 0.0), COALESCE(SUM(expenses), 0.0), COALESCE(SUM(writeoff_losses), 0.0)
+            FROM period_summary
+            """
+        ).fetchone()
+        closed = dict(zip(('income', 'expenses', 'writeoff_losses'), closed))
+        live = {
+            'income': sum(self._income(open_from).values(), 0.0),
+            'expenses': sum(self._expenses(open_from).values(), 0.0),
+            'writeoff_losses': sum(self._losses(open_from).values(), 0.0),
+        }
+        total = {key: closed[key] + live[key] for key in closed}
+        for part in (closed, live, total):
+            part['profit'] = part['income'] - part['expenses']
+        return {'closed_until': self.closed_until(), 'open_from': open_from,
+                'closed': closed, 'open': live, 'total': total}
+
+    # --- Итоги по месяцам ---
+
+    def _closed_total(self, column: str) -> float:
+        return self._conn.execute(f"SELECT COALESCE(SUM({column}), 0.0) FROM period_summary").fetchone()[0]
+
+    def _first_period(self) -> Optional[str]:
+        """Самый ранний месяц с данными (минимумы по индексам дат)."""
+        row = self._conn.execute(
+            """
+            SELECT MIN(day) FROM (
+                SELECT MIN(day) AS day FROM daily_sales_summary
+                UNION ALL SELECT MIN(date) FROM expense_documents
+                UNION ALL SELECT MIN(date) FROM writeoffs
+            )
+            """
+        ).fetchone()
+        return row[0][:7] if row[0] else None
+
+    @staticmethod
+    def _range(column: str, start: Optional[str], end: Optional[str]) -> Tuple[str, List[str]]:
+        conditions, params = [], []
+        if start:
+            conditions.append(f"{column} >= ?")
+            params.append(start)
+        if end:
+            conditions.append(f"{column} < ?")
+            params.append(end)
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    def _income(self, start: Optional[str], end: Optional[str] = None) -> Dict[str, float]:
+        """Выручка по месяцам за [start, end) по дневной сводке продаж."""
+        where, params = self._range('day', start, end)
+        rows = self._conn.execute(
+            f"SELECT substr(day, 1, 7) AS period, SUM(revenue) FROM daily_sales_summary{where} GROUP BY period",
+            params
+        ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def _expenses(self, start: Optional[str], end: Optional[str] = None) -> Dict[str, float]:
+        """Расходы по месяцам за [start, end) по индексу даты документов."""
+        where, params = self._range('date', start, end)
+        rows = self._conn.execute(
+            f"SELECT substr(date, 1, 7) AS period, SUM(total_amount) FROM expense_documents{where} GROUP BY period",
+            params
+        ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def _losses(self, start: Optional[str], end: Optional[str] = None) -> Dict[str, float]:
+        """
+        Потери от списаний по месяцам за [start, end): запас - по цене запаса,
+        продукт - по себестоимости рецепта (текущим ценам на момент расчета).
+        """
+        where, params = self._range('date', start, end)
+        rows = self._conn.execute(
+            f"""
+            SELECT substr(date, 1, 7) AS period, product_id, stock_item_id, SUM(quantity) AS quantity
+            FROM writeoffs{where}
+            GROUP BY period, product_id, stock_item_id
+            """,
+            params
+        ).fetchall()
+        if not rows:
+            return {}
+
+        prices = self._model.products().stock_prices()
+        unit_costs = self._model.bom.cost(prices)
+        losses: Dict[str, float] = {}
+        for row in rows:
+            if row['product_id'] is not None:
+                price = unit_costs.get(row['product_id'], 0.0)
+            else:
+                price = prices.get(row['stock_item_id'], 0.0)
+            losses[row['period']] = losses.get(row['period'], 0.0) + price * row['quantity']
+        return losses
@@ -4,6 +4,7 @@ from types import SimpleNamespace
 
 
 from sql_model.entities import Product
+from sql_model.recipes import Recipe
 
 
 class ProductsRepository:
@@ -52,6 +53,52 @@ class ProductsRepository:
             result.append({'name': name, 'quantity': qty, 'unit': unit})
         return result
 
+    def recipe(self, name: str) -> Optional[Recipe]:
+        """
+        Возвращает продукт вместе с рецептом из кэша рецептов (None, если продукта нет).
+        Используется при продаже и списании, где рецепт нужен для каждой строки.
+        """
+        return self._model.recipes.get(name)
+
+    def plan(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        План производства: суммарная потребность партии продуктов в запасах
+        (через матрицу рецептов) и ее сравнение с доступным остатком.
+        items: [{'product_id': 1, 'quantity': 20}]
+        Возвращает строки StockRepository.availability.
+        """
+        for item in items:
+            if not self._model.recipes.by_id(item['product_id']):
+                raise ValueError(f"Продукт с id={item['product_id']} не найден.")
+        demand = self._model.bom.demand((item['product_id'], item['quantity']) for item in items)
+        return self._model.stock().availability(demand)
+
+    def costs(self) -> List[Dict[str, Any]]:
+        """
+        Себестоимость единицы каждого продукта по рецепту (через матрицу
+        рецептов). Цена запаса - цена по умолчанию вида расхода с тем же именем.
+        Возвращает [{'product_id', 'name', 'price', 'cost', 'margin'}] по id.
+        """
+        unit_costs = self._model.bom.cost(self.stock_prices())
+        result = []
+        for row in self._conn.execute("SELECT id, name, price FROM products ORDER BY id").fetchall():
+            cost = round(unit_costs.get(row['id'], 0.0), 2)
+            result.append({
+                'product_id': row['id'], 'name': row['name'], 'price': row['price'],
+                'cost': cost, 'margin': round(row['price'] - cost, 2),
+            })
+        return result
+
+    def stock_prices(self) -> Dict[int, float]:
+        """Цены единицы запасов {stock_id: цена}: цена по умолчанию вида расхода с тем же именем."""
+        snapshot = self._model.reference.snapshot()
+        prices = {}
+        for stock_id, name in self._conn.execute("SELECT id, name FROM stock").fetchall():
+            type_id = snapshot.expense_type_ids.get(name)
+            if type_id is not None:
+                prices[stock_id] = snapshot.expense_types[type_id].default_price
+        return prices
+
     # --- CRUD Методы ---
 
     def add(self, name: str, price: int, materials: List[Dict[str, Any]]):
@@ -106,6 +153,10 @@ class ProductsRepository:
                 )
 
             self._conn.commit()
+            # Строка продукта в общей матрице рецептов и кэш рецептов обновляются
+            # только по зафиксированным данным: откат не оставляет в них следов
+            self._conn.after_commit(lambda: self._model.bom.refresh([product_id]))
+            self._conn.after_commit(self._model.recipes.invalidate)
             
             # Возвращаем объект продукта (без списка материалов, т.к. он в отдельной таблице)
             return self.by_id(product_id) 
@@ -157,6 +208,8 @@ class ProductsRepository:
             cursor.execute("DELETE FROM products WHERE id = ?", (product.id,))
             
             conn.commit()
+            conn.after_commit(lambda: self._model.bom.refresh([product.id]))
+            conn.after_commit(self._model.recipes.invalidate)
             
         except sqlite3.Error as e:
             conn.rollback()
@@ -206,6 +259,8 @@ class ProductsRepository:
                 )
 
             self._conn.commit()
+            self._conn.after_commit(lambda: self._model.bom.refresh([product_id]))
+            self._conn.after_commit(self._model.recipes.invalidate)
             return self.by_id(product_id)
         except sqlite3.Error as e:
             self._conn.rollback()
@@ -216,23 +271,42 @@ class ProductsRepository:
 
     def data(self) -> List[Dict[str, SimpleNamespace]]:
         """
-        Возвращает список всех продуктов в виде словарей, 
-        включая их рецепты (для совместимости со старой моделью).
+        Возвращает каталог: все продукты вместе с рецептами.
+
+        Выполняет ровно два запроса независимо от числа продуктов: список
+        продуктов и все строки рецептов с названиями запасов и единицами.
+        Рецепты собираются по продуктам в памяти.
         """
         cursor = self._conn.cursor()
         cursor.execute("SELECT * FROM products")
-        products = []
+        product_rows = cursor.fetchall()
+
+        # Порядок (product_id, stock_id) совпадает с get_materials_for_product
+        # и идет по индексу первичного ключа product_stock без сортировки
+        cursor.execute(
+            """
+            SELECT pi.product_id, i.name AS material_name, pi.quantity AS qty, u.name AS unit_name
+            FROM product_stock pi
+            JOIN stock i ON pi.stock_id = i.id
+            LEFT JOIN units u ON i.unit_id = u.id
+            ORDER BY pi.product_id, pi.stock_id
+            """
+        )
+        recipes: Dict[int, List[Dict[str, Any]]] = {}
         for row in cursor.fetchall():
+            recipes.setdefault(row['product_id'], []).append(
+                {'name': row['material_name'], 'quantity': row['qty'], 'unit': row['unit_name']}
+            )
+
+        products = []
+        for row in product_rows:
             product = self._row_to_entity(row)
-            # Создаем словарь, чтобы добавить поле 'materials'
-            prod = SimpleNamespace()            
-            setattr(prod, "id", product.id)
-            setattr(prod, "name", product.name)
-            setattr(prod, "price", product.price)
-            setattr(prod, "materials", self.get_materials_for_product(product.id))            
-            
-            products.append(prod)
-            
+            products.append(SimpleNamespace(
+                id=product.id,
+                name=product.name,
+                price=product.price,
+                materials=recipes.get(product.id, [])
+            ))
         return products
     
     def has(self, name : str) -> bool:
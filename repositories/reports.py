@@ -0,0 +1,148 @@
+import sqlite3
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sql_model.dates import parse_date
+
+# Начало интервала для дня {day} ('ГГГГ-ММ-ДД'): неделя начинается в понедельник
+BUCKETS: Dict[str, str] = {
+    'day': "{day}",
+    'week': "date({day}, '-6 days', 'weekday 1')",
+    'month': "strftime('%Y-%m-01', {day})",
+}
+
+# Допустимые группировки для каждого показателя
+GROUPINGS: Dict[str, Tuple[Optional[str], ...]] = {
+    'revenue': (None, 'product'),
+    'expenses': (None, 'category', 'supplier'),
+}
+
+
+class ReportsRepository:
+    """
+    Отчеты по периодам: выручка и расходы по дням, неделям или месяцам.
+
+    Все суммы считаются в SQLite одним GROUP BY по индексированной дате:
+    выручка - по дневной сводке продаж (первичный ключ (day, product_id)),
+    расходы - по индексу даты документов расхода. Поэтому время отчета
+    зависит от числа дней в периоде, а не от числа продаж и документов.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def timeseries(self, metric: str = 'revenue', bucket: str = 'day',
+                   date_from: Optional[str] = None, date_to: Optional[str] = None,
+                   group_by: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Возвращает ряд в колоночном виде.
+
+        Args:
+            metric: 'revenue' (выручка с учетом скидок) или 'expenses' (расходы).
+            bucket: 'day', 'week' или 'month'.
+            date_from: Начало периода ('ГГГГ-ММ-ДД').
+            date_to: Конец периода включительно.
+            group_by: Для выручки - 'product', для расходов - 'category' или 'supplier'.
+
+        Returns:
+            {'metric', 'bucket', 'group_by', 'buckets': [начало интервала, ...],
+             'series': [{'key', 'name', 'values': [сумма по интервалам]}]}
+            Интервалы без данных не выводятся; values выровнены по buckets.
+
+        Raises:
+            ValueError: Неизвестный показатель, интервал, группировка или неверная дата.
+        """
+        if metric not in GROUPINGS:
+            raise ValueError(f"Неизвестный показатель '{metric}'. Доступны: {', '.join(GROUPINGS)}.")
+        if bucket not in BUCKETS:
+            raise ValueError(f"Неизвестный интервал '{bucket}'. Доступны: {', '.join(BUCKETS)}.")
+        if group_by not in GROUPINGS[metric]:
+            allowed = ', '.join(g for g in GROUPINGS[metric] if g)
+            raise ValueError(f"Группировка '{group_by}' недоступна для '{metric}'. Доступны: {allowed}.")
+
+        if metric == 'revenue':
+            rows = self._revenue(bucket, date_from, date_to, group_by)
+        else:
+            rows = self._expenses(bucket, date_from, date_to, group_by)
+        return self._columns(metric, bucket, group_by, rows)
+
+    def _revenue(self, bucket: str, date_from: Optional[str], date_to: Optional[str],
+                 group_by: Optional[str]) -> List[sqlite3.Row]:
+        period = BUCKETS[bucket].format(day='day')
+        conditions, params = self._period('day', date_from, date_to)
+        key, name = ("product_id", "MAX(product_name)") if group_by else ("NULL", "NULL")
+
+        sql = f"SELECT {period} AS bucket, {key} AS key, {name} AS name, SUM(revenue) AS amount FROM daily_sales_summary"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " GROUP BY bucket, key"
+        return self._conn.execute(sql, params).fetchall()
+
+    def _expenses(self, bucket: str, date_from: Optional[str], date_to: Optional[str],
+                  group_by: Optional[str]) -> List[sqlite3.Row]:
+        period = BUCKETS[bucket].format(day='date(d.date)')
+        conditions, params = self._period('d.date', date_from, date_to)
+
+        if group_by == 'category':
+            # Категория задается видом расхода каждой строки документа
+            sql = f"""
+                SELECT {period} AS bucket, et.category_id AS key, c.name AS name, SUM(i.total_price) AS amount
+                FROM expense_documents d
+                JOIN expense_items i ON i.document_id = d.id
+                JOIN expense_types et ON et.id = i.expense_type_id
+                LEFT JOIN expense_categories c ON c.id = et.category_id
+            """
+        elif group_by == 'supplier':
+            sql = f"""
+                SELECT {period} AS bucket, d.supplier_id AS key, s.name AS name, SUM(d.total_amount) AS amount
+                FROM expense_documents d
+                LEFT JOIN suppliers s ON s.id = d.supplier_id
+            """
+        else:
+            sql = f"""
+                SELECT {period} AS bucket, NULL AS key, NULL AS name, SUM(d.total_amount) AS amount
+                FROM expense_documents d
+            """
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " GROUP BY bucket, key"
+        return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _period(column: str, date_from: Optional[str], date_to: Optional[str]) -> Tuple[List[str], List[str]]:
+        """
+        Условия на текстовую колонку даты для периода с точностью до дня:
+        [первый день, день после последнего). Строка 'ГГГГ-ММ-ДД' не больше
+        любой даты этого дня, в том числе записанной без времени.
+        """
+        conditions, params = [], []
+        if date_from:
+            conditions.append(f"{column} >= ?")
+            params.append(parse_date(date_from)[0].strftime("%Y-%m-%d"))
+        if date_to:
+            conditions.append(f"{column} < ?")
+            params.append((parse_date(date_to)[0] + timedelta(days=1)).strftime("%Y-%m-%d"))
+        return conditions, params
+
+    @staticmethod
+    def _columns(metric: str, bucket: str, group_by: Optional[str], rows: List[sqlite3.Row]) -> Dict[str, Any]:
+        """Раскладывает строки (интервал, ключ, имя, сумма) по колонкам."""
+        # Сортируются уже сгруппированные интервалы, а не строки периода
+        buckets = sorted({row['bucket'] for row in rows})
+        positions = {bucket: position for position, bucket in enumerate(buckets)}
+
+        series: Dict[Any, Dict[str, Any]] = {}
+        for row in rows:
+            line = series.get(row['key'])
+            if line is None:
+                name = row['name'] if group_by else 'total'
+                line = series[row['key']] = {'key': row['key'], 'name': name, 'values': [0.0] * len(buckets)}
+            line['values'][positions[row['bucket']]] = row['amount']
+
+        return {
+            'metric': metric,
+            'bucket': bucket,
+            'group_by': group_by,
+            'buckets': buckets,
+            'series': sorted(series.values(), key=lambda line: (line['key'] is None, line['key'] or 0)),
+        }
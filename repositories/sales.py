@@ -1,12 +1,21 @@
 import sqlite3
-from typing import Optional, List, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 from sql_model.entities import Sale
+from sql_model.dates import DATE_FORMAT, to_epoch, date_range, parse_date, prefix_range
+from sql_model import rollup
+from sql_model.pagination import decode_cursor, keyset_condition
+from sql_model.recipes import Recipe
 from repositories.products import ProductsRepository
 from repositories.stock import StockRepository
 
 from datetime import datetime
 
+SALES_ORDERS = ('desc', 'asc')
+
+# Сколько продаж вставляется одной инструкцией INSERT ... RETURNING
+INSERT_BATCH_SIZE = 500
+
 class SalesRepository:
 
     def __init__(self, conn: sqlite3.Connection, model_instance: Any):
@@ -26,7 +35,9 @@ class SalesRepository:
             price=row['price'],
             quantity=row['quantity'],
             discount=row['discount'],
-            date=row['date']
+            date=row['date'],
+            date_ts=row['date_ts'],
+            net_amount=row['net_amount']
         )
 
     # --- CRUD/Логические Методы ---
@@ -35,74 +46,288 @@ class SalesRepository:
         """
         Регистрирует продажу и списывает необходимые ингредиенты со склада.
         """
+        self.add_basket([{'name': name, 'price': price, 'quantity': quantity, 'discount': discount}])
+
+    def add_basket(self, items: List[Dict[str, Any]]) -> List[Sale]:
+        """
+        Регистрирует продажи целой корзины (чека или заказа) одной единицей работы.
+
+        Потребность всех строк в ингредиентах суммируется и списывается одним
+        условным обновлением склада, поэтому число запросов к складу не зависит
+        от числа строк и ингредиентов.
+
+        Args:
+            items: [{'name': str, 'price': int, 'quantity': float, 'discount': int}]
+
+        Returns:
+            List[Sale]: Созданные продажи в порядке строк корзины.
+
+        Raises:
+            ValueError: Если продукт не найден или не имеет рецепта.
+            InsufficientStockError: Если не хватает ингредиентов (перечислены все).
+        """
+        # 1-2. Получаем продукты и их рецепты (из кэша рецептов, без запросов к БД)
+        lines = []
+        for item in items:
+            recipe = self._model.products().recipe(item['name'])
+            if not recipe:
+                raise ValueError(f"Продукт '{item['name']}' не найден.")
+            if recipe.empty:
+                raise ValueError(f"Продукт '{item['name']}' не имеет рецепта, продажа невозможна.")
+            lines.append((recipe, item['price'], item['quantity'], item.get('discount', 0)))
+        return self._insert(lines)
+
+    def add_many(self, items: List[Dict[str, Any]]) -> List[Sale]:
+        """
+        Регистрирует пачку продаж по ID продуктов (касса, выгрузка офлайн-терминала,
+        выполнение заказов). Без явной цены строки продается по текущей цене каталога.
+
+        Все строки проверяются по каталогу за один проход, и ошибки всех строк
+        возвращаются одним исключением; затем пачка проводится как одна корзина.
+
+        Args:
+            items: [{'product_id': int, 'quantity': float, 'discount': int, 'price': int (необязательно)}]
+
+        Returns:
+            List[Sale]: Созданные продажи в порядке строк.
+
+        Raises:
+            ValueError: Если есть строки с неизвестным продуктом, продуктом без
+                рецепта, неположительным количеством или отрицательной скидкой.
+            InsufficientStockError: Если не хватает ингредиентов (перечислены все).
+        """
+        lines, errors = [], []
+        for n, item in enumerate(items, start=1):
+            recipe = self._model.recipes.by_id(item['product_id'])
+            quantity, discount = item['quantity'], item.get('discount', 0)
+            if not recipe:
+                errors.append(f"строка {n}: продукт с id={item['product_id']} не найден")
+            elif recipe.empty:
+                errors.append(f"строка {n}: продукт '{recipe.name}' не имеет рецепта")
+            elif quantity <= 0:
+                errors.append(f"строка {n}: количество должно быть положительным")
+            elif discount < 0:
+                errors.append(f"строка {n}: скидка не может быть отрицательной")
+            else:
+                lines.append((recipe, item.get('price', recipe.price), quantity, discount))
+        if errors:
+            raise ValueError("Продажи не проведены: " + "; ".join(errors) + ".")
+        return self._insert(lines)
+
+    def _insert(self, lines: List[Tuple[Recipe, int, float, int]]) -> List[Sale]:
+        """
+        Списывает ингредиенты и записывает продажи (рецепт, цена, количество, скидка).
+        Списание и запись продаж - одна единица работы: один commit,
+        а при нехватке запаса откат целиком.
+        """
+        if not lines:
+            return []
+
+        with self._conn.transaction():
+            # 3. Списываем ингредиенты всей корзины со склада
+            self._model.stock().deduct(self._model.bom.demand((recipe.product_id, quantity) for recipe, _, quantity, _ in lines))
+
+            # 4. Записываем факты продажи: текстовая дата для отображения,
+            # date_ts - для индексированных фильтров и сортировки, net_amount -
+            # сумма с учетом скидки по общей формуле rollup.NET_AMOUNT.
+            # Многострочный INSERT ... RETURNING возвращает созданные строки
+            # без повторного чтения таблицы (executemany строки не возвращает).
+            now = datetime.now().replace(second=0, microsecond=0)
+            date, date_ts = now.strftime(DATE_FORMAT), to_epoch(now)
+            sales = []
+            for start in range(0, len(lines), INSERT_BATCH_SIZE):
+                chunk = lines[start:start + INSERT_BATCH_SIZE]
+                params = [
+                    value
+                    for recipe, price, quantity, discount in chunk
+                    for value in (recipe.product_id, recipe.name, price, quantity, discount, date, date_ts)
+                ]
+                rows = self._conn.execute(
+                    f"""
+                    WITH line(product_id, product_name, price, quantity, discount, date, date_ts) AS (
+                        VALUES {", ".join(["(?, ?, ?, ?, ?, ?, ?)"] * len(chunk))}
+                    )
+                    INSERT INTO sales (product_id, product_name, price, quantity, discount, date, date_ts, net_amount)
+                    SELECT line.*, {rollup.NET_AMOUNT.format(row='line')} FROM line
+                    RETURNING *
+                    """,
+                    params
+                ).fetchall()
+                # Порядок строк RETURNING не гарантирован; id растут в порядке вставки
+                sales.extend(self._row_to_entity(row) for row in sorted(rows, key=lambda row: row['id']))
+        return sales
+
+    def data(self, after: Optional[str] = None, limit: Optional[int] = None) -> List[Sale]:
+        """
+        Возвращает продажи, сначала новые.
+
+        Args:
+            after: Курсор последней строки предыдущей страницы.
+            limit: Размер страницы (None - все продажи).
+        """
+        return self._select(None, None, None, None, 'desc', limit, after)
+
+    def query(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+              product_id: Optional[int] = None, product: Optional[str] = None,
+              order: str = 'desc', limit: Optional[int] = None,
+              after: Optional[str] = None) -> List[Sale]:
+        """
+        Возвращает продажи за период с фильтром по продукту.
+
+        Args:
+            date_from: Начало периода ('ГГГГ-ММ-ДД' или 'ГГГГ-ММ-ДД ЧЧ:ММ').
+            date_to: Конец периода включительно (дата без времени - весь день).
+            product_id: ID продукта.
+            product: Часть названия продукта (текущего или сохраненного в продаже).
+            order: 'desc' - сначала новые, 'asc' - сначала старые.
+            limit: Максимальное число строк.
+            after: Курсор последней строки предыдущей страницы.
+
+        Raises:
+            ValueError: Неверная дата, курсор или порядок сортировки.
+        """
+        if order not in SALES_ORDERS:
+            raise ValueError(f"Неверный порядок сортировки '{order}'. Доступны: {', '.join(SALES_ORDERS)}.")
+        start, end = date_range(date_from, date_to)
+        return self._select(start, end, product_id, product, order, limit, after)
+
+    def search(self, query: str, after: Optional[str] = None, limit: Optional[int] = None) -> List[Sale]:
+        """
+        Поиск продаж по дате ('2026', '2026-01', '2026-01-15') или части названия продукта.
+        """
+        period = prefix_range(query)
+        if period:
+            return self._select(period[0], period[1], None, None, 'desc', limit, after)
+        return self._select(None, None, None, query, 'desc', limit, after)
+
+    def _select(self, start: Optional[int], end: Optional[int], product_id: Optional[int],
+                product: Optional[str], order: str, limit: Optional[int],
+                after: Optional[str] = None) -> List[Sale]:
+        """Выполняет выборку по полуинтервалу [start, end) колонки date_ts."""
+        conditions, params = [], []
+
+        if product:
+            # Продажа хранит название на момент продажи (product_name), которое
+            # и показывается в списке. Подстрока ищется в небольших таблицах
+            # текущих названий (products) и названий продаж (sale_product_names,
+            # миграция 11), а продажи выбираются по индексу (product_id, date_ts)
+            pattern = f"%{product}%"
+            current = [row[0] for row in self._conn.execute(
+                "SELECT id FROM products WHERE name LIKE ?", (pattern,)
+            )]
+            sold = [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT product_id FROM sale_product_names WHERE product_name LIKE ?", (pattern,)
+            )]
+            candidates = sorted(set(current) | set(sold))
+            if product_id is not None:
+                candidates = [i for i in candidates if i == product_id]
+            if not candidates:
+                return []
+            conditions.append(f"product_id IN ({', '.join('?' * len(candidates))})")
+            params.extend(candidates)
+            # Продажи под другим названием подходят, только если совпадает текущее
+            if set(sold) - set(current):
+                conditions.append(
+                    f"(product_id IN ({', '.join('?' * len(current))}) OR product_name LIKE ?)"
+                    if current else "product_name LIKE ?"
+                )
+                params.extend(current + [pattern])
+        elif product_id is not None:
+            conditions.append("product_id = ?")
+            params.append(product_id)
+
+        if start is not None:
+            conditions.append("date_ts >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("date_ts < ?")
+            params.append(end)
+        if after:
+            key, last_id = decode_cursor(after)
+            if not key.lstrip('-').isdigit():
+                raise ValueError(f"Неверный курсор страницы '{after}'.")
+            conditions.append(keyset_condition('date_ts', descending=order == 'desc'))
+            params.extend([int(key), int(key), last_id])
+
+        sql = "SELECT * FROM sales"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY date_ts {order.upper()}, id {order.upper()}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
         cursor = self._conn.cursor()
-        
-        # 1. Получаем продукт и его рецепт
-        product = self._model.products().by_name(name)
-        if not product:
-            raise ValueError(f"Продукт '{name}' не найден.")
-            
-        # 2. Получаем рецепт (словарь ингредиентов с количеством)
-        # Мы используем ProductsRepository.get_materials_for_product для получения рецепта
-        recipe = self._model.products().get_materials_for_product(product.id)
-        if not recipe:
-            raise ValueError(f"Продукт '{name}' не имеет рецепта, продажа невозможна.")
-
-        try:
-            # 3. Списываем ингредиенты со склада
-            stock_repo = self._model.stock()
-            
-            for item in recipe:
-                ing_name = item['name']
-                ing_quantity_needed = item['quantity'] * quantity # Общее количество на всю продажу
-                
-                # Обновляем запас (отрицательное изменение)
-                # StockRepository.update() содержит проверку на отрицательный остаток
-                stock_repo.update(ing_name, -ing_quantity_needed)
-
-            # 4. Записываем факт продажи
-            cursor.execute(
-                """
-                INSERT INTO sales (product_id, product_name, price, quantity, discount, date) 
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (product.id, name, price, quantity, discount, datetime.now().strftime("%Y-%m-%d %H:%M")) # Sale.date использует default_factory в dataclass
-            )
-            self._conn.commit()
-
-        except ValueError as e:
-            # Откат транзакции, если не хватило запасов (проверка в stock_repo.update)
-            self._conn.rollback()
-            raise e
-        except Exception as e:
-            self._conn.rollback()
-            raise e
-
-    def data(self) -> List[Sale]:
-        """Возвращает список всех продаж."""
-        cursor = self._conn.cursor()
-        cursor.execute("SELECT * FROM sales ORDER BY date DESC")
+        cursor.execute(sql, params)
         return [self._row_to_entity(row) for row in cursor.fetchall()]
     
-    def search(self, query: str) -> List[Sale]:
-        """Поиск продаж по названию продукта или дате."""
+    def revenue_by_day(self, date_from: str, date_to: str) -> Dict[str, float]:
+        """
+        Выручка по дням за период с учетом скидок (для дашборда).
+
+        Читает дневную сводку по диапазону ее первичного ключа (день, продукт),
+        поэтому время запроса зависит от числа дней и продуктов за период,
+        а не от числа продаж.
+
+        Args:
+            date_from: Первый день периода ('ГГГГ-ММ-ДД').
+            date_to: Последний день периода включительно.
+
+        Returns:
+            Dict[str, float]: {'ГГГГ-ММ-ДД': выручка} только для дней с продажами.
+        """
+        first_day, last_day = (parse_date(value)[0].strftime("%Y-%m-%d") for value in (date_from, date_to))
         cursor = self._conn.cursor()
-        search_pattern = f"%{query}%"
         cursor.execute(
             """
-            SELECT * FROM sales 
-            WHERE product_name LIKE ? 
-               OR date LIKE ?
-            ORDER BY date DESC
+            SELECT day, SUM(revenue) AS revenue
+            FROM daily_sales_summary
+            WHERE day BETWEEN ? AND ?
+            GROUP BY day
             """,
-            (search_pattern, search_pattern)
+            (first_day, last_day)
         )
-        return [self._row_to_entity(row) for row in cursor.fetchall()]
-    
+        return {row['day']: row['revenue'] for row in cursor.fetchall()}
+
+    def revenue(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> float:
+        """
+        Выручка с учетом скидок за произвольный период (с точностью до минуты).
+        Сумма net_amount за период считается по индексу (date_ts, id, net_amount)
+        без чтения таблицы.
+        """
+        start, end = date_range(date_from, date_to)
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("date_ts >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("date_ts < ?")
+            params.append(end)
+        sql = "SELECT SUM(net_amount) FROM sales"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        result = self._conn.execute(sql, params).fetchone()[0]
+        return result if result is not None else 0.0
+
     def salesByProduct(self):
+        """Выручка без скидок по продуктам за все время (по дневной сводке)."""
         cursor = self._conn.cursor()
-        cursor.execute("SELECT product_id, product_name, SUM(price * quantity) AS total_price FROM sales GROUP BY product_id, product_name;")
+        cursor.execute(
+            """
+            SELECT product_id, product_name, SUM(gross_revenue) AS total_price
+            FROM daily_sales_summary
+            GROUP BY product_id, product_name
+            """
+        )
         return cursor.fetchall()
+
+    def rebuild_summary(self) -> int:
+        """
+        Пересобирает дневную сводку продаж по таблице sales.
+        Возвращает число строк сводки.
+        """
+        with self._conn.transaction():
+            return rollup.rebuild(self._conn)
         
     def len(self) -> int:
         """Возвращает количество продаж."""
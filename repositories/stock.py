@@ -1,10 +1,27 @@
 import sqlite3
-from typing import Optional, List, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 from sql_model.entities import StockItem
 from sql_model.database import get_unit_by_name
 from sql_model.database import INITIAL_STOCK_CATEGORIES # Для получения имен категорий
 
+# Точность сравнения потребности с остатком (погрешность сложения float)
+DEMAND_PRECISION = 9
+
+
+class InsufficientStockError(ValueError):
+    """Запаса не хватает для списания; shortages - все недостающие позиции."""
+
+    def __init__(self, shortages: List[Tuple[str, float, float]], prefix: str = ""):
+        self.shortages = shortages  # (имя, требуется, остаток)
+        lines = [
+            f"Недостаточно запаса для '{name}'. Требуется списание {required:.2f}, текущий остаток {available:.2f}."
+            for name, required, available in shortages
+        ]
+        if prefix:
+            lines.insert(0, prefix)
+        super().__init__(" ".join(lines))
+
 
 class StockRepository:
 
@@ -23,7 +40,8 @@ class StockRepository:
             name=row['name'],
             category_id=row['category_id'],
             quantity=row['quantity'],
-            unit_id=row['unit_id']
+            unit_id=row['unit_id'],
+            reserved=row['reserved']
         )
         
     def _get_category_id(self, category_name: str) -> Optional[int]:
@@ -95,6 +113,44 @@ class StockRepository:
         cursor.execute("SELECT * FROM stock")
         return [self._row_to_entity(row) for row in cursor.fetchall()]
 
+    def listing(self, search: Optional[str] = None, category: Optional[str] = None,
+                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Возвращает элементы инвентаря для таблицы вместе с названиями категории
+        и единицы измерения (одним запросом с JOIN), резервом под ожидающие
+        заказы и доступным остатком (available = quantity - reserved).
+
+        Args:
+            search: Часть названия (без учета регистра).
+            category: Название категории запасов.
+            limit: Максимальное число строк.
+        """
+        sql = """
+            SELECT s.id, s.name, s.category_id, c.name AS category_name,
+                   s.quantity, s.reserved, s.quantity - s.reserved AS available,
+                   s.unit_id, u.name AS unit_name
+            FROM stock s
+            LEFT JOIN stock_categories c ON s.category_id = c.id
+            LEFT JOIN units u ON s.unit_id = u.id
+        """
+        conditions, params = [], []
+        if search:
+            conditions.append("instr(casefold(s.name), ?) > 0")
+            params.append(search.casefold())
+        if category:
+            conditions.append("c.name = ?")
+            params.append(category)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY s.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        cursor = self._conn.cursor()
+        cursor.execute(sql, params)
+        return [dict(row) for row in cursor.fetchall()]
+
     def update(self, name: str, quantity_delta: float):
         """
         Изменяет количество элемента запаса на указанную величину (quantity_delta).
@@ -139,6 +195,144 @@ class StockRepository:
             conn.rollback()
             raise RuntimeError(f"Ошибка при обновлении запаса для '{name}': {e}")
         
+    def deduct(self, demand: Dict[int, float]):
+        """
+        Списывает со склада суммарную потребность целой корзины одним запросом.
+
+        Условное обновление (quantity >= потребность) проверяет и уменьшает
+        остаток атомарно в одной инструкции, поэтому параллельные продажи не
+        теряют обновлений, а число запросов не зависит от числа строк рецептов.
+
+        Args:
+            demand: Потребность по запасам {stock_id: количество}.
+
+        Raises:
+            InsufficientStockError: Если хотя бы одного запаса не хватает;
+                в ошибке перечислены все недостающие позиции, склад не меняется.
+        """
+        need = {stock_id: round(qty, DEMAND_PRECISION) for stock_id, qty in demand.items() if qty}
+        if not need:
+            return
+
+        params = [value for item in need.items() for value in item]
+        with self._conn.transaction():
+            updated = self._conn.execute(
+                f"""
+                WITH need(stock_id, qty) AS (VALUES {", ".join("(?, ?)" for _ in need)})
+                UPDATE stock SET quantity = quantity - need.qty
+                FROM need
+                WHERE stock.id = need.stock_id AND stock.quantity >= need.qty
+                RETURNING stock.id
+                """,
+                params
+            ).fetchall()
+            if len(updated) == len(need):
+                return
+
+            # Необновленные строки не изменились: их остаток и есть текущий.
+            # Ошибка откатывает частичное списание до точки сохранения.
+            short = [stock_id for stock_id in need if stock_id not in {row[0] for row in updated}]
+            rows = self._conn.execute(
+                f"SELECT id, name, quantity FROM stock WHERE id IN ({', '.join('?' * len(short))})", short
+            ).fetchall()
+            found = {row[0]: (row[1], row[2]) for row in rows}
+            shortages = []
+            for stock_id in short:
+                name, available = found.get(stock_id, (f"#{stock_id}", 0.0))
+                shortages.append((name, need[stock_id], available))
+            raise InsufficientStockError(shortages)
+
+    # --- Резервы под ожидающие заказы ---
+
+    def reserve(self, order_id: int, demand: Dict[int, float]):
+        """
+        Резервирует потребность заказа: записывает резерв заказа по запасам и
+        увеличивает stock.reserved. Число запросов не зависит от размера заказа,
+        остальные заказы не читаются. Вызывается в транзакции заказа.
+
+        Args:
+            order_id: ID заказа.
+            demand: Потребность заказа {stock_id: количество}.
+        """
+        need = {stock_id: round(qty, DEMAND_PRECISION) for stock_id, qty in demand.items() if qty}
+        if not need:
+            return
+
+        rows = ", ".join("(?, ?, ?)" for _ in need)
+        params = [value for stock_id, qty in need.items() for value in (order_id, stock_id, qty)]
+        with self._conn.transaction():
+            self._conn.execute(
+                f"""
+                INSERT INTO order_reservations (order_id, stock_id, quantity) VALUES {rows}
+                ON CONFLICT (order_id, stock_id) DO UPDATE SET quantity = quantity + excluded.quantity
+                """,
+                params
+            )
+            self._conn.execute(
+                f"""
+                WITH need(stock_id, qty) AS (VALUES {", ".join("(?, ?)" for _ in need)})
+                UPDATE stock SET reserved = reserved + need.qty
+                FROM need
+                WHERE stock.id = need.stock_id
+                """,
+                [value for item in need.items() for value in item]
+            )
+
+    def release(self, order_ids: List[int]):
+        """
+        Снимает резервы заказов (выполнение, удаление, отмена): уменьшает
+        stock.reserved на зарезервированное заказами и удаляет их резервы.
+        Резервы ищутся по первичному ключу (order_id, stock_id).
+        """
+        if not order_ids:
+            return
+
+        placeholders = ", ".join("?" * len(order_ids))
+        with self._conn.transaction():
+            self._conn.execute(
+                f"""
+                UPDATE stock SET reserved = max(reserved - r.quantity, 0)
+                FROM (
+                    SELECT stock_id, SUM(quantity) AS quantity
+                    FROM order_reservations
+                    WHERE order_id IN ({placeholders})
+                    GROUP BY stock_id
+                ) AS r
+                WHERE stock.id = r.stock_id
+                """,
+                order_ids
+            )
+            self._conn.execute(f"DELETE FROM order_reservations WHERE order_id IN ({placeholders})", order_ids)
+
+    def availability(self, demand: Dict[int, float]) -> List[Dict[str, Any]]:
+        """
+        Сопоставляет потребность с доступным остатком (quantity - reserved)
+        одним запросом по первичному ключу запасов.
+
+        Returns:
+            [{'stock_id', 'name', 'quantity', 'reserved', 'available', 'required'}]
+            в порядке stock_id.
+        """
+        need = {stock_id: round(qty, DEMAND_PRECISION) for stock_id, qty in demand.items() if qty}
+        if not need:
+            return []
+
+        rows = self._conn.execute(
+            f"""
+            SELECT id, name, quantity, reserved FROM stock
+            WHERE id IN ({', '.join('?' * len(need))})
+            ORDER BY id
+            """,
+            list(need)
+        ).fetchall()
+        return [
+            {
+                'stock_id': row[0], 'name': row[1], 'quantity': row[2], 'reserved': row[3],
+                'available': round(row[2] - row[3], DEMAND_PRECISION), 'required': need[row[0]],
+            }
+            for row in rows
+        ]
+
     def set(self, name: str, new_quantity: float):
         """
         Устанавливает новое конкретное значение количества для элемента запаса.
@@ -201,6 +395,12 @@ class StockRepository:
             self._conn.rollback()
             raise e
             
+    def count_below(self, threshold: float) -> int:
+        """Возвращает число позиций с остатком меньше threshold."""
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM stock WHERE quantity < ?", (threshold,))
+        return cursor.fetchone()[0]
+
     def len(self) -> int:
         """Возвращает количество элементов в инвентаре."""
         cursor = self._conn.cursor()
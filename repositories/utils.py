@@ -1,51 +1,64 @@
 import sqlite3
-from typing import List, Dict, Any, Optional
+from typing import List, Optional
+
+from sql_model.connection import ManagedConnection
+from sql_model.reference import ReferenceCache, ReferenceData
+
 
 class UtilsRepository:
-    """Репозиторий для доступа к справочным таблицам (Units, Categories)."""
+    """
+    Репозиторий для доступа к справочным таблицам (Units, Categories).
+    Чтение идет из кэша справочников (sql_model.reference), а не из БД.
+    """
 
-    def __init__(self, conn: sqlite3.Connection):
-        self._conn = conn
+    def __init__(self, conn: sqlite3.Connection, reference: Optional[ReferenceData] = None):
+        # Отдельно созданный репозиторий получает обертку ради after_commit
+        self._conn = conn if isinstance(conn, ManagedConnection) else ManagedConnection(conn)
+        self._reference = reference or ReferenceData(ReferenceCache(), self._conn)
 
     def get_unit_names(self) -> List[str]:
         """Возвращает список имен всех единиц измерения (например, ['kg', 'g'])."""
-        cursor = self._conn.cursor()
-        cursor.execute("SELECT name FROM units ORDER BY id")
-        # Извлекаем только первый элемент (имя) из каждой строки
-        return [row[0] for row in cursor.fetchall()]
+        return list(self._reference.snapshot().units.names.values())
 
     def get_stock_category_names(self) -> List[str]:
         """Возвращает список имен всех категорий запасов."""
-        cursor = self._conn.cursor()
-        cursor.execute("SELECT name FROM stock_categories ORDER BY id")
-        return [row[0] for row in cursor.fetchall()]
+        return list(self._reference.snapshot().stock_categories.names.values())
 
     def get_expense_category_names(self) -> List[str]:
         """Возвращает список имен всех категорий расходов."""
+        return list(self._reference.snapshot().expense_categories.names.values())
+    
+    def add_expense_category(self, name: str) -> int:
+        """Добавляет новую категорию расходов и возвращает ее ID."""
         cursor = self._conn.cursor()
-        cursor.execute("SELECT name FROM expense_categories ORDER BY id")
-        return [row[0] for row in cursor.fetchall()]
+        try:
+            cursor.execute("INSERT INTO expense_categories (name) VALUES (?)", (name,))
+            self._conn.commit()
+            self._conn.after_commit(self._reference.invalidate)
+            return cursor.lastrowid
+        except Exception as e:
+            self._conn.rollback()
+            raise e
     
     def get_unit_name_by_id(self, unit_id: int) -> Optional[str]:
         """Преобразует ID единицы измерения в ее строковое имя."""
-        cursor = self._conn.cursor()
-        cursor.execute("SELECT name FROM units WHERE id = ?", (unit_id,))
-        row = cursor.fetchone()
-        return row[0] if row else None
+        return self._reference.snapshot().units.names.get(unit_id)
+
+    def get_unit_id_by_name(self, name: str) -> Optional[int]:
+        """Возвращает ID единицы измерения по ее имени."""
+        return self._reference.snapshot().units.ids.get(name)
     
     def get_stock_category_name_by_id(self, category_id: int) -> Optional[str]:
         """Преобразует ID категории запаса в ее строковое имя."""
-        cursor = self._conn.cursor()
-        cursor.execute("SELECT name FROM stock_categories WHERE id = ?", (category_id,))
-        row = cursor.fetchone()
-        return row[0] if row else None
+        return self._reference.snapshot().stock_categories.names.get(category_id)
+
+    def get_stock_category_id_by_name(self, name: str) -> Optional[int]:
+        """Возвращает ID категории запаса по ее имени."""
+        return self._reference.snapshot().stock_categories.ids.get(name)
 
     def get_expense_category_name_by_id(self, category_id: int) -> Optional[str]:
         """Преобразует ID категории расхода в ее строковое имя."""
-        cursor = self._conn.cursor()
-        cursor.execute("SELECT name FROM expense_categories WHERE id = ?", (category_id,))
-        row = cursor.fetchone()
-        return row[0] if row else None
+        return self._reference.snapshot().expense_categories.names.get(category_id)
     
     def get_expense_category_id_by_name(self, name: str) -> Optional[int]:
         """
@@ -57,9 +70,8 @@ class UtilsRepository:
         Returns:
             Optional[int]: ID категории или None, если категория не найдена.
         """
-        cursor = self._conn.cursor()
-        cursor.execute("SELECT id FROM expense_categories WHERE name = ?", (name,))
-        row = cursor.fetchone()
-                
-        return row['id'] if row else None 
-        
\ No newline at end of file
+        return self._reference.snapshot().expense_categories.ids.get(name)
+
+    def reference_stats(self) -> dict:
+        """Счетчики попаданий и промахов кэша справочников."""
+        return self._reference.cache.stats()
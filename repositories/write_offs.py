@@ -1,9 +1,12 @@
 import sqlite3
-from typing import Optional, List, Any
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 # Предполагаем, что WriteOff Entity обновлен в sql_model.entities
 from sql_model.entities import WriteOff 
+from sql_model.dates import text_range
+from sql_model.pagination import decode_cursor, keyset_condition
+from repositories.stock import InsufficientStockError
 
 class WriteOffsRepository:
 
@@ -30,7 +33,7 @@ class WriteOffsRepository:
 
     # --- Основной метод: Регистрация списания ---
 
-    def add(self, item_name: str, item_type: str, quantity: float, reason: str):
+    def add(self, item_name: str, item_type: str, quantity: float, reason: str) -> int:
         """
         Регистрирует списание (готового продукта или запаса/сырья).
 
@@ -44,6 +47,9 @@ class WriteOffsRepository:
             quantity (float): Количество для списания.
             reason (str): Причина списания.
 
+        Returns:
+            int: ID записи о списании.
+
         Raises:
             ValueError: Если элемент не найден, количество не положительно или не хватает запаса.
         """
@@ -61,45 +67,30 @@ class WriteOffsRepository:
         stock_item_id = None
         unit_id = None
 
-        try:
+        # Списание запасов и запись в журнал - одна единица работы:
+        # при нехватке запаса (важно для product) откатывается целиком
+        with self._conn.transaction():
             if item_type == 'product':
                 # --- ЛОГИКА СПИСАНИЯ ГОТОВОГО ПРОДУКТА (списание ингредиентов) ---
             
                 product_repo = self._model.products()
             
-                # 1. Находим продукт и его рецепт
-                product_entity = product_repo.by_name(item_name) # Получаем Product Entity
-                if product_entity is None:
+                # 1. Находим продукт и его рецепт (из кэша рецептов)
+                recipe = product_repo.recipe(item_name)
+                if recipe is None:
                     raise ValueError(f"Продукт '{item_name}' не найден в списке продуктов.")
-            
-                mats_needed = product_repo.get_materials_for_product(product_entity.id)
-                if not mats_needed:
-                    # Регистрируем факт списания продукта, даже если у него нет рецепта
-                    pass 
+                # Продукт без рецепта тоже списывается: регистрируется только факт списания
 
-                product_id = product_entity.id
+                product_id = recipe.product_id
             
-                # 2. Списываем ингредиенты со склада (аналогично продаже)
-                for ing in mats_needed:
-                    ing_name = ing['name']
-                    # Общее количество ингредиента, необходимое для списанных продуктов
-                    ing_quantity_needed = ing['quantity'] * quantity 
-                
-                    # Обновляем запас (отрицательное изменение)
-                    # StockRepository.update() содержит проверку на отрицательный остаток
-                    # Мы используем 'set' вместо 'update', так как в StockRepository у нас был set.
-                    # Если в StockRepository есть метод update, то лучше использовать его. 
-                    # Исходя из предоставленных файлов, используем get/set:
-                    current_stock = stock_repo.get(ing_name)
-                    if current_stock is None:
-                        raise ValueError(f"Ингредиент '{ing_name}' для продукта '{item_name}' не найден на складе.")
-                
-                    new_quantity = current_stock.quantity - ing_quantity_needed
-                    if new_quantity < 0:
-                        # Важно: Вызываем ошибку до коммита
-                        raise ValueError(f"Не хватает ингредиента '{ing_name}' для списания {quantity} шт. продукта '{item_name}'. Недостаточно {ing_name}.")
-                
-                    stock_repo.set(ing_name, new_quantity)
+                # 2. Списываем ингредиенты со склада (аналогично продаже) одним
+                # условным обновлением; в ошибке перечислены все недостающие
+                try:
+                    stock_repo.deduct(self._model.bom.demand([(product_id, quantity)]))
+                except InsufficientStockError as e:
+                    raise InsufficientStockError(
+                        e.shortages, f"Не хватает ингредиента для списания {quantity} шт. продукта '{item_name}'."
+                    ) from None
                 
                 # После успешного списания всех ингредиентов, регистрируем списание продукта.
             
@@ -114,13 +105,8 @@ class WriteOffsRepository:
                 stock_item_id = current_stock_item.id
                 unit_id = current_stock_item.unit_id
             
-                # 1. Проверяем остаток перед списанием
-                if current_stock_item.quantity < quantity:
-                    raise ValueError(f"Недостаточно запаса '{item_name}' для списания ({current_stock_item.quantity} < {quantity}).")
-
-                # 2. Уменьшаем количество на складе
-                new_quantity = current_stock_item.quantity - quantity
-                stock_repo.set(item_name, new_quantity)
+                # Проверка остатка и списание - одно условное обновление
+                stock_repo.deduct({stock_item_id: quantity})
 
 
             # 3. Записываем факт списания в журнал (для обоих типов)
@@ -140,23 +126,89 @@ class WriteOffsRepository:
                     datetime.now().strftime("%Y-%m-%d %H:%M")
                 )
             )
-            self._conn.commit()
-
-        except ValueError as e:
-            # Откат транзакции, если не хватило запасов (важно для product)
-            self._conn.rollback()
-            raise e
-        except Exception as e:
-            self._conn.rollback()
-            raise e
+        return cursor.lastrowid
     
     
-    def data(self) -> List[WriteOff]:
-        """Возвращает список всех списаний (для отображения в таблице)."""
+    def data(self, after: Optional[str] = None, limit: Optional[int] = None) -> List[WriteOff]:
+        """
+        Возвращает списания для таблицы, сначала новые.
+
+        Args:
+            after: Курсор последней строки предыдущей страницы.
+            limit: Размер страницы (None - все списания).
+        """
+        sql, params = "SELECT * FROM writeoffs", []
+        if after:
+            key, last_id = decode_cursor(after)
+            sql += " WHERE " + keyset_condition('date')
+            params.extend([key, key, last_id])
+        sql += " ORDER BY date DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
         cursor = self._conn.cursor()
-        cursor.execute("SELECT * FROM writeoffs ORDER BY date DESC")
+        cursor.execute(sql, params)
         return [self._row_to_entity(row) for row in cursor.fetchall()]
 
+    def journal(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                reason: Optional[str] = None, after: Optional[str] = None,
+                limit: Optional[int] = None, writeoff_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Журнал списаний для отображения: названия продукта или запаса и единицы
+        измерения подставляются одним запросом с LEFT JOIN, сначала новые.
+
+        Args:
+            date_from: Начало периода ('ГГГГ-ММ-ДД' или 'ГГГГ-ММ-ДД ЧЧ:ММ').
+            date_to: Конец периода включительно.
+            reason: Часть текста причины (без учета регистра).
+            after: Курсор последней строки предыдущей страницы.
+            limit: Размер страницы (None - весь журнал).
+            writeoff_id: ID одной записи (поиск по первичному ключу).
+
+        Raises:
+            ValueError: Неверная дата или курсор.
+        """
+        sql = """
+            SELECT w.id, w.product_id, w.stock_item_id, w.unit_id, w.quantity, w.reason, w.date,
+                   CASE WHEN w.product_id IS NOT NULL THEN 'product' ELSE 'stock' END AS item_type,
+                   CASE WHEN w.product_id IS NOT NULL
+                        THEN COALESCE(p.name, 'Product #' || w.product_id)
+                        ELSE COALESCE(s.name, 'Unknown') END AS item_name,
+                   u.name AS unit_name
+            FROM writeoffs w
+            LEFT JOIN products p ON w.product_id = p.id
+            LEFT JOIN stock s ON w.stock_item_id = s.id
+            LEFT JOIN units u ON w.unit_id = u.id
+        """
+        conditions, params = [], []
+        if writeoff_id is not None:
+            conditions.append("w.id = ?")
+            params.append(writeoff_id)
+        start, end = text_range(date_from, date_to)
+        if start:
+            conditions.append("w.date >= ?")
+            params.append(start)
+        if end:
+            conditions.append("w.date < ?")
+            params.append(end)
+        if reason:
+            conditions.append("instr(casefold(w.reason), ?) > 0")
+            params.append(reason.casefold())
+        if after:
+            key, last_id = decode_cursor(after)
+            conditions.append(keyset_condition('w.date', id_column='w.id'))
+            params.extend([key, key, last_id])
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY w.date DESC, w.id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        cursor = self._conn.cursor()
+        cursor.execute(sql, params)
+        return [dict(row) for row in cursor.fetchall()]
+
     def len(self) -> int:
         """Возвращает количество записей о списаниях."""
         cursor = self._conn.cursor()
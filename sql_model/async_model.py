@@ -0,0 +1,70 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
+
+from sql_model.model import SQLiteModel
+
+Operation = Callable[[SQLiteModel], Any]
+Runner = Callable[[Operation], Awaitable[Any]]
+
+
+class AsyncModel:
+    """
+    Асинхронный фасад SQLiteModel для async-маршрутов FastAPI.
+
+    Интерфейс совпадает с SQLiteModel, но каждый метод репозитория возвращает
+    awaitable: `await model.sales().data()`. Сама работа с sqlite3 выполняется
+    вне цикла событий (в пуле потоков БД или в очереди писателя), поэтому
+    медленный запрос не останавливает остальные запросы воркера.
+    """
+
+    def __init__(self, runner: Runner):
+        self._runner = runner
+
+    @classmethod
+    def wrap(cls, model: SQLiteModel, executor: Optional[Executor] = None) -> "AsyncModel":
+        """
+        Оборачивает отдельную модель (например, в тестах или скриптах).
+        По умолчанию все вызовы выполняются в одном выделенном потоке,
+        так как соединение модели не рассчитано на параллельное использование.
+        """
+        executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-model")
+
+        async def run(operation: Operation) -> Any:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, operation, model)
+
+        return cls(run)
+
+    async def run(self, operation: Operation) -> Any:
+        """Выполняет произвольную функцию от SQLiteModel вне цикла событий."""
+        return await self._runner(operation)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in SQLiteModel.REPOSITORIES:
+            return lambda: _AsyncRepository(self._runner, name)
+
+        attr = getattr(SQLiteModel, name)
+        if not callable(attr):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._runner(
+            lambda model: getattr(model, name)(*args, **kwargs)
+        )
+
+
+class _AsyncRepository:
+    """Асинхронный фасад репозитория."""
+
+    def __init__(self, runner: Runner, repository: str):
+        self._runner = runner
+        self._repository = repository
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        repository = self._repository
+        return lambda *args, **kwargs: self._runner(
+            lambda model: getattr(getattr(model, repository)(), name)(*args, **kwargs)
+        )
@@ -0,0 +1,95 @@
+"""
+Сравнение профилей производительности SQLite на одинаковой нагрузке.
+
+Для каждого профиля создается отдельный временный файл БД, в который
+прогоняется один и тот же набор продаж и заказов через репозитории.
+
+Запуск:
+    python -m sql_model.benchmark --sales 500 --orders 100
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, Any, List, Optional
+
+from sql_model.database import PERFORMANCE_PROFILES, create_connection, initialize_db
+from sql_model.model import SQLiteModel
+
+
+def _seed(model: SQLiteModel):
+    """Заполняет склад и рецепты в объеме, достаточном для всей нагрузки."""
+    model.stock().add('Мука', "Materials", 1_000_000, 'kg')
+    model.stock().add('Яйцо', "Materials", 1_000_000, 'pc')
+    model.stock().add('Масло', "Materials", 1_000_000, 'kg')
+    model.products().add('Хлеб', 200, [{'name': 'Мука', 'quantity': 0.5}, {'name': 'Яйцо', 'quantity': 1}])
+    model.products().add('Круассан', 150, [{'name': 'Мука', 'quantity': 0.1}, {'name': 'Масло', 'quantity': 0.05}])
+
+
+def run_workload(db_file: str, profile: str, sales: int = 200, orders: int = 50) -> Dict[str, Any]:
+    """
+    Выполняет нагрузку продаж и заказов на БД с указанным профилем.
+
+    Returns:
+        Dict[str, Any]: Время каждой фазы в секундах и операций в секунду.
+    """
+    conn = create_connection(db_file, profile)
+    initialize_db(conn)
+    model = SQLiteModel(db_file, conn=conn)
+    try:
+        _seed(model)
+        products = [model.products().by_name('Хлеб'), model.products().by_name('Круассан')]
+
+        start = time.perf_counter()
+        for i in range(sales):
+            product = products[i % len(products)]
+            model.sales().add(product.name, product.price, 1, 0)
+        sales_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(orders):
+            items = [{'product_id': p.id, 'quantity': 2} for p in products]
+            model.orders().add(items=items, complete_now=True)
+        orders_time = time.perf_counter() - start
+    finally:
+        model.close()
+
+    total = sales_time + orders_time
+    return {
+        'profile': profile,
+        'sales': sales,
+        'orders': orders,
+        'sales_seconds': sales_time,
+        'orders_seconds': orders_time,
+        'total_seconds': total,
+        'ops_per_second': (sales + orders) / total if total else 0.0,
+    }
+
+
+def compare_profiles(profiles: Optional[List[str]] = None, sales: int = 200, orders: int = 50) -> List[Dict[str, Any]]:
+    """Прогоняет одинаковую нагрузку для каждого профиля на отдельном файле БД."""
+    profiles = profiles or list(PERFORMANCE_PROFILES)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in profiles:
+            db_file = os.path.join(tmp, f"bench_{profile}.db")
+            results.append(run_workload(db_file, profile, sales, orders))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение профилей производительности SQLite")
+    parser.add_argument('--sales', type=int, default=200, help="Количество продаж")
+    parser.add_argument('--orders', type=int, default=50, help="Количество заказов (создание + выполнение)")
+    parser.add_argument('--profiles', nargs='*', choices=list(PERFORMANCE_PROFILES), help="Профили для сравнения")
+    args = parser.parse_args()
+
+    results = compare_profiles(args.profiles, args.sales, args.orders)
+    print(f"{'profile':<10} {'sales, s':>10} {'orders, s':>10} {'total, s':>10} {'ops/s':>10}")
+    for r in results:
+        print(f"{r['profile']:<10} {r['sales_seconds']:>10.3f} {r['orders_seconds']:>10.3f} "
+              f"{r['total_seconds']:>10.3f} {r['ops_per_second']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sql_model.reference import ChangeDetector, SharedCache, read_version
+
+# --- Матрица рецептов (BOM) ---
+#
+# Разреженная матрица продукты × запасы, построенная по product_stock:
+# строка продукта - кортежи id запасов и количеств на единицу продукта
+# (сжатое хранение по строкам, как CSR). Через нее считаются:
+#   - потребность корзины в запасах: demand = Bᵀ · basket;
+#   - себестоимость продуктов по ценам запасов: cost = B · prices.
+# Каждая операция - один проход по ненулевым элементам нужных строк.
+# NumPy в зависимостях нет, а рецепты содержат единицы ингредиентов,
+# поэтому плотные массивы не дали бы выигрыша.
+#
+# Матрица - единственная копия product_stock в памяти: строки рецептов
+# (sql_model.recipes) берутся из нее. Она загружается одним запросом.
+# ProductsRepository перестраивает только строки измененных продуктов
+# (refresh) после commit изменения (ManagedConnection.after_commit), поэтому
+# другие соединения не видят в матрице незафиксированных или откаченных
+# рецептов, а ее версия совпадает с версией зафиксированных данных.
+# Изменения из других процессов видны по счетчику reference_version
+# (миграция 6): при расхождении матрица перезагружается целиком.
+
+Row = Tuple[Tuple[int, ...], Tuple[float, ...]]
+
+
+class BomMatrix(SharedCache):
+    """Матрица рецептов одной БД, общая для всех соединений процесса."""
+
+    def __init__(self):
+        super().__init__()
+        self._stats['refreshes'] = 0
+        self._rows: Optional[Dict[int, Row]] = None
+        self._version: Optional[int] = None
+
+    def rows(self, conn: Any, check_version: bool) -> Dict[int, Row]:
+        """
+        Возвращает строки матрицы {product_id: (stock_ids, quantities)}.
+        check_version - соединение видело изменения БД и нужно сверить счетчик.
+        """
+        rows = self._rows
+        if rows is not None and check_version:
+            self._count('version_checks')
+            if read_version(conn) != self._version:
+                rows = None
+
+        if rows is not None:
+            self._count('hits')
+            return rows
+
+        version = read_version(conn)
+        rows = self._load(conn)
+        with self._lock:
+            self._stats['misses'] += 1
+            self._rows, self._version = rows, version
+        return rows
+
+    @staticmethod
+    def _load(conn: Any, product_ids: Optional[List[int]] = None) -> Dict[int, Row]:
+        # Сортировка идет по первичному ключу product_stock (product_id, stock_id)
+        sql = "SELECT product_id, stock_id, quantity FROM product_stock"
+        params: List[int] = []
+        if product_ids is not None:
+            sql += f" WHERE product_id IN ({', '.join('?' * len(product_ids))})"
+            params = product_ids
+        sql += " ORDER BY product_id, stock_id"
+
+        columns: Dict[int, Tuple[List[int], List[float]]] = {}
+        for product_id, stock_id, quantity in conn.execute(sql, params):
+            stock_ids, quantities = columns.setdefault(product_id, ([], []))
+            stock_ids.append(stock_id)
+            quantities.append(quantity)
+        return {product_id: (tuple(ids), tuple(qty)) for product_id, (ids, qty) in columns.items()}
+
+    def refresh(self, conn: Any, product_ids: List[int]):
+        """
+        Перестраивает строки указанных продуктов после изменения их рецептов.
+        Вызывается после commit: строки и версия читаются из зафиксированных данных.
+        """
+        if self._rows is None:
+            return
+        version = read_version(conn)
+        fresh = self._load(conn, product_ids)
+        with self._lock:
+            if self._rows is None:
+                return
+            rows = dict(self._rows)
+            for product_id in product_ids:
+                if product_id in fresh:
+                    rows[product_id] = fresh[product_id]
+                else:
+                    rows.pop(product_id, None)
+            # Снимок строк заменяется целиком: читатели не видят его частично
+            self._rows, self._version = rows, version
+            self._stats['refreshes'] += 1
+
+    def invalidate(self):
+        """Сбрасывает матрицу (например, после отката изменения рецепта)."""
+        with self._lock:
+            self._rows = None
+            self._version = None
+            self._stats['invalidations'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        rows = self._rows
+        stats['products'] = len(rows) if rows is not None else 0
+        stats['nonzeros'] = sum(len(ids) for ids, _ in rows.values()) if rows is not None else 0
+        return stats
+
+
+def demand(rows: Dict[int, Row], basket: Iterable[Tuple[int, float]]) -> Dict[int, float]:
+    """Потребность корзины в запасах: Bᵀ · basket, basket - пары (product_id, количество)."""
+    result: Dict[int, float] = {}
+    for product_id, quantity in basket:
+        stock_ids, quantities = rows.get(product_id, ((), ()))
+        for stock_id, per_unit in zip(stock_ids, quantities):
+            result[stock_id] = result.get(stock_id, 0) + per_unit * quantity
+    return result
+
+
+def cost(rows: Dict[int, Row], prices: Dict[int, float]) -> Dict[int, float]:
+    """Себестоимость единицы каждого продукта: B · prices (prices - цена единицы запаса)."""
+    return {
+        product_id: sum(per_unit * prices.get(stock_id, 0) for stock_id, per_unit in zip(stock_ids, quantities))
+        for product_id, (stock_ids, quantities) in rows.items()
+    }
+
+
+class Bom:
+    """Доступ одного соединения к общей матрице рецептов."""
+
+    def __init__(self, matrix: BomMatrix, conn: Any):
+        self.matrix = matrix
+        self._conn = conn
+        self._changes = ChangeDetector(conn)
+
+    def rows(self) -> Dict[int, Row]:
+        return self.matrix.rows(self._conn, check_version=self._changes.changed())
+
+    def demand(self, basket: Iterable[Tuple[int, float]]) -> Dict[int, float]:
+        """Суммарная потребность корзины {stock_id: количество}."""
+        return demand(self.rows(), basket)
+
+    def cost(self, prices: Dict[int, float]) -> Dict[int, float]:
+        """Себестоимость единицы продуктов {product_id: стоимость}."""
+        return cost(self.rows(), prices)
+
+    def refresh(self, product_ids: List[int]):
+        self.matrix.refresh(self._conn, product_ids)
+        # Собственная запись уже учтена: следующий вызов не перечитывает матрицу
+        self._changes.changed()
+
+    def invalidate(self):
+        self.matrix.invalidate()
@@ -0,0 +1,193 @@
+import itertools
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+
+class ManagedConnection:
+    """
+    Обертка над sqlite3.Connection, через которую работают репозитории.
+
+    Вне группового блока ведет себя как обычное соединение. Внутри group()
+    несколько операций репозиториев выполняются в одной внешней транзакции:
+    commit() репозиториев ничего не делает (фиксирует сам блок), а rollback()
+    откатывает только текущую операцию до ее точки сохранения.
+
+    transaction() - единица работы одной бизнес-операции: репозитории,
+    вызванные внутри нее, не фиксируют изменения сами, вложенные вызовы
+    получают точки сохранения, а весь блок фиксируется одним commit.
+
+    after_commit() откладывает действие (например, обновление общего кэша)
+    до фиксации внешнего блока; при откате действие отбрасывается.
+    on_rollback() регистрирует сброс кэшей, которые внутри откаченной части
+    могли прочитать ее незафиксированные изменения.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._raw = conn
+        self._grouped = False
+        self._depth = 0
+        self._savepoint: Optional[str] = None
+        self._savepoint_ids = itertools.count(1)
+        self._after_commit: List[Callable[[], None]] = []
+        self._rollback_listeners: List[Callable[[], None]] = []
+        # total_changes на момент последней фиксации и начала текущей точки сохранения
+        self._committed_changes = conn.total_changes
+        self._savepoint_changes = conn.total_changes
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        """Исходное соединение sqlite3."""
+        return self._raw
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._raw.in_transaction
+
+    def cursor(self) -> sqlite3.Cursor:
+        return self._raw.cursor()
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self._raw.execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        return self._raw.executemany(sql, seq_of_parameters)
+
+    @property
+    def in_unit_of_work(self) -> bool:
+        """Изменения фиксирует внешний блок (group() или transaction())."""
+        return self._grouped or self._depth > 0
+
+    def commit(self):
+        if not self.in_unit_of_work:
+            self._raw.commit()
+            self._committed_changes = self._raw.total_changes
+
+    def rollback(self):
+        if not self.in_unit_of_work:
+            self._raw.rollback()
+            self._rolled_back(self._committed_changes)
+        elif self._savepoint:
+            self._raw.execute(f"ROLLBACK TO {self._savepoint}")
+            self._rolled_back(self._savepoint_changes)
+
+    def after_commit(self, callback: Callable[[], None]):
+        """
+        Выполняет callback после фиксации изменений текущей операции.
+        Вне единицы работы commit() репозитория уже зафиксировал их, и callback
+        выполняется сразу; внутри group() или transaction() - после commit
+        внешнего блока, а при откате операции или блока не выполняется.
+        """
+        if self.in_unit_of_work:
+            self._after_commit.append(callback)
+        else:
+            callback()
+
+    def _run_after_commit(self):
+        self._committed_changes = self._raw.total_changes
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    def on_rollback(self, callback: Callable[[], None]):
+        """
+        Регистрирует callback, вызываемый после отката транзакции или точки
+        сохранения, если откаченная часть изменяла данные. Так сбрасываются
+        общие кэши, в которые могли попасть откаченные изменения.
+        """
+        self._rollback_listeners.append(callback)
+
+    def _rolled_back(self, changes: int):
+        if self._raw.total_changes != changes:
+            for callback in self._rollback_listeners:
+                callback()
+
+    def close(self):
+        self._raw.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._raw, name)
+
+    # --- Групповая транзакция ---
+
+    @contextmanager
+    def group(self) -> Iterator[None]:
+        """
+        Открывает внешнюю транзакцию для пачки операций и фиксирует ее одним commit.
+        При ошибке самого блока (например, при COMMIT) откатывается вся пачка.
+        """
+        if self._raw.in_transaction:
+            self._raw.commit()
+        self._raw.execute("BEGIN IMMEDIATE")
+        changes = self._raw.total_changes
+        self._grouped = True
+        try:
+            yield
+            self._grouped = False
+            self._raw.commit()
+        except BaseException:
+            self._grouped = False
+            self._after_commit.clear()
+            self._raw.rollback()
+            self._rolled_back(changes)
+            raise
+        self._run_after_commit()
+
+    @contextmanager
+    def savepoint(self, name: str) -> Iterator[None]:
+        """
+        Выполняет одну операцию внутри group() или transaction() под точкой сохранения.
+        Ошибка операции откатывает только ее изменения и пробрасывается дальше.
+        """
+        outer, outer_changes = self._savepoint, self._savepoint_changes
+        pending = len(self._after_commit)
+        self._raw.execute(f"SAVEPOINT {name}")
+        self._savepoint, self._savepoint_changes = name, self._raw.total_changes
+        try:
+            yield
+        except BaseException:
+            self._raw.execute(f"ROLLBACK TO {name}")
+            del self._after_commit[pending:]
+            self._rolled_back(self._savepoint_changes)
+            raise
+        finally:
+            self._savepoint, self._savepoint_changes = outer, outer_changes
+            self._raw.execute(f"RELEASE {name}")
+
+    # --- Единица работы ---
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Выполняет бизнес-операцию атомарно.
+
+        Внешний вызов открывает транзакцию и фиксирует ее одним commit при
+        успехе или откатывает целиком при ошибке. Вложенный вызов (в том числе
+        внутри group() писателя) работает под точкой сохранения: его ошибка
+        откатывает только его изменения, а фиксирует все внешний блок.
+        """
+        if self.in_unit_of_work:
+            self._depth += 1
+            try:
+                with self.savepoint(f"tx_{next(self._savepoint_ids)}"):
+                    yield
+            finally:
+                self._depth -= 1
+            return
+
+        if self._raw.in_transaction:
+            self._raw.commit()
+        self._raw.execute("BEGIN IMMEDIATE")
+        changes = self._raw.total_changes
+        self._depth = 1
+        try:
+            yield
+            self._depth = 0
+            self._raw.commit()
+        except BaseException:
+            self._depth = 0
+            self._after_commit.clear()
+            self._raw.rollback()
+            self._rolled_back(changes)
+            raise
+        self._run_after_commit()
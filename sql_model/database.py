@@ -1,8 +1,11 @@
+import os
 import sqlite3
 from typing import List, Dict, Tuple, Any, Optional
 
-# Путь к файлу базы данных
+# Путь к файлу базы данных по умолчанию.
+# Другой файл задается переменной окружения BAKERY_DB_PATH.
 DB_PATH = 'bakery_management.db'
+DB_PATH_ENV = 'BAKERY_DB_PATH'
 
 # Начальные данные для справочников (Unit, Categories)
 INITIAL_UNITS = [
@@ -18,195 +21,96 @@ INITIAL_EXPENSE_CATEGORIES = [
 ]
 
 
-def execute_scripts(conn: sqlite3.Connection, scripts: List[str]):
-    """Выполняет список SQL скриптов."""
-    cursor = conn.cursor()
-    for script in scripts:
-        cursor.execute(script)
-    conn.commit()
+# Профили производительности SQLite (набор PRAGMA для каждого соединения).
+# Активный профиль задается переменной окружения BAKERY_DB_PROFILE.
+PERFORMANCE_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Поведение SQLite по умолчанию: журнал отката и fsync на каждый commit
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+    },
+    # WAL (читатели не блокируют писателя), но полная надежность commit
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -16000,     # ~16 МБ
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # WAL + synchronous=NORMAL: fsync только при checkpoint, данные не
+    # повреждаются при сбое, но последние транзакции могут быть потеряны
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,   # 256 МБ
+        'cache_size': -64000,     # ~64 МБ
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+}
+
+DEFAULT_PROFILE = 'fast'
+PROFILE_ENV = 'BAKERY_DB_PROFILE'
+
+
+def get_db_path() -> str:
+    """Возвращает путь к файлу БД приложения."""
+    return os.environ.get(DB_PATH_ENV) or DB_PATH
+
+
+def get_profile_name() -> str:
+    """Возвращает имя активного профиля производительности."""
+    name = os.environ.get(PROFILE_ENV, DEFAULT_PROFILE)
+    if name not in PERFORMANCE_PROFILES:
+        raise ValueError(
+            f"Неизвестный профиль БД '{name}'. Доступны: {', '.join(PERFORMANCE_PROFILES)}."
+        )
+    return name
+
+
+def apply_profile(conn: sqlite3.Connection, profile: str):
+    """Применяет PRAGMA профиля к соединению."""
+    if profile not in PERFORMANCE_PROFILES:
+        raise ValueError(f"Неизвестный профиль БД '{profile}'.")
+    for pragma, value in PERFORMANCE_PROFILES[profile].items():
+        # journal_mode возвращает строку с результатом, ее нужно прочитать
+        conn.execute(f"PRAGMA {pragma} = {value}").fetchall()
+
 
+def read_pragmas(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Возвращает текущие значения PRAGMA, которыми управляют профили."""
+    names = sorted({p for settings in PERFORMANCE_PROFILES.values() for p in settings})
+    return {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in names}
 
-def create_connection(db_file=DB_PATH) -> sqlite3.Connection:
-    """Создает и возвращает соединение с базой данных SQLite."""
-    conn = sqlite3.connect(db_file, check_same_thread=False)
+
+def _casefold(value: Any) -> Any:
+    """Приведение к нижнему регистру с поддержкой Unicode (lower() в SQLite - только ASCII)."""
+    return value.casefold() if isinstance(value, str) else value
+
+
+def create_connection(db_file: Optional[str] = None, profile: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Создает и возвращает соединение с базой данных SQLite
+    (по умолчанию с файлом из get_db_path()).
+    К соединению применяется профиль производительности (по умолчанию активный)
+    и регистрируется SQL-функция casefold() для поиска без учета регистра.
+    """
+    conn = sqlite3.connect(db_file or get_db_path(), check_same_thread=False)
     conn.row_factory = sqlite3.Row  # Это позволит получать данные в виде словарей
+    conn.create_function("casefold", 1, _casefold, deterministic=True)
+    apply_profile(conn, profile or get_profile_name())
     return conn
 
 
 def initialize_db(conn: sqlite3.Connection):
-    """Создает все необходимые таблицы и заполняет справочники."""
-
-    # 1. Справочные таблицы
-    scripts = [
-        """
-        CREATE TABLE IF NOT EXISTS units (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL UNIQUE
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS stock_categories (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL UNIQUE
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS expense_categories (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL UNIQUE
-        );
-        """,
-    ]
-
-    # 2. Основные таблицы
-    scripts += [
-        """
-        CREATE TABLE IF NOT EXISTS products (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL UNIQUE,
-            price INTEGER NOT NULL
-        );
-        """,
-        # Таблица для связи Продукт-Ингредиент
-        """
-        CREATE TABLE IF NOT EXISTS product_stock (
-            product_id INTEGER NOT NULL,
-            stock_id INTEGER NOT NULL,
-            quantity REAL NOT NULL,
-            PRIMARY KEY (product_id, stock_id),
-            FOREIGN KEY (product_id) REFERENCES products (id) ON DELETE CASCADE,
-            FOREIGN KEY (stock_id) REFERENCES stock (id) ON DELETE RESTRICT
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS stock (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL UNIQUE,
-            category_id INTEGER NOT NULL,
-            quantity REAL NOT NULL,
-            unit_id INTEGER NOT NULL,
-            FOREIGN KEY (category_id) REFERENCES stock_categories (id),
-            FOREIGN KEY (unit_id) REFERENCES units (id)
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS expense_types (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL UNIQUE,
-            default_price INTEGER NOT NULL,
-            category_id INTEGER NOT NULL,
-            stock BOOLEAN NOT NULL DEFAULT 0,
-            FOREIGN KEY (category_id) REFERENCES expense_categories (id)
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS suppliers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            contact_person TEXT,
-            phone TEXT,
-            email TEXT,
-            address TEXT
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS sales (
-            id INTEGER PRIMARY KEY,
-            product_id INTEGER NOT NULL,
-            product_name TEXT NOT NULL,
-            price INTEGER NOT NULL,
-            quantity REAL NOT NULL,
-            discount INTEGER NOT NULL,
-            date TEXT NOT NULL,
-            FOREIGN KEY (product_id) REFERENCES products (id)
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS orders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            created_date TEXT NOT NULL,
-            completion_date TEXT,
-            status TEXT NOT NULL CHECK(status IN ('pending', 'completed')),
-            additional_info TEXT
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS order_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            order_id INTEGER NOT NULL,
-            product_id INTEGER NOT NULL,
-            product_name TEXT NOT NULL,
-            quantity REAL NOT NULL,
-            price INTEGER NOT NULL,
-            FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE,
-            FOREIGN KEY (product_id) REFERENCES products (id)
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS expense_documents (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            supplier_id INTEGER NOT NULL,
-            total_amount INTEGER NOT NULL,
-            comment TEXT,
-            FOREIGN KEY (supplier_id) REFERENCES suppliers (id)
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS expense_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            document_id INTEGER NOT NULL,
-            expense_type_id INTEGER NOT NULL,
-            stock_item_id INTEGER,
-            unit_id INTEGER NOT NULL,
-            quantity REAL NOT NULL,
-            price_per_unit INTEGER NOT NULL,
-            total_price INTEGER NOT NULL,
-            FOREIGN KEY (document_id) REFERENCES expense_documents (id) ON DELETE CASCADE,
-            FOREIGN KEY (expense_type_id) REFERENCES expense_types (id),
-            FOREIGN KEY (stock_item_id) REFERENCES stock (id),
-            FOREIGN KEY (unit_id) REFERENCES units (id)
-        );
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS writeoffs (
-            id INTEGER PRIMARY KEY,
-            product_id INTEGER, 
-            stock_item_id INTEGER, 
-            unit_id INTEGER,         -- Единица измерения
-    
-            quantity REAL NOT NULL,  -- <-- Изменили на REAL
-            reason TEXT NOT NULL,
-            date TEXT NOT NULL,
-    
-            
-            FOREIGN KEY (product_id) REFERENCES products (id),
-            FOREIGN KEY (stock_item_id) REFERENCES stock (id),
-            FOREIGN KEY (unit_id) REFERENCES units (id),
-
-            CHECK (
-                (product_id IS NOT NULL AND stock_item_id IS NULL) OR 
-                (product_id IS NULL AND stock_item_id IS NOT NULL)
-            )
-        );
-        """
-    ]
-
-    execute_scripts(conn, scripts)
-
-    # 3. Заполнение справочных таблиц
-    cursor = conn.cursor()
-    
-    # Заполнение Units
-    cursor.executemany("INSERT OR IGNORE INTO units (name) VALUES (?)", INITIAL_UNITS)
-    
-    # Заполнение Stock Categories
-    cursor.executemany("INSERT OR IGNORE INTO stock_categories (name) VALUES (?)", INITIAL_STOCK_CATEGORIES)
-    
-    # Заполнение Expense Categories
-    cursor.executemany("INSERT OR IGNORE INTO expense_categories (name) VALUES (?)", INITIAL_EXPENSE_CATEGORIES)
-
-    conn.commit()
+    """
+    Приводит схему БД к актуальной версии.
+    Уже примененные миграции пропускаются, поэтому для готовой БД
+    это один запрос к schema_version.
+    """
+    from sql_model.migrations import migrate
+    migrate(conn)
 
 
 def get_unit_by_name(conn: sqlite3.Connection, name: str) -> Optional[int]:
@@ -0,0 +1,97 @@
+import calendar
+import re
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+# Формат отображаемой даты, который репозитории пишут в текстовые колонки
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+# Форматы, принимаемые в фильтрах (в т.ч. значение <input type="datetime-local">)
+_INPUT_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+_DATE_PREFIX = re.compile(r"^(\d{4})(?:-(\d{2})(?:-(\d{2}))?)?$")
+
+
+def to_epoch(moment: datetime) -> int:
+    """
+    Переводит дату в целое число секунд для индексируемых колонок *_ts.
+
+    Даты в БД хранятся без часового пояса, поэтому время трактуется как UTC -
+    так же, как strftime('%s', date) в SQLite. Значения сравнимы между собой
+    и совпадают с результатом обратного заполнения в миграциях.
+    """
+    return calendar.timegm(moment.timetuple())
+
+
+def parse_date(value: str) -> Tuple[datetime, timedelta]:
+    """
+    Разбирает дату фильтра.
+
+    Returns:
+        Tuple[datetime, timedelta]: Начало периода и его длительность
+        (сутки для даты без времени, минута для даты со временем).
+
+    Raises:
+        ValueError: Если формат даты не распознан.
+    """
+    value = value.strip()
+    for fmt in _INPUT_FORMATS:
+        try:
+            moment = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        step = timedelta(days=1) if fmt == "%Y-%m-%d" else timedelta(minutes=1)
+        return moment, step
+    raise ValueError(f"Неверный формат даты '{value}'. Ожидается ГГГГ-ММ-ДД или ГГГГ-ММ-ДД ЧЧ:ММ.")
+
+
+def date_range(date_from: Optional[str] = None, date_to: Optional[str] = None) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Переводит границы фильтра в полуинтервал [start, end) в секундах.
+    Граница 'до' включительная: '2026-01-31' означает весь день 31 января.
+    """
+    start = end = None
+    if date_from:
+        start = to_epoch(parse_date(date_from)[0])
+    if date_to:
+        moment, step = parse_date(date_to)
+        end = to_epoch(moment + step)
+    return start, end
+
+
+def text_range(date_from: Optional[str] = None, date_to: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    То же, что date_range, но для текстовых колонок дат в формате DATE_FORMAT:
+    строки этого формата сравниваются в хронологическом порядке.
+    """
+    start = end = None
+    if date_from:
+        start = parse_date(date_from)[0].strftime(DATE_FORMAT)
+    if date_to:
+        moment, step = parse_date(date_to)
+        end = (moment + step).strftime(DATE_FORMAT)
+    return start, end
+
+
+def prefix_range(query: str) -> Optional[Tuple[int, int]]:
+    """
+    Распознает в строке поиска год, месяц или день ('2026', '2026-01', '2026-01-15')
+    и возвращает соответствующий полуинтервал [start, end). Иначе None.
+    """
+    match = _DATE_PREFIX.match(query.strip())
+    if not match:
+        return None
+    year, month, day = match.groups()
+    try:
+        if day:
+            start = datetime(int(year), int(month), int(day))
+            end = start + timedelta(days=1)
+        elif month:
+            start = datetime(int(year), int(month), 1)
+            end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+        else:
+            start = datetime(int(year), 1, 1)
+            end = datetime(int(year) + 1, 1, 1)
+    except ValueError:
+        return None
+    return to_epoch(start), to_epoch(end)
@@ -23,6 +23,7 @@ class StockItem:
     quantity: float
     unit_id: int     # Ссылка на ID из таблицы 'units'
     id: Optional[int] = None # ID из БД (PRIMARY KEY)
+    reserved: float = 0.0    # Зарезервировано под ожидающие заказы
 
 @dataclass(frozen=True)
 class Sale:
@@ -34,6 +35,8 @@ class Sale:
     discount : int # percent
     date: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M"))
     id: Optional[int] = None # ID из БД (PRIMARY KEY)
+    date_ts: Optional[int] = None # Дата в секундах: ключ сортировки и фильтров
+    net_amount: Optional[float] = None # Сумма с учетом скидки
 
 @dataclass(frozen=True)
 class ExpenseType:
@@ -127,3 +130,12 @@ class ExpenseItem:
     price_per_unit: float
     total_price: float
     id: Optional[int] = None
+
+@dataclass
+class PeriodSummary:
+    """Итоги закрытого месяца."""
+    period: str  # 'ГГГГ-ММ'
+    income: float
+    expenses: float
+    writeoff_losses: float
+    closed_at: str
@@ -0,0 +1,549 @@
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from sql_model.database import (
+    INITIAL_UNITS, INITIAL_STOCK_CATEGORIES, INITIAL_EXPENSE_CATEGORIES
+)
+from sql_model import rollup
+
+# --- Версионированные миграции схемы ---
+#
+# Каждая миграция применяется ровно один раз; номер последней примененной
+# хранится в таблице schema_version. Новые таблицы, колонки и индексы
+# добавляются только новыми шагами в конец списка MIGRATIONS.
+# Шаги не делают commit сами: транзакцией управляет migrate().
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Один шаг изменения схемы."""
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _v1_initial_schema(conn: sqlite3.Connection):
+    """Создает все базовые таблицы и заполняет справочники."""
+
+    # 1. Справочные таблицы
+    scripts = [
+        """
+        CREATE TABLE IF NOT EXISTS units (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS stock_categories (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS expense_categories (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        """,
+    ]
+
+    # 2. Основные таблицы
+    scripts += [
+        """
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            price INTEGER NOT NULL
+        );
+        """,
+        # Таблица для связи Продукт-Ингредиент
+        """
+        CREATE TABLE IF NOT EXISTS product_stock (
+            product_id INTEGER NOT NULL,
+            stock_id INTEGER NOT NULL,
+            quantity REAL NOT NULL,
+            PRIMARY KEY (product_id, stock_id),
+            FOREIGN KEY (product_id) REFERENCES products (id) ON DELETE CASCADE,
+            FOREIGN KEY (stock_id) REFERENCES stock (id) ON DELETE RESTRICT
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS stock (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            category_id INTEGER NOT NULL,
+            quantity REAL NOT NULL,
+            unit_id INTEGER NOT NULL,
+            FOREIGN KEY (category_id) REFERENCES stock_categories (id),
+            FOREIGN KEY (unit_id) REFERENCES units (id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS expense_types (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            default_price INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            stock BOOLEAN NOT NULL DEFAULT 0,
+            FOREIGN KEY (category_id) REFERENCES expense_categories (id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS suppliers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            contact_person TEXT,
+            phone TEXT,
+            email TEXT,
+            address TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS sales (
+            id INTEGER PRIMARY KEY,
+            product_id INTEGER NOT NULL,
+            product_name TEXT NOT NULL,
+            price INTEGER NOT NULL,
+            quantity REAL NOT NULL,
+            discount INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            FOREIGN KEY (product_id) REFERENCES products (id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_date TEXT NOT NULL,
+            completion_date TEXT,
+            status TEXT NOT NULL CHECK(status IN ('pending', 'completed')),
+            additional_info TEXT
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            product_name TEXT NOT NULL,
+            quantity REAL NOT NULL,
+            price INTEGER NOT NULL,
+            FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE,
+            FOREIGN KEY (product_id) REFERENCES products (id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS expense_documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            supplier_id INTEGER NOT NULL,
+            total_amount INTEGER NOT NULL,
+            comment TEXT,
+            FOREIGN KEY (supplier_id) REFERENCES suppliers (id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS expense_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            document_id INTEGER NOT NULL,
+            expense_type_id INTEGER NOT NULL,
+            stock_item_id INTEGER,
+            unit_id INTEGER NOT NULL,
+            quantity REAL NOT NULL,
+            price_per_unit INTEGER NOT NULL,
+            total_price INTEGER NOT NULL,
+            FOREIGN KEY (document_id) REFERENCES expense_documents (id) ON DELETE CASCADE,
+            FOREIGN KEY (expense_type_id) REFERENCES expense_types (id),
+            FOREIGN KEY (stock_item_id) REFERENCES stock (id),
+            FOREIGN KEY (unit_id) REFERENCES units (id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS writeoffs (
+            id INTEGER PRIMARY KEY,
+            product_id INTEGER, 
+            stock_item_id INTEGER, 
+            unit_id INTEGER,         -- Единица измерения
+    
+            quantity REAL NOT NULL,  -- <-- Изменили на REAL
+            reason TEXT NOT NULL,
+            date TEXT NOT NULL,
+    
+            
+            FOREIGN KEY (product_id) REFERENCES products (id),
+            FOREIGN KEY (stock_item_id) REFERENCES stock (id),
+            FOREIGN KEY (unit_id) REFERENCES units (id),
+
+            CHECK (
+                (product_id IS NOT NULL AND stock_item_id IS NULL) OR 
+                (product_id IS NULL AND stock_item_id IS NOT NULL)
+            )
+        );
+        """
+    ]
+
+    cursor = conn.cursor()
+    for script in scripts:
+        cursor.execute(script)
+
+    # 3. Заполнение справочных таблиц
+    
+    # Заполнение Units
+    cursor.executemany("INSERT OR IGNORE INTO units (name) VALUES (?)", INITIAL_UNITS)
+    
+    # Заполнение Stock Categories
+    cursor.executemany("INSERT OR IGNORE INTO stock_categories (name) VALUES (?)", INITIAL_STOCK_CATEGORIES)
+    
+    # Заполнение Expense Categories
+    cursor.executemany("INSERT OR IGNORE INTO expense_categories (name) VALUES (?)", INITIAL_EXPENSE_CATEGORIES)
+
+
+# Вторичные индексы для горячих путей запросов: имя -> определение.
+# Проверяются тестами EXPLAIN QUERY PLAN (tests/test_query_plans.py).
+_V2_INDEXES: Dict[str, str] = {
+    'idx_sales_date': "sales (date)",
+    'idx_sales_product_id': "sales (product_id)",
+    'idx_order_items_order_id': "order_items (order_id)",
+    'idx_orders_status_completion': "orders (status, completion_date)",
+    'idx_orders_created_date': "orders (created_date)",
+    'idx_expense_items_document_id': "expense_items (document_id)",
+    'idx_expense_documents_date': "expense_documents (date)",
+    'idx_expense_documents_supplier_id': "expense_documents (supplier_id)",
+    'idx_writeoffs_date': "writeoffs (date)",
+    'idx_product_stock_stock_id': "product_stock (stock_id)",
+}
+
+
+def _v2_secondary_indexes(conn: sqlite3.Connection):
+    """Создает вторичные индексы для фильтров и сортировок репозиториев."""
+    for name, definition in _V2_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+_V3_INDEXES: Dict[str, str] = {
+    'idx_sales_date_ts': "sales (date_ts)",
+    'idx_sales_product_date_ts': "sales (product_id, date_ts)",
+}
+
+
+def _v3_sales_date_ts(conn: sqlite3.Connection):
+    """
+    Добавляет в sales дату продажи в секундах (date_ts) рядом с текстовой date.
+    Фильтры по периоду и сортировка идут по date_ts через индексы; индексы по
+    текстовой дате и по одному product_id больше не нужны.
+    """
+    conn.execute("ALTER TABLE sales ADD COLUMN date_ts INTEGER")
+    conn.execute("UPDATE sales SET date_ts = CAST(strftime('%s', date) AS INTEGER)")
+    conn.execute("DROP INDEX IF EXISTS idx_sales_date")
+    conn.execute("DROP INDEX IF EXISTS idx_sales_product_id")
+    for name, definition in _V3_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+_V4_INDEXES: Dict[str, str] = {
+    'idx_orders_status_created': "orders (status, created_date)",
+}
+
+
+def _v4_orders_status_created(conn: sqlite3.Connection):
+    """
+    Список заказов сортируется по статусу (сначала ожидающие), затем по дате
+    создания. Составной индекс заменяет индекс по одной дате создания.
+    """
+    conn.execute("DROP INDEX IF EXISTS idx_orders_created_date")
+    for name, definition in _V4_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+# Справочники, изменения которых отслеживает счетчик reference_version
+_REFERENCE_TABLES = ('units', 'stock_categories', 'expense_categories', 'expense_types')
+
+
+def _v5_reference_version(conn: sqlite3.Connection):
+    """
+    Счетчик изменений справочников для кэша sql_model.reference.
+    Триггеры увеличивают его при любой вставке, изменении или удалении,
+    поэтому другой процесс узнает об изменении одним чтением строки.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS reference_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute("INSERT OR IGNORE INTO reference_version (id, version) VALUES (1, 0)")
+    for table in _REFERENCE_TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_reference_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE reference_version SET version = version + 1 WHERE id = 1;
+                END
+                """
+            )
+
+
+def _v6_catalog_version(conn: sqlite3.Connection):
+    """
+    Изменения продуктов и рецептов тоже увеличивают счетчик reference_version,
+    чтобы кэш рецептов других процессов узнавал о них (sql_model.recipes).
+    """
+    for table in ('products', 'product_stock'):
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_reference_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE reference_version SET version = version + 1 WHERE id = 1;
+                END
+                """
+            )
+
+
+def _v7_stock_reservations(conn: sqlite3.Connection):
+    """
+    Резервирование запасов под ожидающие заказы.
+    stock.reserved - сумма резервов по запасу, order_reservations - резерв
+    каждого заказа по запасам. Резервы ведутся инкрементно при добавлении,
+    выполнении и удалении заказа; существующие ожидающие заказы
+    резервируются по текущим рецептам.
+    """
+    conn.execute("ALTER TABLE stock ADD COLUMN reserved REAL NOT NULL DEFAULT 0")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS order_reservations (
+            order_id INTEGER NOT NULL,
+            stock_id INTEGER NOT NULL,
+            quantity REAL NOT NULL,
+            PRIMARY KEY (order_id, stock_id),
+            FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE,
+            FOREIGN KEY (stock_id) REFERENCES stock (id)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO order_reservations (order_id, stock_id, quantity)
+        SELECT oi.order_id, ps.stock_id, SUM(oi.quantity * ps.quantity)
+        FROM orders o
+        JOIN order_items oi ON oi.order_id = o.id
+        JOIN product_stock ps ON ps.product_id = oi.product_id
+        WHERE o.status = 'pending'
+        GROUP BY oi.order_id, ps.stock_id
+        """
+    )
+    conn.execute(
+        """
+        UPDATE stock SET reserved = r.quantity
+        FROM (SELECT stock_id, SUM(quantity) AS quantity FROM order_reservations GROUP BY stock_id) AS r
+        WHERE stock.id = r.stock_id
+        """
+    )
+
+
+# Формула выручки строки продажи до появления колонки net_amount (миграция 9)
+_V8_REVENUE = "{row}.price * {row}.quantity * (1 - {row}.discount / 100.0)"
+
+
+def _v8_daily_sales_summary(conn: sqlite3.Connection):
+    """
+    Дневная сводка продаж по продуктам, которую ведут триггеры на sales
+    (sql_model.rollup). Сводка заполняется по уже записанным продажам.
+    """
+    rollup.create_summary(conn, _V8_REVENUE)
+    rollup.rebuild(conn, _V8_REVENUE)
+
+
+_V9_INDEXES: Dict[str, str] = {
+    'idx_sales_date_ts_net_amount': "sales (date_ts, id, net_amount)",
+}
+
+
+def _v9_sales_net_amount(conn: sqlite3.Connection):
+    """
+    Сумма продажи с учетом скидки в колонке sales.net_amount.
+
+    Генерируемая колонка не подходит: SQLite добавляет в существующую таблицу
+    только VIRTUAL-колонки и не читает их значения из индекса, а суммы за
+    период должны считаться по покрывающему индексу (date_ts, id, net_amount)
+    без чтения таблицы. Поэтому колонка заполняется при вставке по формуле
+    rollup.NET_AMOUNT и пересчитывается триггером при изменении цены,
+    количества или скидки. Индекс заменяет idx_sales_date_ts: тот же порядок
+    (date_ts, id) для списков продаж. Триггеры дневной сводки пересоздаются
+    поверх новой колонки.
+    """
+    conn.execute("ALTER TABLE sales ADD COLUMN net_amount REAL")
+    conn.execute(f"UPDATE sales SET net_amount = {rollup.NET_AMOUNT.format(row='sales')}")
+    conn.execute("DROP INDEX IF EXISTS idx_sales_date_ts")
+    for name, definition in _V9_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+    rollup.create_net_amount_trigger(conn)
+    rollup.drop_triggers(conn)
+    rollup.create_triggers(conn)
+
+
+# Месяц строки ('ГГГГ-ММ') в таблицах, которые входят в итоги периода.
+# Продажа относится к дню дневной сводки, позиция расхода - к дате документа
+_PERIOD_MONTH: Dict[str, str] = {
+    'sales': f"substr({rollup.SUMMARY_DAY}, 1, 7)",
+    'expense_documents': "substr({row}.date, 1, 7)",
+    'expense_items': "(SELECT substr(date, 1, 7) FROM expense_documents WHERE id = {row}.document_id)",
+    'writeoffs': "substr({row}.date, 1, 7)",
+}
+
+
+def _v10_period_summary(conn: sqlite3.Connection):
+    """
+    Закрытие периодов (месяцев).
+
+    period_summary хранит итоги закрытого месяца: выручку, расходы и потери
+    от списаний. Закрытые месяцы образуют непрерывный префикс истории, его
+    граница - MAX(period). Триггеры запрещают вставку, изменение и удаление
+    продаж, документов расхода, их позиций и списаний в закрытых месяцах,
+    поэтому снимки не расходятся с данными.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS period_summary (
+            period TEXT PRIMARY KEY,
+            income REAL NOT NULL,
+            expenses REAL NOT NULL,
+            writeoff_losses REAL NOT NULL,
+            closed_at TEXT NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    for table, month in _PERIOD_MONTH.items():
+        for event, rows in (('INSERT', ('NEW',)), ('UPDATE', ('OLD', 'NEW')), ('DELETE', ('OLD',))):
+            condition = " OR ".join(
+                f"{month.format(row=row)} <= (SELECT MAX(period) FROM period_summary)" for row in rows
+            )
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_closed_period
+                BEFORE {event} ON {table}
+                WHEN {condition}
+                BEGIN
+                    SELECT RAISE(ABORT, 'Период закрыт: изменения задним числом запрещены');
+                END
+                """
+            )
+
+
+def _v11_sale_product_names(conn: sqlite3.Connection):
+    """
+    Названия продуктов, под которыми они продавались (sales.product_name).
+
+    Продажа хранит название на момент продажи, и поиск продаж по названию
+    должен находить его и после переименования продукта. Поиск подстроки по
+    самой sales - полный скан; таблица пар (название, продукт) маленькая,
+    ее ведет триггер на вставку и изменение продаж. Пары не удаляются:
+    лишняя пара только расширяет список кандидатов, а продажи все равно
+    фильтруются по product_name.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sale_product_names (
+            product_name TEXT NOT NULL,
+            product_id INTEGER NOT NULL,
+            PRIMARY KEY (product_name, product_id)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO sale_product_names (product_name, product_id)
+        SELECT DISTINCT product_name, product_id FROM sales
+        """
+    )
+    for event in ('INSERT', 'UPDATE OF product_name, product_id'):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_sales_{event.split()[0].lower()}_product_name
+            AFTER {event} ON sales
+            BEGIN
+                INSERT OR IGNORE INTO sale_product_names (product_name, product_id)
+                VALUES (NEW.product_name, NEW.product_id);
+            END
+            """
+        )
+
+
+# Индексы, удаленные последующими миграциями
+_DROPPED_INDEXES = ('idx_sales_date', 'idx_sales_product_id', 'idx_orders_created_date', 'idx_sales_date_ts')
+
+# Индексы, которые должны существовать в актуальной схеме
+MANAGED_INDEXES: Dict[str, str] = {
+    name: definition
+    for name, definition in {**_V2_INDEXES, **_V3_INDEXES, **_V4_INDEXES, **_V9_INDEXES}.items()
+    if name not in _DROPPED_INDEXES
+}
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial schema", _v1_initial_schema),
+    Migration(2, "secondary indexes", _v2_secondary_indexes),
+    Migration(3, "sales date_ts", _v3_sales_date_ts),
+    Migration(4, "orders status/created index", _v4_orders_status_created),
+    Migration(5, "reference data version", _v5_reference_version),
+    Migration(6, "catalog version triggers", _v6_catalog_version),
+    Migration(7, "stock reservations", _v7_stock_reservations),
+    Migration(8, "daily sales summary", _v8_daily_sales_summary),
+    Migration(9, "sales net_amount", _v9_sales_net_amount),
+    Migration(10, "period summary", _v10_period_summary),
+    Migration(11, "sale product names", _v11_sale_product_names),
+]
+
+
+def _ensure_version_table(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.commit()
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Возвращает номер последней примененной миграции (0 для пустой БД)."""
+    _ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn: sqlite3.Connection, migrations: List[Migration] = MIGRATIONS) -> List[int]:
+    """
+    Применяет по порядку все миграции, которых еще нет в schema_version.
+    Каждый шаг выполняется в отдельной транзакции вместе с записью о версии.
+
+    Returns:
+        List[int]: Номера примененных миграций (пустой, если схема актуальна).
+    """
+    applied = []
+    version = current_version(conn)
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= version:
+            continue
+        try:
+            conn.execute("BEGIN")
+            migration.apply(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                (migration.version, migration.name, datetime.now().strftime("%Y-%m-%d %H:%M"))
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Ошибка миграции {migration.version} ({migration.name}): {e}") from e
+        applied.append(migration.version)
+    return applied
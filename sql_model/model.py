@@ -1,7 +1,12 @@
 import sqlite3
+from typing import Optional
 
 # Импорт модулей
-from sql_model.database import create_connection, initialize_db
+from sql_model.database import create_connection, get_db_path, initialize_db
+from sql_model.connection import ManagedConnection
+from sql_model.reference import ReferenceCache, ReferenceData
+from sql_model.recipes import RecipeBook, RecipeCache
+from sql_model.bom import Bom, BomMatrix
 
 from repositories.products import ProductsRepository
 from repositories.stock import StockRepository
@@ -11,6 +16,8 @@ from repositories.write_offs import WriteOffsRepository
 from repositories.suppliers import SuppliersRepository
 from repositories.orders import OrdersRepository
 from repositories.utils import UtilsRepository
+from repositories.reports import ReportsRepository
+from repositories.periods import PeriodsRepository
 
 from repositories.expense_documents import ExpenseDocumentsRepository
 
@@ -19,31 +26,64 @@ class SQLiteModel:
     Класс Модели для управления пекарней, использующий SQLite в качестве хранилища.
     Инкапсулирует соединения и предоставляет доступ к репозиториям.
     """
+
+    # Методы, возвращающие репозитории
+    REPOSITORIES = (
+        'utils', 'products', 'stock', 'sales', 'expense_types',
+        'writeoffs', 'suppliers', 'orders', 'expense_documents', 'reports', 'periods',
+    )
     
-    def __init__(self, db_file: str = 'bakery_management.db'):
+    def __init__(self, db_file: Optional[str] = None, conn: Optional[sqlite3.Connection] = None):
         """
         Инициализирует соединение с БД и репозитории.
+        Без db_file используется файл из get_db_path() (переменная BAKERY_DB_PATH).
         Если файл БД не существует, он будет создан и инициализирован.
+        Если передано готовое соединение (например, из пула), оно используется
+        как есть: схема считается уже инициализированной.
         """
-        self.db_file = db_file
-        self._conn: sqlite3.Connection = create_connection(self.db_file)
-        initialize_db(self._conn) # Создает таблицы и заполняет справочники
+        self.db_file = db_file or get_db_path()
+        if conn is None:
+            conn = create_connection(self.db_file)
+            initialize_db(conn) # Создает таблицы и заполняет справочники
+        self._conn = ManagedConnection(conn)
+        # Кэш справочников общий для всех моделей процесса на одном файле БД
+        self.reference = ReferenceData(ReferenceCache.for_database(self.db_file), self._conn)
+        self.bom = Bom(BomMatrix.for_database(self.db_file), self._conn)
+        self.recipes = RecipeBook(RecipeCache.for_database(self.db_file), self._conn, self.bom)
+        # Откат мог оставить в общих кэшах прочитанные внутри него изменения
+        self._conn.on_rollback(self.reference.invalidate)
+        self._conn.on_rollback(self.recipes.invalidate)
+        self._conn.on_rollback(self.bom.invalidate)
         
         # Инициализация репозиториев
         self._stock_repo = StockRepository(self._conn, self)
-        self._expense_types_repo = ExpenseTypesRepository(self._conn)
+        self._expense_types_repo = ExpenseTypesRepository(self._conn, self.reference)
         self._products_repo = ProductsRepository(self._conn, self)
         self._sales_repo = SalesRepository(self._conn, self)
-        self._utils_repo = UtilsRepository(self._conn)
+        self._utils_repo = UtilsRepository(self._conn, self.reference)
         self._write_offs_repo = WriteOffsRepository(self._conn, self)
         self._suppliers_repo = SuppliersRepository(self._conn)
         self._orders_repo = OrdersRepository(self._conn, self)
         self._expense_documents_repo = ExpenseDocumentsRepository(self._conn, self)
+        self._reports_repo = ReportsRepository(self._conn)
+        self._periods_repo = PeriodsRepository(self._conn, self)
 
     def close(self):
         """Закрывает соединение с базой данных."""
         if self._conn:
             self._conn.close()
+
+    def transaction(self):
+        """
+        Единица работы для нескольких вызовов репозиториев: все изменения
+        фиксируются одним commit или откатываются целиком. Вложенные блоки
+        работают под точками сохранения.
+
+            with model.transaction():
+                model.sales().add('Хлеб', 100, 1, 0)
+                model.writeoffs().add('Мука', 'stock', 1, 'Брак')
+        """
+        return self._conn.transaction()
             
     # --- Методы, возвращающие репозитории (интерфейс, как в старой модели) ---
     
@@ -73,6 +113,12 @@ class SQLiteModel:
 
     def expense_documents(self) -> ExpenseDocumentsRepository:
         return self._expense_documents_repo
+
+    def reports(self) -> ReportsRepository:
+        return self._reports_repo
+
+    def periods(self) -> PeriodsRepository:
+        return self._periods_repo
     
     def request(self, query):
         cursor = self._conn.cursor()
@@ -88,24 +134,13 @@ class SQLiteModel:
 
     def calculate_income(self) -> float:
         """Рассчитывает общий доход от продаж."""
-        cursor = self._conn.cursor()        
-        # Доход = Сумма (Цена * Количество * (1 - Скидка/100))
-        cursor.execute(
-            """
-            SELECT SUM(price * quantity * (1 - CAST(discount AS REAL) / 100)) 
-            FROM sales
-            """
-        )
-        result = cursor.fetchone()[0]
-        return result if result is not None else 0.0
+        # Доход = итоги закрытых месяцев + дневная сводка продаж открытого периода
+        return self.periods().income()
 
     def calculate_expenses(self) -> float:
         """Рассчитывает общие расходы."""
-        cursor = self._conn.cursor()
-        # Расходы = Сумма total_amount из expense_documents
-        cursor.execute("SELECT SUM(total_amount) FROM expense_documents")
-        result = cursor.fetchone()[0]
-        return result if result is not None else 0.0
+        # Расходы = итоги закрытых месяцев + total_amount документов открытого периода
+        return self.periods().expenses()
 
     def calculate_profit(self) -> float:
         """Рассчитывает прибыль."""
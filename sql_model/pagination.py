@@ -0,0 +1,73 @@
+from typing import Any, Optional, Sequence, Tuple, Union
+
+# Размер страницы списков по умолчанию и верхняя граница для клиентов API
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Разделитель частей составного ключа сортировки в курсоре
+KEY_SEPARATOR = '|'
+
+# --- Постраничная выборка по ключу (keyset pagination) ---
+#
+# Списки сортируются по ключу (дате) и по id в одном направлении: при
+# совпадении ключа (строки одной минуты) новые строки идут первыми в списках
+# по убыванию. Курсор хранит ключ и id последней показанной строки; следующая
+# страница начинается строго после нее. В отличие от OFFSET, запрос идет по индексу
+# ключа сразу к нужной позиции, поэтому время страницы не зависит от объема
+# истории, а вставка новых строк не сдвигает уже показанные.
+
+
+def encode_cursor(key: Any, row_id: int) -> str:
+    """Формирует курсор '<id>:<ключ>' для строки."""
+    return f"{row_id}:{key}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Разбирает курсор страницы.
+
+    Returns:
+        Tuple[str, int]: Ключ сортировки (строкой) и id строки.
+
+    Raises:
+        ValueError: Если курсор поврежден.
+    """
+    row_id, sep, key = cursor.partition(':')
+    if not sep or not row_id.isdigit():
+        raise ValueError(f"Неверный курсор страницы '{cursor}'.")
+    return key, int(row_id)
+
+
+def keyset_condition(column: str, descending: bool = True, id_column: str = 'id') -> str:
+    """
+    Условие 'после курсора' для ORDER BY column DESC, id DESC (или ASC, ASC).
+    Обе части сравниваются в одном направлении, поэтому условие и сортировку
+    покрывает один составной индекс (column, id).
+    Параметры подстановки: (ключ, ключ, id).
+    """
+    op = '<' if descending else '>'
+    return f"({column} {op} ? OR ({column} = ? AND {id_column} {op} ?))"
+
+
+def split_key(key: str, parts: int) -> Tuple[str, ...]:
+    """Разбирает составной ключ курсора на заданное число частей."""
+    values = tuple(key.split(KEY_SEPARATOR, parts - 1))
+    if len(values) != parts:
+        raise ValueError(f"Неверный ключ курсора '{key}'.")
+    return values
+
+
+def next_cursor(items: Sequence[Any], limit: Optional[int],
+                key: Union[str, Sequence[str]]) -> Optional[str]:
+    """
+    Курсор следующей страницы или None, если страница последняя.
+    Строки могут быть объектами или словарями; key - имя поля ключа сортировки
+    или несколько имен для составного ключа.
+    """
+    if not limit or len(items) < limit:
+        return None
+    last = items[-1]
+    names = (key,) if isinstance(key, str) else key
+    field = (lambda name: last[name]) if isinstance(last, dict) else (lambda name: getattr(last, name))
+    value = KEY_SEPARATOR.join(str(field(name)) for name in names)
+    return encode_cursor(value, field('id'))
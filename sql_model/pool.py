@@ -0,0 +1,236 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+
+from sql_model.database import PERFORMANCE_PROFILES, create_connection, get_db_path, get_profile_name, read_pragmas
+from sql_model.migrations import migrate
+from sql_model.model import SQLiteModel
+from sql_model.async_model import AsyncModel, Operation
+from sql_model.writer import DEFAULT_GROUP_WINDOW, WriteExecutor, WriteQueueModel
+
+# Размер пула читателей по умолчанию
+DEFAULT_READERS = 4
+
+# Сколько секунд ждать свободное соединение, прежде чем сдаться
+DEFAULT_CHECKOUT_TIMEOUT = 30.0
+
+
+class PoolTimeoutError(RuntimeError):
+    """Не удалось получить соединение из пула за отведенное время."""
+
+
+class ConnectionPool:
+    """
+    Пул долгоживущих соединений SQLite, принадлежащий приложению.
+
+    Держит ограниченный набор соединений-читателей и одно соединение-писатель.
+    Каждое соединение обернуто в собственный SQLiteModel, поэтому репозитории
+    создаются один раз на соединение, а не на каждый запрос.
+    Соединением-писателем владеет WriteExecutor: все изменения проходят через
+    одну очередь и фиксируются групповыми транзакциями.
+    Для async-кода чтение выполняется в ограниченном пуле потоков БД
+    (по одному потоку на читателя), запись - в очереди писателя.
+    Миграции схемы применяются один раз при открытии пула.
+    Без db_file пул открывает файл из BAKERY_DB_PATH (см. get_db_path).
+    """
+
+    def __init__(self, db_file: Optional[str] = None, readers: int = DEFAULT_READERS,
+                 timeout: float = DEFAULT_CHECKOUT_TIMEOUT, profile: Optional[str] = None,
+                 group_window: float = DEFAULT_GROUP_WINDOW):
+        if readers < 1:
+            raise ValueError("Пул должен содержать хотя бы одно соединение-читатель.")
+        self.db_file = db_file or get_db_path()
+        self.readers = readers
+        self.timeout = timeout
+        self.profile = profile or get_profile_name()
+        self.group_window = group_window
+
+        self._readers: "queue.Queue[SQLiteModel]" = queue.Queue(maxsize=readers)
+        self._write_executor: Optional[WriteExecutor] = None
+        self._db_threads: Optional[ThreadPoolExecutor] = None
+        self._async_reader = AsyncModel(self.read)
+        self._async_writer = AsyncModel(self.write)
+        self._models: List[SQLiteModel] = []
+        self._opened = False
+
+        self._lock = threading.Lock()
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'checkout_time_total': 0.0,
+            'checkout_time_max': 0.0,
+        }
+
+    # --- Жизненный цикл ---
+
+    def open(self):
+        """Открывает соединения и один раз применяет недостающие миграции схемы."""
+        if self._opened:
+            return
+
+        writer_conn = create_connection(self.db_file, self.profile)
+        migrate(writer_conn)
+        writer = SQLiteModel(self.db_file, conn=writer_conn)
+        writer.reference.snapshot()  # загружаем справочники до первого запроса
+        writer.bom.rows()            # и матрицу рецептов
+        self._models.append(writer)
+        self._write_executor = WriteExecutor(writer, self.group_window)
+        self._write_executor.start()
+
+        for _ in range(self.readers):
+            reader = SQLiteModel(self.db_file, conn=create_connection(self.db_file, self.profile))
+            self._models.append(reader)
+            self._readers.put(reader)
+
+        self._db_threads = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix="db-reader")
+        self._opened = True
+
+    def close(self):
+        """Закрывает все соединения пула."""
+        if self._db_threads is not None:
+            self._db_threads.shutdown(wait=True)
+            self._db_threads = None
+        if self._write_executor is not None:
+            self._write_executor.stop()
+            self._write_executor = None
+        for model in self._models:
+            model.close()
+        self._models = []
+        self._readers = queue.Queue(maxsize=self.readers)
+        self._opened = False
+
+    # --- Выдача соединений ---
+
+    @contextmanager
+    def reader(self) -> Iterator[SQLiteModel]:
+        """Выдает модель на соединении-читателе на время блока with."""
+        with self._checkout(self._readers) as model:
+            yield model
+
+    @contextmanager
+    def writer(self) -> Iterator[WriteQueueModel]:
+        """
+        Выдает модель для изменения данных на время блока with.
+        Вызовы ее репозиториев выполняются в очереди единственного писателя,
+        поэтому эксклюзивная выдача не нужна.
+        """
+        if not self._opened:
+            raise RuntimeError("Пул соединений не открыт.")
+        yield self._write_executor.model()
+
+    def write_executor(self) -> WriteExecutor:
+        """Возвращает писателя БД для постановки операций напрямую."""
+        if not self._opened:
+            raise RuntimeError("Пул соединений не открыт.")
+        return self._write_executor
+
+    # --- Асинхронный доступ ---
+
+    async def read(self, operation: Operation) -> Any:
+        """Выполняет операцию на соединении-читателе в пуле потоков БД."""
+        if not self._opened:
+            raise RuntimeError("Пул соединений не открыт.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_threads, self._read_sync, operation)
+
+    async def write(self, operation: Operation) -> Any:
+        """Ставит операцию в очередь писателя и ожидает ее без блокировки цикла событий."""
+        return await asyncio.wrap_future(self.write_executor().submit(operation))
+
+    def async_model(self, write: bool = False) -> AsyncModel:
+        """Возвращает асинхронный фасад модели для чтения или для записи."""
+        return self._async_writer if write else self._async_reader
+
+    def _read_sync(self, operation: Operation) -> Any:
+        with self.reader() as model:
+            return operation(model)
+
+    @contextmanager
+    def _checkout(self, source: "queue.Queue[SQLiteModel]") -> Iterator[SQLiteModel]:
+        if not self._opened:
+            raise RuntimeError("Пул соединений не открыт.")
+
+        start = time.perf_counter()
+        waited = False
+        try:
+            model = source.get_nowait()
+        except queue.Empty:
+            waited = True
+            try:
+                model = source.get(timeout=self.timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                raise PoolTimeoutError(
+                    f"Нет свободного соединения с БД в течение {self.timeout} с."
+                )
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waits'] += 1
+            self._stats['checkout_time_total'] += elapsed
+            self._stats['checkout_time_max'] = max(self._stats['checkout_time_max'], elapsed)
+
+        try:
+            yield model
+        finally:
+            # Не возвращаем в пул соединение с незавершенной транзакцией
+            if model._conn.in_transaction:
+                model._conn.rollback()
+            source.put(model)
+
+    # --- Диагностика ---
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику пула: размер, ожидания и задержку выдачи читателей,
+        а также метрики очереди писателя.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        checkouts = stats['checkouts']
+        return {
+            'db_file': self.db_file,
+            'profile': self.profile,
+            'size': self.readers + 1,
+            'readers': self.readers,
+            'readers_available': self._readers.qsize(),
+            'checkouts': checkouts,
+            'waits': stats['waits'],
+            'timeouts': stats['timeouts'],
+            'checkout_ms_avg': (stats['checkout_time_total'] / checkouts * 1000) if checkouts else 0.0,
+            'checkout_ms_max': stats['checkout_time_max'] * 1000,
+            'writer': self._write_executor.stats() if self._write_executor else None,
+        }
+
+    def reference_stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов кэша справочников."""
+        with self.reader() as model:
+            return model.reference.cache.stats()
+
+    def recipe_stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов кэша рецептов."""
+        with self.reader() as model:
+            return model.recipes.cache.stats()
+
+    def bom_stats(self) -> Dict[str, Any]:
+        """Счетчики и размер матрицы рецептов."""
+        with self.reader() as model:
+            return model.bom.matrix.stats()
+
+    def db_settings(self) -> Dict[str, Any]:
+        """Возвращает активный профиль, его настройки и фактические значения PRAGMA."""
+        with self.reader() as model:
+            pragmas = read_pragmas(model._conn)
+        return {
+            'profile': self.profile,
+            'settings': PERFORMANCE_PROFILES[self.profile],
+            'pragmas': pragmas,
+        }
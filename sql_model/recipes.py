@@ -0,0 +1,128 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sql_model.bom import Bom
+from sql_model.reference import ChangeDetector, SharedCache, read_version
+
+# --- Кэш рецептов ---
+#
+# Продажа, списание продукта и выполнение заказа для каждой строки искали
+# продукт по имени и читали его рецепт JOIN-запросом. Кэш хранит продукты
+# каталога (id, имя, цена) и загружает каждый одним запросом при первом
+# обращении. Строки рецепта (кортежи id запасов и количеств на единицу)
+# берутся из матрицы рецептов (sql_model.bom) - единственной копии
+# product_stock в памяти, поэтому рецепт и матрица не расходятся.
+#
+# ProductsRepository сбрасывает кэш после фиксации добавления, изменения и
+# удаления продукта (ManagedConnection.after_commit), а откат - через
+# ManagedConnection.on_rollback. Изменения из других процессов видны по счетчику reference_version:
+# миграция 6 увеличивает его при изменении products и product_stock.
+
+
+@dataclass(frozen=True)
+class Recipe:
+    """Продукт и его рецепт: запасы и их количество на одну единицу продукта."""
+    product_id: int
+    name: str
+    price: int
+    stock_ids: Tuple[int, ...]
+    quantities: Tuple[float, ...]
+
+    @property
+    def empty(self) -> bool:
+        return not self.stock_ids
+
+
+# Продукт каталога в кэше: (id, имя, цена)
+Entry = Tuple[int, str, int]
+
+
+class RecipeCache(SharedCache):
+    """Продукты каталога одной БД, общие для всех соединений процесса."""
+
+    def __init__(self):
+        super().__init__()
+        self._recipes: Dict[int, Entry] = {}
+        self._ids: Dict[str, int] = {}
+        self._version: Optional[int] = None
+
+    def get(self, conn: Any, name: str, check_version: bool) -> Optional[Entry]:
+        """
+        Возвращает продукт по имени или None, если продукта нет.
+        check_version - соединение видело изменения БД и нужно сверить счетчик.
+        """
+        return self._get(conn, check_version, lambda: self._recipes.get(self._ids.get(name)), "p.name = ?", name)
+
+    def by_id(self, conn: Any, product_id: int, check_version: bool) -> Optional[Entry]:
+        """Возвращает продукт по ID или None, если продукта нет."""
+        return self._get(conn, check_version, lambda: self._recipes.get(product_id), "p.id = ?", product_id)
+
+    def _get(self, conn: Any, check_version: bool, cached: Callable[[], Optional[Entry]],
+             condition: str, value: Any) -> Optional[Entry]:
+        if check_version:
+            self._count('version_checks')
+            version = read_version(conn)
+            with self._lock:
+                if version != self._version:
+                    self._recipes.clear()
+                    self._ids.clear()
+                    self._version = version
+
+        with self._lock:
+            entry = cached()
+            self._stats['hits' if entry else 'misses'] += 1
+        if entry:
+            return entry
+
+        entry = self._load(conn, condition, value)
+        if entry:
+            with self._lock:
+                self._recipes[entry[0]] = entry
+                self._ids[entry[1]] = entry[0]
+        return entry
+
+    @staticmethod
+    def _load(conn: Any, condition: str, value: Any) -> Optional[Entry]:
+        # Продукт ищется по первичному ключу или уникальному индексу имени
+        row = conn.execute(f"SELECT p.id, p.name, p.price FROM products p WHERE {condition}", (value,)).fetchone()
+        return (row[0], row[1], row[2]) if row else None
+
+    def invalidate(self):
+        """Сбрасывает все продукты после изменения каталога."""
+        with self._lock:
+            self._recipes.clear()
+            self._ids.clear()
+            self._version = None
+            self._stats['invalidations'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._lock:
+            stats['size'] = len(self._recipes)
+        return stats
+
+
+class RecipeBook:
+    """Доступ одного соединения к рецептам: продукт из кэша, строки из матрицы рецептов."""
+
+    def __init__(self, cache: RecipeCache, conn: Any, bom: Bom):
+        self.cache = cache
+        self._conn = conn
+        self._bom = bom
+        self._changes = ChangeDetector(conn)
+
+    def get(self, name: str) -> Optional[Recipe]:
+        return self._recipe(self.cache.get(self._conn, name, check_version=self._changes.changed()))
+
+    def by_id(self, product_id: int) -> Optional[Recipe]:
+        return self._recipe(self.cache.by_id(self._conn, product_id, check_version=self._changes.changed()))
+
+    def _recipe(self, entry: Optional[Entry]) -> Optional[Recipe]:
+        if entry is None:
+            return None
+        product_id, name, price = entry
+        stock_ids, quantities = self._bom.rows().get(product_id, ((), ()))
+        return Recipe(product_id=product_id, name=name, price=price, stock_ids=stock_ids, quantities=quantities)
+
+    def invalidate(self):
+        self.cache.invalidate()
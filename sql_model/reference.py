@@ -0,0 +1,183 @@
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sql_model.entities import ExpenseType
+
+# --- Кэш справочников ---
+#
+# Таблицы units, stock_categories, expense_categories и expense_types почти
+# не меняются, а читаются на каждом запросе. Кэш держит их снимок в памяти
+# процесса (один на файл БД) и проверяет актуальность дешево:
+#   1. PRAGMA data_version соединения меняется, только если другое соединение
+#      (в том числе из другого процесса) зафиксировало изменения в БД, а
+#      total_changes - только после записи через само соединение;
+#   2. только тогда читается счетчик reference_version, который триггеры
+#      увеличивают при любом изменении справочников (миграция 5) и каталога
+#      продуктов (миграция 6);
+#   3. снимок перезагружается, если счетчик отличается от версии снимка.
+# Изменения через репозитории этого процесса сбрасывают кэш явно (invalidate)
+# после фиксации (ManagedConnection.after_commit), а откат, изменявший данные,
+# сбрасывает его через ManagedConnection.on_rollback: снимок, прочитанный
+# внутри откаченной транзакции, мог содержать ее изменения.
+# Тот же механизм использует кэш рецептов (sql_model.recipes).
+
+@dataclass(frozen=True)
+class ReferenceTable:
+    """Справочник id -> имя и имя -> id (порядок - по id)."""
+    names: Dict[int, str]
+    ids: Dict[str, int]
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection, table: str) -> "ReferenceTable":
+        rows = conn.execute(f"SELECT id, name FROM {table} ORDER BY id").fetchall()
+        return cls(names={row[0]: row[1] for row in rows}, ids={row[1]: row[0] for row in rows})
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """Согласованный снимок всех справочников на момент версии version."""
+    version: int
+    units: ReferenceTable
+    stock_categories: ReferenceTable
+    expense_categories: ReferenceTable
+    expense_types: Dict[int, ExpenseType]
+    expense_type_ids: Dict[str, int]
+
+
+def read_version(conn: sqlite3.Connection) -> int:
+    """Текущее значение счетчика изменений справочников."""
+    return conn.execute("SELECT version FROM reference_version WHERE id = 1").fetchone()[0]
+
+
+def load_snapshot(conn: sqlite3.Connection) -> ReferenceSnapshot:
+    """Читает все справочники одним проходом по маленьким таблицам."""
+    version = read_version(conn)
+    types = {
+        row[0]: ExpenseType(id=row[0], name=row[1], default_price=row[2], category_id=row[3], stock=bool(row[4]))
+        for row in conn.execute(
+            "SELECT id, name, default_price, category_id, stock FROM expense_types ORDER BY id"
+        ).fetchall()
+    }
+    return ReferenceSnapshot(
+        version=version,
+        units=ReferenceTable.load(conn, 'units'),
+        stock_categories=ReferenceTable.load(conn, 'stock_categories'),
+        expense_categories=ReferenceTable.load(conn, 'expense_categories'),
+        expense_types=types,
+        expense_type_ids={t.name: t.id for t in types.values()},
+    )
+
+
+class ChangeDetector:
+    """Определяет без чтения таблиц, могла ли БД измениться с прошлой проверки на соединении."""
+
+    def __init__(self, conn: Any):
+        self._conn = conn
+        self._seen: Optional[Tuple[int, int]] = None
+
+    def changed(self) -> bool:
+        seen = (self._conn.execute("PRAGMA data_version").fetchone()[0], self._conn.total_changes)
+        changed = seen != self._seen
+        self._seen = seen
+        return changed
+
+
+class SharedCache:
+    """Базовый класс кэшей, общих для всех соединений процесса с одним файлом БД."""
+
+    _registry: Dict[Tuple[type, str], "SharedCache"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'version_checks': 0}
+
+    @classmethod
+    def for_database(cls, db_file: str):
+        """
+        Возвращает общий кэш для файла БД. У каждой БД в памяти (':memory:')
+        свое содержимое, поэтому для нее создается отдельный кэш.
+        """
+        if not db_file or db_file == ':memory:' or db_file.startswith('file::memory:'):
+            return cls()
+        key = (cls, os.path.abspath(db_file))
+        with cls._registry_lock:
+            if key not in cls._registry:
+                cls._registry[key] = cls()
+            return cls._registry[key]
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+class ReferenceCache(SharedCache):
+    """
+    Кэш справочников одной БД, общий для всех соединений процесса.
+    Потокобезопасен: снимок неизменяемый и заменяется целиком.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._snapshot: Optional[ReferenceSnapshot] = None
+
+    def get(self, conn: sqlite3.Connection, check_version: bool) -> ReferenceSnapshot:
+        """
+        Возвращает снимок справочников, при необходимости перечитывая его.
+        check_version - соединение видело чужие изменения и нужно сверить счетчик.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and check_version:
+            self._count('version_checks')
+            if read_version(conn) != snapshot.version:
+                snapshot = None
+
+        if snapshot is not None:
+            self._count('hits')
+            return snapshot
+
+        snapshot = load_snapshot(conn)
+        with self._lock:
+            self._stats['misses'] += 1
+            self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self):
+        """Сбрасывает снимок после изменения справочника."""
+        with self._lock:
+            self._snapshot = None
+            self._stats['invalidations'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов и версия текущего снимка."""
+        stats = super().stats()
+        snapshot = self._snapshot
+        stats['version'] = snapshot.version if snapshot else None
+        return stats
+
+
+class ReferenceData:
+    """Доступ одного соединения к общему кэшу справочников."""
+
+    def __init__(self, cache: ReferenceCache, conn: Any):
+        self.cache = cache
+        self._conn = conn
+        self._changes = ChangeDetector(conn)
+
+    def snapshot(self) -> ReferenceSnapshot:
+        """Актуальный для этого соединения снимок справочников."""
+        return self.cache.get(self._conn, check_version=self._changes.changed())
+
+    def invalidate(self):
+        self.cache.invalidate()
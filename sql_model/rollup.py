@@ -0,0 +1,158 @@
+"""
+Дневная сводка продаж (daily_sales_summary).
+
+Строка сводки - день и продукт: количество, выручка без скидок и со
+скидками, число продаж. Триггеры на sales (миграции 8, 9) обновляют сводку в
+той же транзакции, что и вставку, изменение или удаление продажи, поэтому
+запросы выручки и структуры продаж читают сводку, а их стоимость растет с
+числом дней и продуктов, а не с числом продаж.
+
+Пересборка сводки по таблице sales (после ручной правки БД или импорта
+с отключенными триггерами):
+    python -m sql_model.rollup --db bakery_management.db
+"""
+import argparse
+import sqlite3
+
+# День продажи по date_ts (как в фильтрах), для строк без date_ts - по date
+SUMMARY_DAY = "COALESCE(date({row}.date_ts, 'unixepoch'), date({row}.date))"
+
+# Сумма строки продажи с учетом скидки в процентах. Единственное место
+# формулы: по ней заполняется и пересчитывается колонка sales.net_amount
+NET_AMOUNT = "{row}.price * {row}.quantity * (1 - {row}.discount / 100.0)"
+
+# Выручка строки продажи в сводке - колонка sales.net_amount
+SUMMARY_REVENUE = "{row}.net_amount"
+
+_TRIGGER_EVENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def _add_sale(row: str, revenue: str) -> str:
+    """Инструкция, добавляющая продажу row (NEW) в сводку."""
+    return f"""
+        INSERT INTO daily_sales_summary (day, product_id, product_name, units, gross_revenue, revenue, sales_count)
+        VALUES ({SUMMARY_DAY.format(row=row)}, {row}.product_id, {row}.product_name, {row}.quantity,
+                {row}.price * {row}.quantity, {revenue.format(row=row)}, 1)
+        ON CONFLICT (day, product_id) DO UPDATE SET
+            product_name = excluded.product_name,
+            units = units + excluded.units,
+            gross_revenue = gross_revenue + excluded.gross_revenue,
+            revenue = revenue + excluded.revenue,
+            sales_count = sales_count + 1;
+    """
+
+
+def _remove_sale(row: str, revenue: str) -> str:
+    """Инструкции, вычитающие продажу row (OLD) из сводки; пустые строки удаляются."""
+    key = f"day = {SUMMARY_DAY.format(row=row)} AND product_id = {row}.product_id"
+    return f"""
+        UPDATE daily_sales_summary SET
+            units = units - {row}.quantity,
+            gross_revenue = gross_revenue - {row}.price * {row}.quantity,
+            revenue = revenue - {revenue.format(row=row)},
+            sales_count = sales_count - 1
+        WHERE {key};
+        DELETE FROM daily_sales_summary WHERE {key} AND sales_count <= 0;
+    """
+
+
+def create_summary(conn: sqlite3.Connection, revenue: str = SUMMARY_REVENUE):
+    """
+    Создает таблицу сводки и триггеры, поддерживающие ее в актуальном состоянии.
+    revenue - выражение выручки строки продажи (шаблон с {row}); миграции,
+    выполнявшиеся до появления net_amount, передают свою формулу.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_sales_summary (
+            day TEXT NOT NULL,
+            product_id INTEGER NOT NULL,
+            product_name TEXT NOT NULL,
+            units REAL NOT NULL,
+            gross_revenue REAL NOT NULL,
+            revenue REAL NOT NULL,
+            sales_count INTEGER NOT NULL,
+            PRIMARY KEY (day, product_id)
+        ) WITHOUT ROWID
+        """
+    )
+    create_triggers(conn, revenue)
+
+
+def create_triggers(conn: sqlite3.Connection, revenue: str = SUMMARY_REVENUE):
+    """Создает триггеры сводки на sales."""
+    triggers = {
+        'INSERT': _add_sale('NEW', revenue),
+        'UPDATE': _remove_sale('OLD', revenue) + _add_sale('NEW', revenue),
+        'DELETE': _remove_sale('OLD', revenue),
+    }
+    for event, body in triggers.items():
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_sales_{event.lower()}_daily_summary
+            AFTER {event} ON sales
+            BEGIN
+                {body}
+            END
+            """
+        )
+
+
+def create_net_amount_trigger(conn: sqlite3.Connection):
+    """Пересчитывает sales.net_amount при изменении цены, количества или скидки."""
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_sales_update_net_amount
+        AFTER UPDATE OF price, quantity, discount ON sales
+        BEGIN
+            UPDATE sales SET net_amount = {NET_AMOUNT.format(row='NEW')} WHERE id = NEW.id;
+        END
+        """
+    )
+
+
+def drop_triggers(conn: sqlite3.Connection):
+    """Удаляет триггеры сводки (перед их пересозданием)."""
+    for event in _TRIGGER_EVENTS:
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_sales_{event.lower()}_daily_summary")
+
+
+def rebuild(conn: sqlite3.Connection, revenue: str = SUMMARY_REVENUE) -> int:
+    """
+    Пересчитывает сводку по всем продажам. Не фиксирует транзакцию.
+
+    Returns:
+        int: Число строк сводки.
+    """
+    conn.execute("DELETE FROM daily_sales_summary")
+    conn.execute(
+        f"""
+        INSERT INTO daily_sales_summary (day, product_id, product_name, units, gross_revenue, revenue, sales_count)
+        SELECT {SUMMARY_DAY.format(row='s')}, s.product_id, MAX(s.product_name),
+               SUM(s.quantity), SUM(s.price * s.quantity), SUM({revenue.format(row='s')}), COUNT(*)
+        FROM sales s
+        GROUP BY 1, s.product_id
+        """
+    )
+    return conn.execute("SELECT COUNT(*) FROM daily_sales_summary").fetchone()[0]
+
+
+def main():
+    from sql_model.database import create_connection, get_db_path, initialize_db
+
+    parser = argparse.ArgumentParser(description="Пересборка дневной сводки продаж")
+    parser.add_argument('--db', default=get_db_path(), help="Файл БД (по умолчанию $BAKERY_DB_PATH)")
+    args = parser.parse_args()
+
+    conn = create_connection(args.db)
+    try:
+        initialize_db(conn)
+        rows = rebuild(conn)
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"daily_sales_summary: {rows} строк")
+
+
+if __name__ == '__main__':
+    main()
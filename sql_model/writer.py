@@ -0,0 +1,206 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+
+from sql_model.model import SQLiteModel
+
+# Сколько секунд ждать попутные операции, прежде чем зафиксировать пачку
+DEFAULT_GROUP_WINDOW = 0.002
+
+# Максимальное число операций в одной групповой транзакции
+DEFAULT_MAX_BATCH = 64
+
+WriteOperation = Callable[[SQLiteModel], Any]
+
+_STOP = object()
+
+
+class WriteExecutor:
+    """
+    Единственный писатель БД: выделенный поток, владеющий соединением-писателем.
+
+    Все изменяющие операции ставятся в одну очередь. Операции, пришедшие в
+    пределах окна group_window, объединяются в одну транзакцию с одним commit
+    (group commit). Каждая операция выполняется под своей точкой сохранения,
+    поэтому ошибка одной операции откатывает только ее и возвращается только
+    ее вызывающему; остальные операции пачки фиксируются.
+    """
+
+    def __init__(self, model: SQLiteModel, group_window: float = DEFAULT_GROUP_WINDOW,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        self._model = model
+        self.group_window = group_window
+        self.max_batch = max_batch
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread = None
+        self._proxy = WriteQueueModel(self)
+        self._savepoints = itertools.count(1)
+
+        self._lock = threading.Lock()
+        self._stats = {
+            'operations': 0,
+            'failed_operations': 0,
+            'batches': 0,
+            'batch_size_max': 0,
+            'queue_depth_max': 0,
+        }
+
+    # --- Жизненный цикл ---
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Дожидается выполнения уже поставленных операций и останавливает поток."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    # --- Постановка операций ---
+
+    def submit(self, operation: WriteOperation) -> "Future[Any]":
+        """Ставит операцию в очередь писателя. Результат приходит через Future."""
+        if self._thread is None:
+            raise RuntimeError("Писатель БД не запущен.")
+        future: "Future[Any]" = Future()
+        self._queue.put((operation, future))
+        depth = self._queue.qsize()
+        with self._lock:
+            self._stats['queue_depth_max'] = max(self._stats['queue_depth_max'], depth)
+        return future
+
+    def call(self, operation: WriteOperation) -> Any:
+        """Выполняет операцию в очереди писателя и возвращает ее результат."""
+        if threading.current_thread() is self._thread:
+            # Вложенный вызов из самой операции: выполняем на месте
+            return operation(self._model)
+        return self.submit(operation).result()
+
+    def model(self) -> "WriteQueueModel":
+        """Прокси SQLiteModel, все вызовы которого выполняются в очереди писателя."""
+        return self._proxy
+
+    # --- Поток писателя ---
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            stop = False
+            deadline = time.perf_counter() + self.group_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch: List[Tuple[WriteOperation, "Future[Any]"]]):
+        conn = self._model._conn
+        outcomes = []
+        try:
+            with conn.group():
+                for operation, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with conn.savepoint(f"op_{next(self._savepoints)}"):
+                            result = operation(self._model)
+                        outcomes.append((future, result, None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            # Не удалось зафиксировать пачку: ни одна операция не сохранена
+            for operation, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            outcomes = []
+            failed = len(batch)
+        else:
+            failed = sum(1 for _, _, error in outcomes if error is not None)
+
+        # Результаты отдаются только после commit всей пачки
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        with self._lock:
+            self._stats['operations'] += len(batch)
+            self._stats['failed_operations'] += failed
+            self._stats['batches'] += 1
+            self._stats['batch_size_max'] = max(self._stats['batch_size_max'], len(batch))
+
+    # --- Диагностика ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Возвращает метрики очереди: глубину и размеры групповых транзакций."""
+        with self._lock:
+            stats = dict(self._stats)
+        batches = stats['batches']
+        stats['queue_depth'] = self._queue.qsize()
+        stats['batch_size_avg'] = stats['operations'] / batches if batches else 0.0
+        stats['group_window_ms'] = self.group_window * 1000
+        return stats
+
+
+class WriteQueueModel:
+    """
+    Прокси SQLiteModel для запросов, изменяющих данные.
+
+    Интерфейс совпадает с SQLiteModel (model.sales().add(...)), но каждый вызов
+    метода репозитория или модели выполняется в потоке писателя.
+    """
+
+    def __init__(self, executor: WriteExecutor):
+        self._executor = executor
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in SQLiteModel.REPOSITORIES:
+            return lambda: _QueuedRepository(self._executor, name)
+
+        attr = getattr(SQLiteModel, name)
+        if not callable(attr):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._executor.call(
+            lambda model: getattr(model, name)(*args, **kwargs)
+        )
+
+
+class _QueuedRepository:
+    """Прокси репозитория: вызовы методов передаются писателю."""
+
+    def __init__(self, executor: WriteExecutor, repository: str):
+        self._executor = executor
+        self._repository = repository
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        repository = self._repository
+        return lambda *args, **kwargs: self._executor.call(
+            lambda model: getattr(getattr(model, repository)(), name)(*args, **kwargs)
+        )
@@ -77,9 +77,11 @@ const translations = {
         // Stock
         addStockItem: "Add Stock Item",
         searchStock: "Search stock...",
+        allCategories: "All categories",
         stockItemName: "Item Name",
         category: "Category",
         quantity: "Quantity",
+        available: "Available",
         unit: "Unit",
         initialQuantity: "Initial Quantity",
         saveStockItem: "Add Item",
@@ -126,7 +128,7 @@ const translations = {
 
         // Write-offs
         addWriteoff: "Add Record",
-        searchWriteoffs: "Search write-offs...",
+        searchWriteoffs: "Search by reason...",
         itemType: "Item Type",
         selectItem: "Select Item",
         reason: "Reason",
@@ -216,9 +218,11 @@ const translations = {
         // Stock
         addStockItem: "Добавить товар на складе",
         searchStock: "Поиск на складе...",
+        allCategories: "Все категории",
         stockItemName: "Название товара",
         category: "Категория",
         quantity: "Количество",
+        available: "Доступно",
         unit: "Единица",
         initialQuantity: "Начальное количество",
         saveStockItem: "Добавить товар",
@@ -265,7 +269,7 @@ const translations = {
 
         // Write-offs
         addWriteoff: "Добавить запись",
-        searchWriteoffs: "Поиск списаний...",
+        searchWriteoffs: "Поиск по причине...",
         itemType: "Тип товара",
         selectItem: "Выбрать товар",
         reason: "Причина",
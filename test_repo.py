@@ -1,9 +1,10 @@
 import sqlite3
 from repositories.orders import OrdersRepository
+from sql_model.database import get_db_path
 from types import SimpleNamespace
 
 def test():
-    conn = sqlite3.connect('bakery_management.db')
+    conn = sqlite3.connect(get_db_path())
     conn.row_factory = sqlite3.Row
     repo = OrdersRepository(conn, SimpleNamespace(products=lambda: SimpleNamespace(by_id=lambda x: SimpleNamespace(id=x, name="Test", price=10))))
     
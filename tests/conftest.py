@@ -2,9 +2,10 @@ import pytest
 import sqlite3
 from fastapi.testclient import TestClient
 from main import app
-from api.dependencies import get_model
+from api.dependencies import get_model, get_async_model, get_async_reader
 from sql_model.model import SQLiteModel
-from sql_model.database import initialize_db
+from sql_model.async_model import AsyncModel
+from sql_model.database import DB_PATH_ENV, initialize_db
 
 # 1. Постоянное соединение остается на уровне модуля
 mem_conn = sqlite3.connect(":memory:", check_same_thread=False)
@@ -30,11 +31,22 @@ def session_override_get_model(test_model):
     Используем autouse=True и scope="session".
     """
     app.dependency_overrides[get_model] = lambda: test_model
+    async_model = AsyncModel.wrap(test_model)
+    app.dependency_overrides[get_async_model] = lambda: async_model
+    app.dependency_overrides[get_async_reader] = lambda: async_model
     yield
     app.dependency_overrides.clear()
 
+@pytest.fixture(scope="session", autouse=True)
+def test_db_path(tmp_path_factory):
+    """Пул приложения открывает временный файл, а не БД в рабочем каталоге."""
+    path = tmp_path_factory.mktemp("db") / "bakery.db"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv(DB_PATH_ENV, str(path))
+        yield path
+
 # 2. Создаем клиент как фикстуру, а не как глобальную переменную
 @pytest.fixture(scope="session")
-def client():
+def client(test_db_path):
     with TestClient(app) as c:
         yield c
\ No newline at end of file
@@ -0,0 +1,15 @@
+def test_dashboard_stats(client, test_model):
+    test_model.stock().add('Dash Flour', 'Materials', 50, 'kg')
+    test_model.products().add('Dash Bun', 30, [{'name': 'Dash Flour', 'quantity': 0.1}])
+    test_model.sales().add('Dash Bun', 30, 2, 0)
+
+    response = client.get("/api/dashboard/stats")
+    assert response.status_code == 200
+
+    chart = client.get("/api/dashboard/chart")
+    assert chart.status_code == 200
+    assert chart.text.count('class="chart-bar"') == 7
+
+    recent = client.get("/api/dashboard/recent-activity")
+    assert recent.status_code == 200
+    assert "Dash Bun" in recent.text
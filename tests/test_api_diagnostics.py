@@ -0,0 +1,34 @@
+def test_read_pool_stats(client, test_db_path):
+    response = client.get("/api/diagnostics/pool")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["db_file"] == str(test_db_path)
+    assert data["size"] == data["readers"] + 1
+    assert "waits" in data
+    assert "checkout_ms_avg" in data
+
+def test_read_db_settings(client):
+    response = client.get("/api/diagnostics/db")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["profile"] in ("legacy", "durable", "fast")
+    assert "journal_mode" in data["pragmas"]
+
+def test_read_reference_cache_stats(client):
+    client.get("/api/stock/")
+    response = client.get("/api/diagnostics/reference-cache")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["hits"] + data["misses"] > 0
+    assert data["version"] is not None
+
+def test_read_recipe_cache_stats(client):
+    response = client.get("/api/diagnostics/recipe-cache")
+    assert response.status_code == 200
+    data = response.json()
+    assert {"hits", "misses", "invalidations", "size"} <= set(data)
+
+def test_read_bom_stats(client):
+    response = client.get("/api/diagnostics/bom")
+    assert response.status_code == 200
+    assert {"hits", "misses", "refreshes", "products", "nonzeros"} <= set(response.json())
@@ -142,3 +142,25 @@ def test_category_and_type_forms(client):
     assert r_post_type.status_code == 200
     assert "Type added" in r_post_type.text or "successfully" in r_post_type.json()["message"]
 
+
+def test_search_expense_documents_pages_in_sql(client, test_model):
+    uid = str(uuid.uuid4())[:8]
+    supplier = test_model.suppliers().add(f"Search Supplier {uid}")
+    for n in range(6):
+        comment = f"needle {uid}" if n % 2 else "hay"
+        test_model.expense_documents().add(f"2023-02-0{n + 1} 10:00", supplier.id, 10, comment, [])
+
+    response = client.get("/api/expenses/documents", params={"search": f"NEEDLE {uid}", "limit": 2})
+    assert response.status_code == 200
+    first = response.json()
+    assert [d["comment"] for d in first] == [f"needle {uid}"] * 2
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/api/expenses/documents", params={"search": f"needle {uid}", "limit": 2, "after": cursor})
+    assert [d["date"] for d in response.json()] == ["2023-02-02 10:00"]
+    assert "X-Next-Cursor" not in response.headers
+
+    details = client.get(f"/api/expenses/documents/{first[0]['id']}")
+    assert details.status_code == 200
+    assert f"Search Supplier {uid}" in details.text
+    assert client.get("/api/expenses/documents/999999").status_code == 404
@@ -0,0 +1,53 @@
+import uuid
+
+def test_complete_orders_batch(client, test_model):
+    test_model.stock().add('Batch Flour', 'Materials', 3, 'kg')
+    bun = test_model.products().add('Batch Bun', 40, [{'name': 'Batch Flour', 'quantity': 1}])
+    ids = [test_model.orders().add([{'product_id': bun.id, 'quantity': 2}]).id for _ in range(2)]
+
+    response = client.post("/api/orders/complete", json={"order_ids": ids + [999999]})
+    assert response.status_code == 200
+    first, second, missing = response.json()
+    assert first["completed"] is True
+    assert second["completed"] is False
+    assert second["shortages"] == [{"name": "Batch Flour", "required": 2.0, "available": 1.0}]
+    assert "not found" in missing["error"]
+    assert test_model.orders().by_id(ids[1]).status == 'pending'
+
+def test_order_creation_reports_reserved_stock(client, test_model):
+    test_model.stock().add('Promise Flour', 'Materials', 3, 'kg')
+    bun = test_model.products().add('Promise Bun', 40, [{'name': 'Promise Flour', 'quantity': 1}])
+    items = [{"product_id": bun.id, "quantity": 2}]
+
+    first = client.post("/api/orders/", json={"items": items})
+    assert first.status_code == 200
+    assert first.json()["shortages"] == []
+
+    check = client.post("/api/orders/availability", json={"items": items})
+    assert check.status_code == 200
+    assert check.json()[0]["reserved"] == 2
+    assert check.json()[0]["available"] == 1
+
+    second = client.post("/api/orders/", json={"items": items})
+    assert second.json()["shortages"] == [{"name": "Promise Flour", "required": 2.0, "available": 1.0}]
+
+    stock = client.get("/api/stock/", params={"search": "Promise Flour"}).json()
+    assert stock[0]["reserved"] == 4
+    assert stock[0]["available"] == -1
+
+def test_search_orders_pages_in_sql(client, test_model):
+    uid = str(uuid.uuid4())[:8]
+    test_model.stock().add(f'Search Flour {uid}', 'Materials', 100, 'kg')
+    test_model.products().add(f'Search Bun {uid}', 10, [{'name': f'Search Flour {uid}', 'quantity': 0.1}])
+    product = test_model.products().by_name(f'Search Bun {uid}')
+    for n in range(5):
+        info = f"wedding {uid}" if n % 2 else "walk-in"
+        test_model.orders().add([{'product_id': product.id, 'quantity': 1}], additional_info=info)
+
+    response = client.get("/api/orders/", params={"search": f"WEDDING {uid}", "limit": 1})
+    assert response.status_code == 200
+    assert [o["additional_info"] for o in response.json()] == [f"wedding {uid}"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/api/orders/", params={"search": f"wedding {uid}", "limit": 1, "after": cursor})
+    assert [o["additional_info"] for o in response.json()] == [f"wedding {uid}"]
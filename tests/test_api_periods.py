@@ -0,0 +1,27 @@
+def test_close_and_reopen_period(client, test_model):
+    # The test database is shared, so the closed month is reopened at the end
+    pnl = client.get("/api/periods/pnl")
+    assert pnl.status_code == 200
+    before = pnl.json()["total"]
+
+    response = client.post("/api/periods/close", json={"period": "2000-01"})
+    assert response.status_code == 201
+    assert response.json()[-1]["period"] == "2000-01"
+
+    periods = client.get("/api/periods/")
+    assert periods.json()[-1]["period"] == "2000-01"
+
+    data = client.get("/api/periods/pnl").json()
+    assert data["closed_until"] == "2000-01"
+    assert data["total"] == before
+
+    again = client.post("/api/periods/close", json={"period": "2000-01"})
+    assert again.status_code == 400
+
+    response = client.delete("/api/periods/2000-01")
+    assert response.status_code == 200
+    assert client.delete("/api/periods/2000-01").status_code == 404
+
+def test_close_rejects_unfinished_period(client):
+    response = client.post("/api/periods/close", json={"period": "2999-12"})
+    assert response.status_code == 400
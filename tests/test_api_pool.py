@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from sql_model.database import DB_PATH_ENV
+
+
+@pytest.fixture
+def pool_client(tmp_path, monkeypatch):
+    """
+    Клиент приложения на настоящем пуле соединений во временном файле:
+    без подмены зависимостей запись идет через очередь писателя.
+    """
+    monkeypatch.setenv(DB_PATH_ENV, str(tmp_path / "pool.db"))
+    overrides = dict(app.dependency_overrides)
+    session_pool = getattr(app.state, "pool", None)
+    app.dependency_overrides.clear()
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.dependency_overrides.update(overrides)
+        app.state.pool = session_pool
+
+
+def post_concurrently(client: TestClient, url: str, payloads):
+    """Отправляет запросы одновременно из отдельных потоков и возвращает ответы."""
+    responses = [None] * len(payloads)
+    barrier = threading.Barrier(len(payloads))
+
+    def worker(i, payload):
+        barrier.wait()
+        responses[i] = client.post(url, json=payload)
+
+    threads = [threading.Thread(target=worker, args=(i, p)) for i, p in enumerate(payloads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return responses
+
+
+def test_concurrent_sales_go_through_writer_queue(pool_client):
+    flour = pool_client.post("/api/stock/", json={
+        "name": "Flour", "category_name": "Materials", "quantity": 10, "unit_name": "kg"
+    })
+    assert flour.status_code == 200
+    product = pool_client.post("/api/products/", json={
+        "name": "Bun", "price": 50, "materials": [{"name": "Flour", "quantity": 0.5}]
+    })
+    assert product.status_code == 200
+    product_id = product.json()["id"]
+
+    # 24 продажи по 0.5 кг при запасе 10 кг: ровно 20 проходят, остальные отклоняются
+    responses = post_concurrently(
+        pool_client, "/api/sales/", [{"product_id": product_id, "quantity": 1}] * 24
+    )
+    assert sorted(r.status_code for r in responses) == [200] * 20 + [400] * 4
+
+    sales = pool_client.get("/api/sales/", params={"limit": 100}).json()
+    assert len(sales) == 20
+    stock = pool_client.get(f"/api/stock/{flour.json()['id']}").json()
+    assert stock["quantity"] == 0
+
+    writer = pool_client.get("/api/diagnostics/writer").json()
+    assert writer["operations"] >= 24
+    assert writer["batches"] <= writer["operations"]
+
+
+def test_sync_route_writes_through_writer_queue(pool_client):
+    created = pool_client.post("/api/stock/", json={
+        "name": "Sugar", "category_name": "Materials", "quantity": 5, "unit_name": "kg"
+    })
+    before = pool_client.get("/api/diagnostics/writer").json()["operations"]
+
+    response = pool_client.put("/api/stock/Sugar/delta", json={"quantity_delta": -2})
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 3
+
+    # Изменение видно читателям пула после фиксации писателем
+    assert pool_client.get(f"/api/stock/{created.json()['id']}").json()["quantity"] == 3
+    assert pool_client.get("/api/diagnostics/writer").json()["operations"] > before
+
+
+def test_availability_check_reads_outside_writer_queue(pool_client):
+    pool_client.post("/api/stock/", json={
+        "name": "Rye", "category_name": "Materials", "quantity": 4, "unit_name": "kg"
+    })
+    product = pool_client.post("/api/products/", json={
+        "name": "Rye Loaf", "price": 80, "materials": [{"name": "Rye", "quantity": 0.5}]
+    }).json()
+    before = pool_client.get("/api/diagnostics/writer").json()["operations"]
+
+    response = pool_client.post("/api/orders/availability", json={
+        "items": [{"product_id": product["id"], "quantity": 10}]
+    })
+    assert response.status_code == 200
+    line, = response.json()
+    assert (line["required"], line["available"]) == (5, 4)
+    assert pool_client.get("/api/diagnostics/writer").json()["operations"] == before
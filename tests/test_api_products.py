@@ -61,3 +61,20 @@ def test_create_product_form(client):
     
     # Cleanup
     client.delete(f"/api/products/HTML Product")
+
+def test_product_costs_and_plan(client, test_model):
+    test_model.stock().add('Cost Flour', 'Materials', 5, 'kg')
+    bun = test_model.products().add('Cost Bun', 80, [{'name': 'Cost Flour', 'quantity': 0.5}])
+
+    costs = client.get("/api/products/costs")
+    assert costs.status_code == 200
+    row = next(r for r in costs.json() if r["product_id"] == bun.id)
+    assert row["cost"] == 50
+    assert row["margin"] == 30
+
+    plan = client.post("/api/products/plan", json={"items": [{"product_id": bun.id, "quantity": 4}]})
+    assert plan.status_code == 200
+    assert plan.json() == [{
+        "stock_id": test_model.stock().get('Cost Flour').id, "name": "Cost Flour",
+        "quantity": 5.0, "reserved": 0.0, "available": 5.0, "required": 2.0,
+    }]
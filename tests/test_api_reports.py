@@ -0,0 +1,22 @@
+def test_timeseries_report(client, test_model):
+    test_model.stock().add('Report Flour', 'Materials', 50, 'kg')
+    test_model.products().add('Report Bun', 30, [{'name': 'Report Flour', 'quantity': 0.1}])
+    test_model.sales().add('Report Bun', 30, 2, 0)
+    product = test_model.products().by_name('Report Bun')
+
+    response = client.get("/api/reports/timeseries", params={"bucket": "month", "group_by": "product"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["metric"] == "revenue"
+    assert data["bucket"] == "month"
+    series = next(s for s in data["series"] if s["key"] == product.id)
+    assert series["name"] == "Report Bun"
+    assert len(series["values"]) == len(data["buckets"])
+    assert sum(series["values"]) == 60.0
+
+def test_timeseries_report_rejects_invalid_grouping(client):
+    response = client.get("/api/reports/timeseries", params={"metric": "expenses", "group_by": "product"})
+    assert response.status_code == 400
+
+    response = client.get("/api/reports/timeseries", params={"from": "not a date"})
+    assert response.status_code == 400
@@ -0,0 +1,107 @@
+from sql_model.pagination import DEFAULT_PAGE_SIZE
+
+def test_read_sales_json(client):
+    response = client.get("/api/sales/")
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+
+def test_read_sales_filtered(client):
+    response = client.get("/api/sales/", params={"from": "2000-01-01", "to": "2000-01-31", "order": "asc", "limit": 5})
+    assert response.status_code == 200
+    assert response.json() == []
+
+def test_read_sales_filtered_htmx_rows(client):
+    response = client.get(
+        "/api/sales/", params={"from": "2000-01-01"},
+        headers={"HX-Request": "true", "HX-Target": "sales-table-body"}
+    )
+    assert response.status_code == 200
+    assert "<thead>" not in response.text
+
+def test_read_sales_bad_date(client):
+    response = client.get("/api/sales/", params={"from": "01.01.2026"})
+    assert response.status_code == 400
+
+def test_read_sales_bad_order(client):
+    response = client.get("/api/sales/", params={"order": "sideways"})
+    assert response.status_code == 400
+
+def test_read_sales_pages(client, test_model):
+    test_model.stock().add('Page Flour', 'Materials', 10, 'kg')
+    test_model.products().add('Page Bun', 50, [{'name': 'Page Flour', 'quantity': 0.1}])
+    for _ in range(3):
+        test_model.sales().add('Page Bun', 50, 1, 0)
+
+    first = client.get("/api/sales/", params={"limit": 2})
+    assert first.status_code == 200
+    assert len(first.json()) == 2
+    cursor = first.headers["X-Next-Cursor"]
+
+    rest = client.get("/api/sales/", params={"limit": 2, "after": cursor})
+    ids = [s["id"] for s in first.json() + rest.json()]
+    assert len(ids) == len(set(ids))
+
+    rows = client.get("/api/sales/", params={"limit": 2, "after": cursor}, headers={"HX-Request": "true"})
+    assert "<thead>" not in rows.text
+
+    page = client.get("/api/sales/", params={"limit": 2}, headers={"HX-Request": "true", "HX-Target": "sales-table-body"})
+    assert 'hx-trigger="revealed"' in page.text
+    assert "after=" in page.text
+
+def test_read_sales_json_without_limit_returns_every_row(client, test_model):
+    test_model.stock().add('Full Flour', 'Materials', 100, 'kg')
+    test_model.products().add('Full Bun', 50, [{'name': 'Full Flour', 'quantity': 0.1}])
+    for _ in range(DEFAULT_PAGE_SIZE + 1):
+        test_model.sales().add('Full Bun', 50, 1, 0)
+
+    response = client.get("/api/sales/", params={"search": "Full Bun"})
+    assert len(response.json()) == DEFAULT_PAGE_SIZE + 1
+    assert "X-Next-Cursor" not in response.headers
+
+    # Страницы HTML и продолжение по курсору без limit - по DEFAULT_PAGE_SIZE строк
+    page = client.get("/api/sales/", params={"search": "Full Bun"}, headers={"HX-Request": "true"})
+    assert page.text.count("Full Bun") == DEFAULT_PAGE_SIZE
+    first = client.get("/api/sales/", params={"search": "Full Bun", "limit": 1})
+    rest = client.get("/api/sales/", params={"search": "Full Bun", "after": first.headers["X-Next-Cursor"]})
+    assert len(rest.json()) == DEFAULT_PAGE_SIZE
+    assert "X-Next-Cursor" in rest.headers
+
+def test_read_sales_bad_cursor(client):
+    response = client.get("/api/sales/", params={"after": "garbage"})
+    assert response.status_code == 400
+
+def test_create_sales_bulk(client, test_model):
+    test_model.stock().add('Bulk Flour', 'Materials', 10, 'kg')
+    test_model.products().add('Bulk Bun', 50, [{'name': 'Bulk Flour', 'quantity': 1}])
+    test_model.products().add('Bulk Roll', 30, [{'name': 'Bulk Flour', 'quantity': 0.5}])
+    bun, roll = test_model.products().by_name('Bulk Bun'), test_model.products().by_name('Bulk Roll')
+
+    response = client.post("/api/sales/bulk", json=[
+        {"product_id": bun.id, "quantity": 2},
+        {"product_id": roll.id, "quantity": 4, "discount": 5},
+    ])
+    assert response.status_code == 201
+    sales = response.json()
+    assert [(s["product_name"], s["price"], s["quantity"], s["discount"]) for s in sales] == [
+        ("Bulk Bun", 50, 2, 0), ("Bulk Roll", 30, 4, 5),
+    ]
+    assert sales[0]["id"] < sales[1]["id"]
+    assert test_model.stock().get('Bulk Flour').quantity == 6
+
+def test_create_sales_bulk_is_all_or_nothing(client, test_model):
+    test_model.stock().add('Short Flour', 'Materials', 1, 'kg')
+    test_model.products().add('Short Bun', 50, [{'name': 'Short Flour', 'quantity': 1}])
+    bun = test_model.products().by_name('Short Bun')
+
+    response = client.post("/api/sales/bulk", json=[
+        {"product_id": bun.id, "quantity": 1},
+        {"product_id": 999999, "quantity": 1},
+        {"product_id": bun.id, "quantity": -1},
+    ])
+    assert response.status_code == 400
+    assert "999999" in response.json()["detail"] and "строка 3" in response.json()["detail"]
+
+    response = client.post("/api/sales/bulk", json=[{"product_id": bun.id, "quantity": 1}] * 2)
+    assert response.status_code == 400
+    assert "Short Flour" in response.json()["detail"]
+    assert test_model.stock().get('Short Flour').quantity == 1
@@ -83,3 +83,11 @@ def test_update_stock_quantity_set_form(client):
     
     # Cleanup
     client.delete(f"/api/stock/{item_name}")
+
+def test_read_materials_filtered(client):
+    client.post("/api/stock/", json={"name": "Filter Box", "category_name": "Packaging", "quantity": 1.0, "unit_name": "pc"})
+    response = client.get("/api/stock/materials", params={"category": "Packaging", "search": "filter box"})
+    assert response.status_code == 200
+    assert [i["name"] for i in response.json()] == ["Filter Box"]
+    assert response.json()[0]["unit_name"] == "pc"
+    client.delete("/api/stock/Filter Box")
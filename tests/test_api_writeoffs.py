@@ -0,0 +1,57 @@
+from sql_model.pagination import DEFAULT_PAGE_SIZE
+
+
+def test_read_writeoffs_journal(client):
+    client.post("/api/stock/", json={"name": "Journal Flour", "category_name": "Materials", "quantity": 10.0, "unit_name": "kg"})
+    client.post("/api/writeoffs/", json={"item_name": "Journal Flour", "item_type": "stock", "quantity": 1.0, "reason": "Journal spill"})
+
+    response = client.get("/api/writeoffs/", params={"reason": "journal spill"})
+    assert response.status_code == 200
+    rows = response.json()
+    assert [r["item_name"] for r in rows] == ["Journal Flour"]
+    assert rows[0]["unit_name"] == "kg"
+
+def test_read_writeoffs_json_without_limit_returns_every_row(client, test_model):
+    test_model.stock().add('Full Sugar', 'Materials', 100, 'kg')
+    for _ in range(DEFAULT_PAGE_SIZE + 1):
+        test_model.writeoffs().add('Full Sugar', 'stock', 0.1, 'Full spill')
+
+    response = client.get("/api/writeoffs/", params={"reason": "full spill"})
+    assert len(response.json()) == DEFAULT_PAGE_SIZE + 1
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/api/writeoffs/", params={"reason": "full spill", "limit": DEFAULT_PAGE_SIZE})
+    assert len(response.json()) == DEFAULT_PAGE_SIZE
+    assert "X-Next-Cursor" in response.headers
+
+def test_read_writeoffs_rows_fragment(client):
+    response = client.get(
+        "/api/writeoffs/", params={"from": "2000-01-01", "to": "2000-01-31"},
+        headers={"HX-Request": "true", "HX-Target": "writeoffs-table-body"}
+    )
+    assert response.status_code == 200
+    assert "<thead>" not in response.text
+
+def test_read_writeoffs_bad_date(client):
+    response = client.get("/api/writeoffs/", params={"to": "yesterday"})
+    assert response.status_code == 400
+
+def test_create_writeoff_returns_inserted_record(client):
+    client.post("/api/stock/", json={"name": "Minute Flour", "category_name": "Materials", "quantity": 10.0, "unit_name": "kg"})
+    created = []
+    for reason in ("first spill", "second spill"):
+        response = client.post("/api/writeoffs/", json={"item_name": "Minute Flour", "item_type": "stock", "quantity": 1.0, "reason": reason})
+        assert response.status_code == 200
+        created.append(response.json())
+
+    assert [w["reason"] for w in created] == ["first spill", "second spill"]
+    assert created[1]["id"] > created[0]["id"]
+    assert created[1]["item_name"] == "Minute Flour"
+    assert created[1]["unit_name"] == "kg"
+
+    response = client.post(
+        "/api/writeoffs/", data={"item_name": "Minute Flour", "item_type": "stock", "quantity": "1", "reason": "third spill"},
+        headers={"HX-Request": "true"}
+    )
+    assert response.status_code == 200
+    assert "third spill" in response.text
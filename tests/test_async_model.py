@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+from sql_model.async_model import AsyncModel
+from sql_model.model import SQLiteModel
+from sql_model.pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "async.db"), readers=2)
+    pool.open()
+    yield pool
+    pool.close()
+
+
+class TestAsyncModel:
+
+    def test_repository_calls_are_awaitable(self, pool: ConnectionPool):
+        async def scenario():
+            writer = pool.async_model(write=True)
+            reader = pool.async_model()
+            await writer.stock().add('Мука', "Materials", 10, 'kg')
+            await writer.stock().update('Мука', -2)
+            item = await reader.stock().get('Мука')
+            income = await reader.calculate_income()
+            return item, income
+
+        item, income = asyncio.run(scenario())
+        assert item.quantity == 8
+        assert income == 0
+
+    def test_errors_propagate_to_awaiting_route(self, pool: ConnectionPool):
+        async def scenario():
+            await pool.async_model(write=True).stock().update('Сахар', 1)
+
+        with pytest.raises(KeyError):
+            asyncio.run(scenario())
+
+    def test_slow_query_does_not_block_event_loop(self, pool: ConnectionPool):
+        def slow_report(model: SQLiteModel):
+            time.sleep(0.2)
+            return model.sales().len()
+
+        async def scenario():
+            ticks = 0
+
+            async def heartbeat():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            beat = asyncio.create_task(heartbeat())
+            result = await pool.async_model().run(slow_report)
+            beat.cancel()
+            return result, ticks
+
+        result, ticks = asyncio.run(scenario())
+        assert result == 0
+        assert ticks >= 5
+
+    def test_wrap_standalone_model(self):
+        model = SQLiteModel(':memory:')
+
+        async def scenario():
+            wrapped = AsyncModel.wrap(model)
+            await wrapped.suppliers().add("Поставщик")
+            return await wrapped.suppliers().len()
+
+        assert asyncio.run(scenario()) == 1
+        model.close()
@@ -0,0 +1,98 @@
+import pytest
+
+from tests.core import SQLiteModel, conn, model
+from sql_model.bom import cost, demand
+
+
+def bom_queries(model: SQLiteModel, action) -> list:
+    """Выполняет action и возвращает запросы, читавшие product_stock."""
+    statements = []
+    model._conn.raw.set_trace_callback(statements.append)
+    try:
+        action()
+    finally:
+        model._conn.raw.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith('SELECT') and 'FROM product_stock' in s]
+
+
+def test_demand_and_cost_are_matrix_products():
+    rows = {1: ((10, 11), (0.5, 0.1)), 2: ((10,), (1.0,))}
+    assert demand(rows, [(1, 4), (2, 1), (1, 2), (3, 5)]) == {10: 4.0, 11: pytest.approx(0.6)}
+    assert cost(rows, {10: 20, 11: 5}) == {1: 10.5, 2: 20.0}
+
+
+class TestBomMatrix:
+
+    @pytest.fixture(autouse=True)
+    def setup_data(self, model: SQLiteModel):
+        model.stock().add('Мука', 'Materials', 100, 'kg')
+        model.stock().add('Соль', 'Materials', 10, 'kg')
+        model.products().add('Хлеб', 100, [{'name': 'Мука', 'quantity': 0.5}, {'name': 'Соль', 'quantity': 0.1}])
+        model.products().add('Булка', 40, [{'name': 'Мука', 'quantity': 0.2}])
+        self.bread = model.products().by_name('Хлеб')
+        self.bun = model.products().by_name('Булка')
+        self.flour = model.stock().get('Мука')
+
+    def test_basket_demand(self, model: SQLiteModel):
+        need = model.bom.demand([(self.bread.id, 2), (self.bun.id, 5)])
+        assert need[self.flour.id] == pytest.approx(2.0)
+        assert model.bom.demand([]) == {}
+
+    def test_recipe_change_refreshes_only_its_row(self, model: SQLiteModel):
+        model.bom.rows()
+        stats = model.bom.matrix.stats()
+
+        def change():
+            model.products().update(self.bun.id, 'Булка', 40, [{'name': 'Мука', 'quantity': 0.3}])
+            return model.bom.demand([(self.bun.id, 10)])
+
+        queries = bom_queries(model, change)
+        assert all('WHERE product_id IN' in q for q in queries)
+        assert model.bom.demand([(self.bun.id, 10)])[self.flour.id] == pytest.approx(3.0)
+        after = model.bom.matrix.stats()
+        assert after['refreshes'] == stats['refreshes'] + 1
+        assert after['misses'] == stats['misses']
+
+    def test_rolled_back_recipe_never_reaches_matrix(self, model: SQLiteModel):
+        model.bom.rows()
+        refreshes = model.bom.matrix.stats()['refreshes']
+
+        with pytest.raises(RuntimeError):
+            with model.transaction():
+                model.products().update(self.bun.id, 'Булка', 40, [{'name': 'Мука', 'quantity': 0.9}])
+                # До commit общая матрица не меняется
+                assert model.bom.matrix.stats()['refreshes'] == refreshes
+                raise RuntimeError("сбой")
+
+        assert model.bom.matrix.stats()['refreshes'] == refreshes
+        assert model.bom.demand([(self.bun.id, 10)])[self.flour.id] == pytest.approx(2.0)
+
+        with model.transaction():
+            model.products().update(self.bun.id, 'Булка', 40, [{'name': 'Мука', 'quantity': 0.9}])
+        assert model.bom.matrix.stats()['refreshes'] == refreshes + 1
+        assert model.bom.demand([(self.bun.id, 10)])[self.flour.id] == pytest.approx(9.0)
+
+    def test_deleted_product_leaves_matrix(self, model: SQLiteModel):
+        model.bom.rows()
+        model.products().delete('Булка')
+        assert self.bun.id not in model.bom.rows()
+        assert model.bom.matrix.stats()['products'] == 1
+
+    def test_warm_matrix_serves_sales_without_queries(self, model: SQLiteModel):
+        model.sales().add('Хлеб', 100, 1, 0)  # прогрев
+        assert not bom_queries(model, lambda: model.sales().add('Хлеб', 100, 2, 0))
+        assert model.stock().get('Мука').quantity == pytest.approx(98.5)
+
+    def test_plan_and_costs(self, model: SQLiteModel):
+        # Цена запаса - цена по умолчанию его вида расхода (100 за единицу)
+        costs = {row['name']: row for row in model.products().costs()}
+        assert costs['Хлеб']['cost'] == pytest.approx(60)
+        assert costs['Хлеб']['margin'] == pytest.approx(40)
+        assert costs['Булка']['cost'] == pytest.approx(20)
+
+        lines = model.products().plan([{'product_id': self.bread.id, 'quantity': 150}])
+        salt = next(line for line in lines if line['name'] == 'Соль')
+        assert salt['required'] == pytest.approx(15)
+        assert salt['available'] == 10
+        with pytest.raises(ValueError):
+            model.products().plan([{'product_id': 999999, 'quantity': 1}])
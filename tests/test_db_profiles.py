@@ -0,0 +1,64 @@
+import pytest
+
+from sql_model.database import (
+    DB_PATH, PERFORMANCE_PROFILES, create_connection, get_db_path, get_profile_name, read_pragmas
+)
+from sql_model.benchmark import compare_profiles
+from sql_model.model import SQLiteModel
+
+
+class TestPerformanceProfiles:
+
+    def test_fast_profile_pragmas(self, tmp_path):
+        conn = create_connection(str(tmp_path / "fast.db"), 'fast')
+        pragmas = read_pragmas(conn)
+        conn.close()
+
+        assert pragmas['journal_mode'] == 'wal'
+        assert pragmas['synchronous'] == 1  # NORMAL
+        assert pragmas['temp_store'] == 2   # MEMORY
+        assert pragmas['cache_size'] == PERFORMANCE_PROFILES['fast']['cache_size']
+        assert pragmas['busy_timeout'] == 5000
+
+    def test_legacy_profile_restores_rollback_journal(self, tmp_path):
+        db_file = str(tmp_path / "legacy.db")
+        create_connection(db_file, 'fast').close()
+
+        conn = create_connection(db_file, 'legacy')
+        pragmas = read_pragmas(conn)
+        conn.close()
+
+        assert pragmas['journal_mode'] == 'delete'
+        assert pragmas['synchronous'] == 2  # FULL
+
+    def test_profile_from_environment(self, monkeypatch):
+        monkeypatch.setenv('BAKERY_DB_PROFILE', 'durable')
+        assert get_profile_name() == 'durable'
+
+        monkeypatch.setenv('BAKERY_DB_PROFILE', 'turbo')
+        with pytest.raises(ValueError, match="turbo"):
+            get_profile_name()
+
+    def test_db_path_from_environment(self, monkeypatch):
+        monkeypatch.delenv('BAKERY_DB_PATH', raising=False)
+        assert get_db_path() == DB_PATH
+
+        monkeypatch.setenv('BAKERY_DB_PATH', '/data/bakery.db')
+        assert get_db_path() == '/data/bakery.db'
+
+    def test_model_opens_configured_db_path(self, tmp_path, monkeypatch):
+        db_file = tmp_path / "configured.db"
+        monkeypatch.setenv('BAKERY_DB_PATH', str(db_file))
+        model = SQLiteModel()
+        model.close()
+
+        assert model.db_file == str(db_file)
+        assert db_file.exists()
+
+    def test_compare_profiles_runs_same_workload(self):
+        results = compare_profiles(sales=5, orders=2)
+
+        assert [r['profile'] for r in results] == list(PERFORMANCE_PROFILES)
+        for r in results:
+            assert r['sales'] == 5 and r['orders'] == 2
+            assert r['total_seconds'] > 0
@@ -0,0 +1,79 @@
+import pytest
+
+from sql_model.database import create_connection
+from sql_model.migrations import MIGRATIONS, Migration, current_version, migrate
+
+
+@pytest.fixture
+def conn():
+    conn = create_connection(':memory:')
+    yield conn
+    conn.close()
+
+
+class TestMigrations:
+
+    def test_fresh_database_gets_latest_version(self, conn):
+        applied = migrate(conn)
+
+        latest = max(m.version for m in MIGRATIONS)
+        assert applied == sorted(m.version for m in MIGRATIONS)
+        assert current_version(conn) == latest
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert {'units', 'products', 'sales', 'orders', 'writeoffs'} <= tables
+
+    def test_second_run_applies_nothing(self, conn):
+        migrate(conn)
+        assert migrate(conn) == []
+        # Справочники не задублированы
+        assert conn.execute("SELECT COUNT(*) FROM units").fetchone()[0] == 4
+
+    def test_only_missing_steps_are_applied(self, conn):
+        migrate(conn)
+        calls = []
+        extra = Migration(1000, "test step", lambda c: calls.append(c.execute("SELECT 1").fetchone()[0]))
+
+        assert migrate(conn, MIGRATIONS + [extra]) == [1000]
+        assert migrate(conn, MIGRATIONS + [extra]) == []
+        assert calls == [1]
+        assert current_version(conn) == 1000
+
+    def test_failed_step_is_rolled_back(self, conn):
+        migrate(conn)
+        version = current_version(conn)
+
+        def broken(c):
+            c.execute("CREATE TABLE half_done (id INTEGER)")
+            c.execute("INSERT INTO no_such_table VALUES (1)")
+
+        with pytest.raises(RuntimeError, match="test broken"):
+            migrate(conn, MIGRATIONS + [Migration(1000, "test broken", broken)])
+
+        assert current_version(conn) == version
+        assert conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 'half_done'"
+        ).fetchone()[0] == 0
+
+    def test_legacy_database_without_version_table(self, conn):
+        """БД, созданная до появления миграций, принимается без ошибок."""
+        conn.execute("CREATE TABLE units (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+        conn.execute("INSERT INTO units (name) VALUES ('kg')")
+        conn.commit()
+
+        migrate(conn)
+
+        assert current_version(conn) == max(m.version for m in MIGRATIONS)
+        assert conn.execute("SELECT COUNT(*) FROM units").fetchone()[0] == 4
+
+    def test_sale_product_names_backfilled(self, conn):
+        migrate(conn, [m for m in MIGRATIONS if m.version < 11])
+        conn.execute("INSERT INTO products (id, name, price) VALUES (1, 'Батон', 50)")
+        conn.execute(
+            "INSERT INTO sales (product_id, product_name, price, quantity, discount, date, date_ts, net_amount) "
+            "VALUES (1, 'Хлеб', 50, 1, 0, '2026-01-01 10:00', 1767261600, 50)"
+        )
+        conn.commit()
+
+        assert migrate(conn) == [11]
+        rows = conn.execute("SELECT product_name, product_id FROM sale_product_names").fetchall()
+        assert [tuple(row) for row in rows] == [('Хлеб', 1)]
@@ -70,3 +70,76 @@ class TestOrdersRepository:
         
         # Check no sales recorded
         assert model.sales().empty() is True
+
+    def test_listing_items_match_by_id(self, model: SQLiteModel):
+        repo = model.orders()
+        repo.add(items=[{'product_id': self.bread_id, 'quantity': 1.0}])
+        repo.add(items=[{'product_id': self.bread_id, 'quantity': 2.0}, {'product_id': self.bread_id, 'quantity': 3.0}])
+
+        for order in repo.data() + repo.get_pending():
+            assert order.items == repo.by_id(order.id).items
+
+    @pytest.mark.parametrize("count", [1, 20])
+    def test_listing_query_count_is_constant(self, model: SQLiteModel, count: int):
+        """Orders and their items are loaded with a fixed number of queries."""
+        repo = model.orders()
+        for _ in range(count):
+            repo.add(items=[{'product_id': self.bread_id, 'quantity': 1.0}])
+
+        statements = []
+        model._conn.raw.set_trace_callback(statements.append)
+        orders = repo.data()
+        pending = repo.get_pending()
+        model._conn.raw.set_trace_callback(None)
+
+        assert len(orders) == len(pending) == count
+        # data(): one query per status + items; get_pending(): orders + items
+        assert len(statements) == 5
+
+    def test_complete_many_serves_orders_in_sequence(self, model: SQLiteModel):
+        repo = model.orders()
+        first = repo.add(items=[{'product_id': self.bread_id, 'quantity': 8.0}])   # 4 kg
+        second = repo.add(items=[{'product_id': self.bread_id, 'quantity': 16.0}]) # 8 kg - short
+        third = repo.add(items=[{'product_id': self.bread_id, 'quantity': 12.0}])  # 6 kg
+
+        results = repo.complete_many([first.id, second.id, third.id])
+
+        assert [r['order_id'] for r in results] == [first.id, second.id, third.id]
+        assert [r['completed'] for r in results] == [True, False, True]
+        assert results[1]['shortages'] == [{'name': 'Flour', 'required': 8.0, 'available': 6.0}]
+        assert model.stock().get('Flour').quantity == 0.0
+        assert repo.by_id(first.id).status == 'completed'
+        assert repo.by_id(second.id).status == 'pending'
+        assert repo.by_id(third.id).status == 'completed'
+        assert [s.quantity for s in model.sales().data()] == [12.0, 8.0]
+
+    def test_complete_many_reports_unknown_and_completed_orders(self, model: SQLiteModel):
+        repo = model.orders()
+        done = repo.add(items=[{'product_id': self.bread_id, 'quantity': 1.0}])
+        repo.complete(done.id)
+
+        results = repo.complete_many([done.id, 999999, done.id])
+
+        assert len(results) == 2
+        assert results[0]['completed'] is False
+        assert 'already completed' in results[0]['error']
+        assert 'not found' in results[1]['error']
+        assert model.sales().len() == 1
+
+    def test_complete_many_writes_one_transaction(self, model: SQLiteModel):
+        repo = model.orders()
+        ids = [repo.add(items=[{'product_id': self.bread_id, 'quantity': 1.0}]).id for _ in range(5)]
+
+        statements = []
+        model._conn.raw.set_trace_callback(statements.append)
+        try:
+            results = repo.complete_many(ids)
+        finally:
+            model._conn.raw.set_trace_callback(None)
+
+        assert all(r['completed'] for r in results)
+        normalized = [s.strip().upper() for s in statements]
+        assert normalized.count('COMMIT') == 1
+        assert sum(1 for s in normalized if 'UPDATE STOCK SET QUANTITY' in s) == 1
+        assert model.stock().get('Flour').quantity == 7.5
+        assert model.sales().len() == 5
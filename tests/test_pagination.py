@@ -0,0 +1,152 @@
+import pytest
+
+from tests.core import SQLiteModel, conn, model
+from sql_model.pagination import decode_cursor, encode_cursor, next_cursor
+
+# Даты идут не по порядку вставки, две строки - в одну минуту
+DATES = ['2026-01-02 10:00', '2026-01-05 09:00', '2026-01-03 12:00', '2026-01-05 09:00', '2026-01-01 08:00']
+
+
+def walk(fetch, key: str, limit: int):
+    """Проходит все страницы и возвращает id строк в порядке выдачи."""
+    seen, after = [], None
+    while True:
+        page = fetch(after=after, limit=limit)
+        seen.extend(row['id'] if isinstance(row, dict) else row.id for row in page)
+        after = next_cursor(page, limit, key)
+        if after is None:
+            return seen
+
+
+class TestCursor:
+
+    def test_roundtrip(self):
+        assert decode_cursor(encode_cursor('2026-01-05 09:00', 7)) == ('2026-01-05 09:00', 7)
+
+    @pytest.mark.parametrize("cursor", ['', 'abc', 'x:2026-01-01'])
+    def test_invalid_cursor(self, cursor: str):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+    def test_last_page_has_no_cursor(self):
+        assert next_cursor([{'id': 1, 'date': 'd'}], 2, 'date') is None
+        assert next_cursor([{'id': 1, 'date': 'd'}], 1, 'date') == '1:d'
+
+
+class TestKeysetPages:
+
+    @pytest.fixture(autouse=True)
+    def setup_data(self, model: SQLiteModel):
+        model.stock().add('Мука', "Materials", 100, 'kg')
+        model.products().add(name='Хлеб', price=100, materials=[{'name': 'Мука', 'quantity': 0.5}])
+        self.bread_id = model.products().by_name('Хлеб').id
+
+    @pytest.mark.parametrize("limit", [1, 2, 3, 10])
+    def test_sales_pages_match_full_list(self, model: SQLiteModel, limit: int):
+        for date in DATES:
+            model.sales().add('Хлеб', 100, 1, 0)
+            model._conn.execute(
+                "UPDATE sales SET date = ?, date_ts = CAST(strftime('%s', ?) AS INTEGER) "
+                "WHERE id = (SELECT MAX(id) FROM sales)", (date, date)
+            )
+        expected = [s.id for s in model.sales().data()]
+        assert walk(model.sales().data, 'date_ts', limit) == expected
+
+    def test_sales_query_pages_ascending(self, model: SQLiteModel):
+        for date in DATES:
+            model.sales().add('Хлеб', 100, 1, 0)
+            model._conn.execute(
+                "UPDATE sales SET date = ?, date_ts = CAST(strftime('%s', ?) AS INTEGER) "
+                "WHERE id = (SELECT MAX(id) FROM sales)", (date, date)
+            )
+        fetch = lambda **page: model.sales().query(date_from='2026-01-02', order='asc', **page)
+        assert walk(fetch, 'date_ts', 2) == [s.id for s in model.sales().query(date_from='2026-01-02', order='asc')]
+
+    @pytest.mark.parametrize("limit", [1, 2, 3, 10])
+    def test_orders_pages_match_full_list(self, model: SQLiteModel, limit: int):
+        for n, date in enumerate(DATES):
+            order = model.orders().add([{'product_id': self.bread_id, 'quantity': 1}])
+            status = 'completed' if n % 2 else 'pending'
+            model._conn.execute("UPDATE orders SET created_date = ?, status = ? WHERE id = ?", (date, status, order.id))
+
+        orders = model.orders().data()
+        statuses = [o.status for o in orders]
+        assert statuses == sorted(statuses, reverse=True)  # сначала ожидающие
+        assert walk(model.orders().data, ('status', 'created_date'), limit) == [o.id for o in orders]
+
+    @pytest.mark.parametrize("limit", [1, 2, 10])
+    def test_writeoffs_pages_match_full_list(self, model: SQLiteModel, limit: int):
+        for date in DATES:
+            model.writeoffs().add('Мука', 'stock', 1, 'Брак')
+            model._conn.execute("UPDATE writeoffs SET date = ? WHERE id = (SELECT MAX(id) FROM writeoffs)", (date,))
+        expected = [w.id for w in model.writeoffs().data()]
+        assert walk(model.writeoffs().data, 'date', limit) == expected
+
+    @pytest.mark.parametrize("limit", [1, 2, 10])
+    def test_expense_documents_pages_match_full_list(self, model: SQLiteModel, limit: int):
+        supplier = model.suppliers().add('Поставщик')
+        for date in DATES:
+            model.expense_documents().add(date, supplier.id, 10, '', [])
+        repo = model.expense_documents()
+        expected = [d['id'] for d in repo.get_documents_with_details()]
+        assert walk(repo.get_documents_with_details, 'date', limit) == expected
+
+    @pytest.mark.parametrize("limit", [1, 2, 10])
+    def test_rows_of_one_minute_come_newest_first(self, model: SQLiteModel, limit: int):
+        """Строки с одинаковой датой идут по убыванию id, и страницы их не теряют."""
+        supplier = model.suppliers().add('Поставщик')
+        for _ in range(4):
+            model.sales().add('Хлеб', 100, 1, 0)
+            model.writeoffs().add('Мука', 'stock', 1, 'Брак')
+            model.expense_documents().add('2026-01-05 09:00', supplier.id, 10, '', [])
+        model._conn.execute("UPDATE sales SET date = '2026-01-05 09:00', date_ts = 1767603600")
+        model._conn.execute("UPDATE writeoffs SET date = '2026-01-05 09:00'")
+        model._conn.commit()
+
+        sales = [s.id for s in model.sales().data()]
+        writeoffs = [w.id for w in model.writeoffs().data()]
+        documents = [d['id'] for d in model.expense_documents().get_documents_with_details()]
+        journal = [r['id'] for r in model.writeoffs().journal()]
+        for ids in (sales, writeoffs, documents, journal):
+            assert ids == sorted(ids, reverse=True)
+
+        assert walk(model.sales().data, 'date_ts', limit) == sales
+        assert walk(model.writeoffs().data, 'date', limit) == writeoffs
+        assert walk(model.writeoffs().journal, 'date', limit) == journal
+        assert walk(model.expense_documents().get_documents_with_details, 'date', limit) == documents
+        assert model.sales().query(order='asc') == list(reversed(model.sales().data()))
+
+    @pytest.mark.parametrize("limit", [1, 2, 10])
+    def test_search_pages_hold_only_matches(self, model: SQLiteModel, limit: int):
+        """Поиск выполняется в запросе: страницы заполнены совпадениями, совпадения не теряются."""
+        supplier = model.suppliers().add('Мельница')
+        other = model.suppliers().add('Пекарня')
+        for n, date in enumerate(DATES * 2):
+            model.expense_documents().add(date, other.id, 10, 'Мука' if n % 3 else 'Аренда', [])
+            info = 'Свадьба' if n % 2 else 'Обычный'
+            order = model.orders().add([{'product_id': self.bread_id, 'quantity': 1}], additional_info=info)
+            model._conn.execute("UPDATE orders SET created_date = ? WHERE id = ?", (date, order.id))
+        model.expense_documents().add('2026-01-04 10:00', supplier.id, 10, '', [])
+
+        documents = model.expense_documents()
+        fetch = lambda **page: documents.get_documents_with_details(search='мУКа', **page)
+        expected = [d['id'] for d in documents.get_documents_with_details()
+                    if 'мука' in (d['comment'] or '').casefold()]
+        assert len(expected) == 6
+        assert walk(fetch, 'date', limit) == expected
+        assert [d['supplier_name'] for d in documents.get_documents_with_details(search='мельн')] == ['Мельница']
+
+        fetch = lambda **page: model.orders().data(search='свадьба', **page)
+        expected = [o.id for o in model.orders().data() if o.additional_info == 'Свадьба']
+        assert len(expected) == 5
+        assert walk(fetch, ('status', 'created_date'), limit) == expected
+        assert fetch(limit=limit)[0].additional_info == 'Свадьба'
+
+    def test_get_document_by_id(self, model: SQLiteModel):
+        supplier = model.suppliers().add('Мельница')
+        doc_id = model.expense_documents().add('2026-01-04 10:00', supplier.id, 10, 'Мука', [])
+        assert model.expense_documents().get_document(doc_id) == {
+            'id': doc_id, 'date': '2026-01-04 10:00', 'total_amount': 10, 'comment': 'Мука',
+            'supplier_name': 'Мельница', 'items_count': 0,
+        }
+        assert model.expense_documents().get_document(doc_id + 1) is None
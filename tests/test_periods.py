@@ -0,0 +1,135 @@
+import sqlite3
+
+import pytest
+
+from tests.core import SQLiteModel, conn, model
+from repositories.periods import ClosedPeriodError, next_period
+
+
+class TestPeriodClosing:
+
+    @pytest.fixture(autouse=True)
+    def setup_data(self, model: SQLiteModel):
+        # Запас создает вид расхода с тем же именем и ценой 100
+        model.stock().add('Мука', 'Materials', 1000, 'kg')
+        model.products().add('Хлеб', 100, [{'name': 'Мука', 'quantity': 0.5}])
+        self.flour = model.expense_types().get('Мука')
+        self.mill = model.suppliers().add('Мельница')
+
+    def sell_on(self, model: SQLiteModel, quantity: float, date: str):
+        sale, = model.sales().add_basket([{'name': 'Хлеб', 'price': 100, 'quantity': quantity, 'discount': 0}])
+        model._conn.execute(
+            "UPDATE sales SET date = ?, date_ts = CAST(strftime('%s', ?) AS INTEGER) WHERE id = ?",
+            (date, date, sale.id)
+        )
+        model._conn.commit()
+        return sale
+
+    def write_off_on(self, model: SQLiteModel, item: str, item_type: str, quantity: float, date: str):
+        model.writeoffs().add(item, item_type, quantity, 'Брак')
+        model._conn.execute("UPDATE writeoffs SET date = ? WHERE id = (SELECT MAX(id) FROM writeoffs)", (date,))
+        model._conn.commit()
+
+    def spend(self, model: SQLiteModel, date: str, amount: float) -> int:
+        items = [{'expense_type_id': self.flour.id, 'quantity': 1, 'price_per_unit': amount, 'unit_id': 1}]
+        return model.expense_documents().add(date, self.mill.id, amount, '', items)
+
+    def history(self, model: SQLiteModel):
+        self.sell_on(model, 2, '2026-01-10 09:00')
+        self.sell_on(model, 1, '2026-03-05 10:00')
+        self.spend(model, '2026-01-03', 150)
+        self.spend(model, '2026-03-01 08:00', 40)
+        self.write_off_on(model, 'Мука', 'stock', 2, '2026-01-20 18:00')
+        self.write_off_on(model, 'Хлеб', 'product', 1, '2026-03-02 18:00')
+
+    def test_next_period(self):
+        assert next_period('2026-01') == '2026-02'
+        assert next_period('2026-12') == '2027-01'
+
+    def test_close_freezes_every_open_month(self, model: SQLiteModel):
+        self.history(model)
+
+        closed = model.periods().close('2026-02')
+
+        assert [(s.period, s.income, s.expenses, s.writeoff_losses) for s in closed] == [
+            ('2026-01', 200.0, 150.0, 200.0),
+            ('2026-02', 0.0, 0.0, 0.0),
+        ]
+        assert model.periods().closed_until() == '2026-02'
+        assert model.periods().open_from() == '2026-03-01'
+        assert [s.period for s in model.periods().data()] == ['2026-01', '2026-02']
+
+        # Следующее закрытие начинается с первого открытого месяца
+        assert [s.period for s in model.periods().close('2026-03')] == ['2026-03']
+
+    def test_profit_and_loss_combines_snapshots_and_open_period(self, model: SQLiteModel):
+        self.history(model)
+        before = (model.calculate_income(), model.calculate_expenses(), model.periods().writeoff_losses())
+
+        model.periods().close('2026-01')
+        report = model.periods().profit_and_loss()
+
+        assert report['closed'] == {'income': 200.0, 'expenses': 150.0, 'writeoff_losses': 200.0, 'profit': 50.0}
+        assert report['open'] == {'income': 100.0, 'expenses': 40.0, 'writeoff_losses': 50.0, 'profit': 60.0}
+        assert report['total']['profit'] == 110.0
+        assert (model.calculate_income(), model.calculate_expenses(), model.periods().writeoff_losses()) == before
+        assert model.calculate_profit() == 110.0
+
+    def test_snapshot_ignores_later_price_changes(self, model: SQLiteModel):
+        self.write_off_on(model, 'Мука', 'stock', 2, '2026-01-20 18:00')
+        model.periods().close('2026-01')
+        model._conn.execute("UPDATE expense_types SET default_price = 1000 WHERE name = 'Мука'")
+        model._conn.commit()
+        model.reference.invalidate()
+
+        assert model.periods().writeoff_losses() == 200.0
+
+    def test_back_dated_writes_are_rejected(self, model: SQLiteModel):
+        self.history(model)
+        doc_id = self.spend(model, '2026-01-15 12:00', 10)
+        sale = model._conn.execute("SELECT id FROM sales WHERE date LIKE '2026-01%'").fetchone()[0]
+        model.periods().close('2026-01')
+
+        with pytest.raises(ClosedPeriodError):
+            self.spend(model, '2026-01-31 23:00', 10)
+        with pytest.raises(ClosedPeriodError):
+            model.expense_documents().delete(doc_id)
+
+        # Триггеры защищают снимки и от записи в обход репозиториев
+        for sql, params in [
+            ("DELETE FROM sales WHERE id = ?", (sale,)),
+            ("UPDATE sales SET quantity = 5 WHERE id = ?", (sale,)),
+            ("UPDATE expense_items SET total_price = 0 WHERE document_id = ?", (doc_id,)),
+            ("DELETE FROM writeoffs WHERE date < '2026-02'", ()),
+            ("UPDATE expense_documents SET date = '2026-02-01' WHERE id = ?", (doc_id,)),
+        ]:
+            with pytest.raises(sqlite3.IntegrityError, match="Период закрыт"):
+                model._conn.execute(sql, params)
+            model._conn.rollback()
+
+        # Открытый период не затронут
+        self.spend(model, '2026-02-01', 10)
+        assert model.periods().profit_and_loss()['closed']['expenses'] == 160.0
+
+    def test_reopen_allows_corrections(self, model: SQLiteModel):
+        doc_id = self.spend(model, '2026-01-15 12:00', 10)
+        model.periods().close('2026-02')
+
+        assert model.periods().reopen('2026-02') == 1
+        with pytest.raises(ClosedPeriodError):
+            model.expense_documents().delete(doc_id)
+
+        assert model.periods().reopen('2026-01') == 1
+        assert model.periods().reopen('2026-01') == 0
+        assert model.expense_documents().delete(doc_id)
+        assert model.calculate_expenses() == 0.0
+
+    @pytest.mark.parametrize("period", ['2026-1', '2026-13', 'январь', '2999-01'])
+    def test_close_rejects_invalid_or_unfinished_period(self, model: SQLiteModel, period: str):
+        with pytest.raises(ValueError):
+            model.periods().close(period)
+
+    def test_close_rejects_already_closed_period(self, model: SQLiteModel):
+        model.periods().close('2026-02')
+        with pytest.raises(ValueError, match="уже закрыт"):
+            model.periods().close('2026-01')
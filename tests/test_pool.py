@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from sql_model.pool import ConnectionPool, PoolTimeoutError
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """Пул поверх временного файла БД."""
+    pool = ConnectionPool(str(tmp_path / "pool.db"), readers=2, timeout=0.2)
+    pool.open()
+    yield pool
+    pool.close()
+
+
+class TestConnectionPool:
+
+    def test_models_are_reused(self, pool: ConnectionPool):
+        """Одно и то же соединение-читатель выдается повторно, а не создается заново."""
+        seen = set()
+        for _ in range(5):
+            with pool.reader() as model:
+                seen.add(id(model))
+        assert len(seen) <= pool.readers
+
+    def test_writer_changes_visible_to_readers(self, pool: ConnectionPool):
+        with pool.writer() as model:
+            model.stock().add('Мука', "Materials", 10, 'kg')
+
+        with pool.reader() as model:
+            assert model.stock().get('Мука').quantity == 10
+
+    def test_open_is_idempotent(self, pool: ConnectionPool):
+        pool.open()
+        assert pool.stats()['size'] == 3
+
+    def test_writes_go_through_writer_queue(self, pool: ConnectionPool):
+        with pool.writer() as model:
+            model.stock().add('Соль', "Materials", 1, 'kg')
+        assert pool.stats()['writer']['operations'] == 1
+
+    def test_uncommitted_transaction_rolled_back_on_return(self, pool: ConnectionPool):
+        with pool.reader() as model:
+            model._conn.execute("INSERT INTO units (name) VALUES ('box')")
+            assert model._conn.in_transaction
+
+        with pool.reader() as first, pool.reader() as second:
+            for model in (first, second):
+                assert not model._conn.in_transaction
+                assert 'box' not in model.utils().get_unit_names()
+
+    def test_stats_count_checkouts_and_waits(self, pool: ConnectionPool):
+        with pool.reader():
+            with pool.reader():
+                # Оба читателя заняты, третий должен дождаться возврата
+                released = threading.Event()
+
+                def wait_for_reader():
+                    with pool.reader():
+                        released.set()
+
+                t = threading.Thread(target=wait_for_reader)
+                t.start()
+                assert not released.wait(0.05)
+        t.join()
+        assert released.is_set()
+
+        stats = pool.stats()
+        assert stats['checkouts'] == 3
+        assert stats['waits'] == 1
+        assert stats['readers_available'] == 2
+        assert stats['checkout_ms_max'] > 0
+
+    def test_checkout_timeout(self, pool: ConnectionPool):
+        with pool.reader(), pool.reader():
+            with pytest.raises(PoolTimeoutError):
+                with pool.reader():
+                    pass
+        assert pool.stats()['timeouts'] == 1
+
+    def test_checkout_requires_open_pool(self, tmp_path):
+        pool = ConnectionPool(str(tmp_path / "closed.db"))
+        with pytest.raises(RuntimeError):
+            with pool.reader():
+                pass
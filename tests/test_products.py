@@ -1,3 +1,5 @@
+import pytest
+
 from tests.core import SQLiteModel, model, conn
 
 class TestProductsRepository:
@@ -88,3 +90,29 @@ class TestProductsRepository:
         assert data[0].name == 'Торт'
         assert data[1].price == 50
         assert len(data[0].materials) == 1 # Проверка, что рецепт загрузился
+
+    def test_data_matches_recipes(self, model: SQLiteModel):
+        repo = model.products()
+        model.stock().add('Соль', "Materials", 10, 'kg')
+        model.stock().add('Мука', "Materials", 10, 'kg')
+        repo.add(name='Хлеб', price=100, materials=[{'name': 'Мука', 'quantity': 0.5}, {'name': 'Соль', 'quantity': 0.01}])
+        repo.add(name='Лепешка', price=40, materials=[{'name': 'Мука', 'quantity': 0.2}])
+
+        for product in repo.data():
+            assert product.materials == repo.get_materials_for_product(product.id)
+
+    @pytest.mark.parametrize("count", [1, 10])
+    def test_data_query_count_is_constant(self, model: SQLiteModel, count: int):
+        """Каталог загружается фиксированным числом запросов при любом числе продуктов."""
+        repo = model.products()
+        model.stock().add('Мука', "Materials", 100, 'kg')
+        for i in range(count):
+            repo.add(name=f'Продукт {i}', price=10, materials=[{'name': 'Мука', 'quantity': 0.1}])
+
+        statements = []
+        model._conn.raw.set_trace_callback(statements.append)
+        data = repo.data()
+        model._conn.raw.set_trace_callback(None)
+
+        assert len(data) == count
+        assert len(statements) == 2
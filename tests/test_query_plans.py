@@ -0,0 +1,192 @@
+import re
+from typing import List
+
+import pytest
+
+from tests.core import SQLiteModel, conn, model
+from sql_model.migrations import MANAGED_INDEXES
+
+# Таблицы, которые растут вместе с историей работы пекарни
+HOT_TABLES = {
+    'sales', 'orders', 'order_items', 'writeoffs',
+    'expense_documents', 'expense_items', 'product_stock', 'order_reservations',
+}
+
+# Запросы, которые сознательно читают всю горячую таблицу с фильтром.
+# Список должен только сокращаться.
+KNOWN_FULL_SCANS: List[re.Pattern] = []
+
+# Горячие запросы репозиториев и индекс, которым они обязаны пользоваться
+HOT_QUERIES = [
+    ("FROM order_items WHERE order_id", 'idx_order_items_order_id'),
+    ("FROM orders WHERE status = 'pending' ORDER BY completion_date", 'idx_orders_status_completion'),
+    ("FROM orders WHERE status = 'completed' ORDER BY created_date", 'idx_orders_status_created'),
+    ("FROM orders WHERE status = 'pending' AND (created_date", 'idx_orders_status_created'),
+    ("FROM sales ORDER BY date_ts", 'idx_sales_date_ts_net_amount'),
+    ("FROM sales WHERE date_ts", 'idx_sales_date_ts_net_amount'),
+    ("SELECT SUM(net_amount) FROM sales WHERE date_ts", 'COVERING INDEX idx_sales_date_ts_net_amount'),
+    ("FROM sales WHERE product_id", 'idx_sales_product_date_ts'),
+    ("FROM writeoffs ORDER BY date", 'idx_writeoffs_date'),
+    ("FROM writeoffs WHERE date", 'idx_writeoffs_date'),
+    ("FROM writeoffs w", 'idx_writeoffs_date'),
+    ("FROM expense_documents d", 'idx_expense_documents_date'),
+    ("FROM expense_documents WHERE supplier_id", 'idx_expense_documents_supplier_id'),
+    ("FROM expense_items i JOIN expense_types et", 'idx_expense_items_document_id'),
+    ("FROM product_stock WHERE stock_id", 'idx_product_stock_stock_id'),
+    ("FROM product_stock pi", 'sqlite_autoindex_product_stock_1'),
+    ("FROM order_reservations WHERE order_id", 'PRIMARY KEY'),
+    ("FROM daily_sales_summary WHERE day", 'PRIMARY KEY'),
+]
+
+_KEYWORDS = {'WHERE', 'ON', 'JOIN', 'LEFT', 'INNER', 'ORDER', 'GROUP', 'LIMIT', 'SET', 'USING'}
+
+
+def run_workload(model: SQLiteModel) -> List[str]:
+    """Вызывает все методы репозиториев, работающие с БД, и возвращает выполненный SQL."""
+    statements = []
+    model._conn.raw.set_trace_callback(statements.append)
+
+    model.stock().add('Мука', 'Materials', 100, 'kg')
+    model.stock().add('Соль', 'Materials', 100, 'kg')
+    model.products().add('Хлеб', 100, [{'name': 'Мука', 'quantity': 0.5}])
+    bread = model.products().by_name('Хлеб')
+    model.products().update(bread.id, 'Хлеб', 120, [{'name': 'Мука', 'quantity': 0.5}, {'name': 'Соль', 'quantity': 0.1}])
+    model.products().data()
+    model.products().add('Вода', 50, [])
+    model.products().delete('Вода')
+
+    model.sales().add('Хлеб', 120, 2, 0)
+    model.sales().data()
+    model.sales().data(after='1:1767225600', limit=50)
+    model.sales().search('Хл')
+    model.products().update(bread.id, 'Батон', 120, [{'name': 'Мука', 'quantity': 0.5}, {'name': 'Соль', 'quantity': 0.1}])
+    model.sales().search('Хл')
+    model.sales().search('Бат')
+    model.products().update(bread.id, 'Хлеб', 120, [{'name': 'Мука', 'quantity': 0.5}, {'name': 'Соль', 'quantity': 0.1}])
+    model.sales().search('2026-01')
+    model.sales().query(date_from='2026-01-01', date_to='2026-01-31', order='asc', limit=10)
+    model.sales().query(date_from='2026-01-01', product_id=bread.id)
+    model.sales().salesByProduct()
+    model.sales().revenue_by_day('2026-01-01', '2026-01-07')
+    model.sales().revenue('2026-01-01', '2026-01-07 12:00')
+    model.sales().len()
+
+    model.orders().availability([{'product_id': bread.id, 'quantity': 1}])
+    order = model.orders().add([{'product_id': bread.id, 'quantity': 1}])
+    model.orders().data()
+    model.orders().data(after='1:pending|2026-01-01 10:00', limit=50)
+    model.orders().get_pending()
+    model.orders().complete(order.id)
+    other = model.orders().add([{'product_id': bread.id, 'quantity': 1}])
+    model.orders().update_status(other.id, 'pending')
+    model.orders().delete(other.id)
+
+    model.writeoffs().add('Хлеб', 'product', 1, 'Брак')
+    model.writeoffs().add('Соль', 'stock', 1, 'Брак')
+    model.writeoffs().data()
+    model.writeoffs().data(after='1:2026-01-01 10:00', limit=50)
+    model.writeoffs().journal(limit=50)
+    model.writeoffs().journal(date_from='2026-01-01', date_to='2026-01-31', reason='брак',
+                              after='1:2026-01-31 10:00', limit=50)
+    model.writeoffs().len()
+
+    supplier = model.suppliers().add('Поставщик')
+    flour_type = model.expense_types().get('Мука')
+    doc_id = model.expense_documents().add(
+        '2026-01-01 10:00', supplier.id, 100, '',
+        [{'expense_type_id': flour_type.id, 'quantity': 1, 'price_per_unit': 100, 'unit_id': 1}]
+    )
+    model.expense_documents().get_documents_with_details()
+    model.expense_documents().get_documents_with_details(after='1:2026-01-01 10:00', limit=50)
+    model.expense_documents().get_document_items(doc_id)
+    model.reports().timeseries('revenue', 'week', '2026-01-01', '2026-12-31', 'product')
+    model.reports().timeseries('expenses', 'month', '2026-01-01', '2026-12-31', 'category')
+    model.reports().timeseries('expenses', 'day', '2026-01-01', '2026-01-31', 'supplier')
+    model.suppliers().can_delete_by_id(supplier.id)
+    model.expense_documents().delete(doc_id)
+
+    model.stock().can_delete('Соль')
+    model.stock().listing()
+    model.calculate_income()
+    model.calculate_expenses()
+    model.periods().close('2026-01')
+    model.periods().profit_and_loss()
+    model.periods().reopen('2026-01')
+
+    model._conn.raw.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().split()[0].upper() in ('SELECT', 'UPDATE', 'DELETE')]
+
+
+def query_plan(model: SQLiteModel, sql: str) -> List[str]:
+    return [row[3] for row in model._conn.raw.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def table_aliases(sql: str) -> dict:
+    """Сопоставляет имена/алиасы из плана с именами таблиц."""
+    aliases = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN|UPDATE)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql, re.I):
+        aliases[table] = table
+        if alias and alias.upper() not in _KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def plan_violations(sql: str, plan: List[str]) -> List[str]:
+    """Возвращает нарушения: полные сканы и сортировки горячих таблиц."""
+    if any(p.search(sql) for p in KNOWN_FULL_SCANS):
+        return []
+
+    aliases = table_aliases(sql)
+    touches_hot = any(t in HOT_TABLES for t in aliases.values())
+    single_table = not re.search(r"\bJOIN\b|\(\s*SELECT\b", sql, re.I)
+    problems = []
+
+    access_rows = [p for p in plan if p.startswith(('SCAN', 'SEARCH'))]
+    for position, detail in enumerate(access_rows):
+        name = detail.split()[1]
+        table = aliases.get(name, name)
+        if 'AUTOMATIC' in detail:
+            problems.append(f"временный автоиндекс: {detail}")
+        if not detail.startswith('SCAN') or table not in HOT_TABLES:
+            continue
+        if position > 0:
+            problems.append(f"скан во внутреннем цикле соединения: {detail}")
+        elif single_table and re.search(r"\bWHERE\b", sql, re.I):
+            problems.append(f"фильтр без индекса: {detail}")
+
+    if touches_hot and 'USE TEMP B-TREE FOR ORDER BY' in plan:
+        problems.append("сортировка всей выборки без индекса")
+    return problems
+
+
+class TestQueryPlans:
+
+    @pytest.fixture
+    def statements(self, model: SQLiteModel) -> List[str]:
+        return run_workload(model)
+
+    def test_managed_indexes_exist(self, model: SQLiteModel):
+        rows = model._conn.raw.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+        assert set(MANAGED_INDEXES) <= {row[0] for row in rows}
+
+    def test_no_full_scans_on_hot_tables(self, model: SQLiteModel, statements: List[str]):
+        failures = []
+        for sql in dict.fromkeys(statements):
+            plan = query_plan(model, sql)
+            for problem in plan_violations(sql, plan):
+                failures.append(f"{' '.join(sql.split())}\n    {problem}")
+        assert not failures, "\n".join(failures)
+
+    @pytest.mark.parametrize("fragment, index", HOT_QUERIES)
+    def test_hot_query_uses_index(self, model: SQLiteModel, statements: List[str], fragment: str, index: str):
+        matching = [s for s in statements if fragment in ' '.join(s.split())]
+        assert matching, f"Запрос '{fragment}' не выполнялся в нагрузке"
+        for sql in matching:
+            plan = query_plan(model, sql)
+            assert any(index in detail for detail in plan), f"{sql}\n{plan}"
+
+    def test_detects_missing_index(self, model: SQLiteModel):
+        """Проверка самого детектора: без индекса фильтр по order_id - полный скан."""
+        model._conn.raw.execute("DROP INDEX idx_order_items_order_id")
+        sql = "SELECT * FROM order_items WHERE order_id = 1"
+        assert plan_violations(sql, query_plan(model, sql))
@@ -0,0 +1,114 @@
+import pytest
+
+from tests.core import SQLiteModel, conn, model
+from sql_model.bom import BomMatrix
+from sql_model.recipes import RecipeCache
+
+
+def recipe_queries(model: SQLiteModel, action) -> list:
+    """Выполняет action и возвращает SQL, читавший продукты или рецепты."""
+    statements = []
+    model._conn.raw.set_trace_callback(statements.append)
+    try:
+        action()
+    finally:
+        model._conn.raw.set_trace_callback(None)
+    return [s for s in statements if 'FROM products' in s or 'FROM product_stock' in s]
+
+
+class TestRecipeCache:
+
+    @pytest.fixture(autouse=True)
+    def setup_data(self, model: SQLiteModel):
+        model.stock().add('Мука', 'Materials', 100, 'kg')
+        model.stock().add('Соль', 'Materials', 10, 'kg')
+        model.products().add('Хлеб', 100, [{'name': 'Мука', 'quantity': 0.5}, {'name': 'Соль', 'quantity': 0.1}])
+
+    def test_recipe_is_compact(self, model: SQLiteModel):
+        recipe = model.products().recipe('Хлеб')
+        flour, salt = model.stock().get('Мука'), model.stock().get('Соль')
+        assert recipe.product_id == model.products().by_name('Хлеб').id
+        assert recipe.stock_ids == (flour.id, salt.id)
+        assert recipe.quantities == (0.5, 0.1)
+        # Строки рецепта - строка матрицы рецептов, а не отдельная копия
+        assert (recipe.stock_ids, recipe.quantities) == model.bom.rows()[recipe.product_id]
+        assert model.products().recipe('Нет') is None
+
+    def test_warm_sales_and_writeoffs_make_no_recipe_queries(self, model: SQLiteModel):
+        model.sales().add('Хлеб', 100, 1, 0)  # прогрев
+
+        def work():
+            model.sales().add('Хлеб', 100, 2, 0)
+            model.writeoffs().add('Хлеб', 'product', 1, 'Брак')
+            order = model.orders().add([{'product_id': model.sales().data(limit=1)[0].product_id, 'quantity': 1}])
+            model.orders().complete(order.id)
+
+        queries = recipe_queries(model, work)
+        # Заказ сам читает цену продукта при создании; рецепты не читаются
+        assert not [q for q in queries if 'product_stock' in q]
+        assert model.stock().get('Мука').quantity == pytest.approx(100 - 0.5 * 5)
+        assert model.recipes.cache.stats()['hits'] >= 3
+
+    def test_update_invalidates(self, model: SQLiteModel):
+        bread = model.products().recipe('Хлеб')
+        model.products().update(bread.product_id, 'Батон', 90, [{'name': 'Мука', 'quantity': 1}])
+        assert model.products().recipe('Хлеб') is None
+        assert model.products().recipe('Батон').quantities == (1,)
+        model.sales().add('Батон', 90, 1, 0)
+        assert model.stock().get('Мука').quantity == 99
+        assert model.stock().get('Соль').quantity == 10
+
+    def test_add_and_delete_invalidate(self, model: SQLiteModel):
+        model.products().recipe('Хлеб')
+        model.products().add('Хлеб', 110, [{'name': 'Соль', 'quantity': 1}])
+        assert model.products().recipe('Хлеб').stock_ids == (model.stock().get('Соль').id,)
+        model.products().delete('Хлеб')
+        assert model.products().recipe('Хлеб') is None
+
+    def test_product_without_recipe_cannot_be_sold(self, model: SQLiteModel):
+        model.products().add('Вода', 50, [])
+        assert model.products().recipe('Вода').empty
+        with pytest.raises(ValueError):
+            model.sales().add('Вода', 50, 1, 0)
+
+
+def test_rolled_back_recipe_is_not_served(tmp_path):
+    """Рецепт, прочитанный внутри откаченной транзакции, не остается в общем кэше."""
+    db_file = str(tmp_path / "rollback.db")
+    writer, reader = SQLiteModel(db_file), SQLiteModel(db_file)
+    try:
+        writer.stock().add('Мука', 'Materials', 100, 'kg')
+        writer.products().add('Хлеб', 100, [{'name': 'Мука', 'quantity': 1}])
+        product_id = writer.products().recipe('Хлеб').product_id
+
+        with pytest.raises(RuntimeError):
+            with writer.transaction():
+                writer.products().update(product_id, 'Хлеб', 100, [{'name': 'Мука', 'quantity': 5}])
+                assert writer.products().recipe('Хлеб').quantities == (5,)
+                raise RuntimeError("сбой")
+
+        assert writer.products().recipe('Хлеб').quantities == (1,)
+        assert reader.products().recipe('Хлеб').quantities == (1,)
+        assert reader.orders().availability([{'product_id': product_id, 'quantity': 10}])[0]['required'] == 10
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_change_from_other_connection_reloads(tmp_path):
+    """Рецепт, измененный другим процессом, перечитывается по счетчику версии."""
+    db_file = str(tmp_path / "recipes.db")
+    first, second = SQLiteModel(db_file), SQLiteModel(db_file)
+    first.recipes.cache, first.bom.matrix = RecipeCache(), BomMatrix()
+    second.recipes.cache, second.bom.matrix = RecipeCache(), BomMatrix()
+    try:
+        first.stock().add('Мука', 'Materials', 100, 'kg')
+        first.products().add('Хлеб', 100, [{'name': 'Мука', 'quantity': 0.5}])
+        assert first.products().recipe('Хлеб').quantities == (0.5,)
+
+        product_id = second.products().recipe('Хлеб').product_id
+        second.products().update(product_id, 'Хлеб', 100, [{'name': 'Мука', 'quantity': 2}])
+        assert first.products().recipe('Хлеб').quantities == (2,)
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,141 @@
+import pytest
+
+from tests.core import SQLiteModel, conn, model
+from sql_model.reference import ReferenceCache
+
+
+def reference_queries(model: SQLiteModel, action) -> list:
+    """Выполняет action и возвращает SQL, прочитавший таблицы справочников."""
+    statements = []
+    model._conn.raw.set_trace_callback(statements.append)
+    try:
+        action()
+    finally:
+        model._conn.raw.set_trace_callback(None)
+    tables = ('FROM units', 'FROM stock_categories', 'FROM expense_categories', 'FROM expense_types')
+    return [s for s in statements if any(t in s for t in tables)]
+
+
+class TestReferenceCache:
+
+    def test_repeated_lookups_hit_cache(self, model: SQLiteModel):
+        utils = model.utils()
+        assert utils.get_unit_names() == ['kg', 'g', 'l', 'pc']
+        misses = utils.reference_stats()['misses']
+
+        queries = reference_queries(model, lambda: [
+            utils.get_unit_name_by_id(1), utils.get_stock_category_names(),
+            utils.get_expense_category_id_by_name('Materials'), model.expense_types().get('Нет'),
+        ])
+        stats = utils.reference_stats()
+        assert queries == []
+        assert stats['misses'] == misses
+        assert stats['hits'] >= 4
+        assert stats['version'] is not None
+
+    def test_lookup_maps(self, model: SQLiteModel):
+        utils = model.utils()
+        assert utils.get_unit_id_by_name('g') == 2
+        assert utils.get_stock_category_id_by_name('Packaging') == 2
+        assert utils.get_expense_category_name_by_id(utils.get_expense_category_id_by_name('Other')) == 'Other'
+        assert utils.get_unit_name_by_id(999) is None
+
+    def test_add_category_invalidates(self, model: SQLiteModel):
+        utils = model.utils()
+        utils.get_expense_category_names()
+        new_id = utils.add_expense_category('Аренда')
+        assert utils.get_expense_category_names()[-1] == 'Аренда'
+        assert utils.get_expense_category_id_by_name('Аренда') == new_id
+        assert utils.reference_stats()['invalidations'] == 1
+
+    def test_expense_type_add_and_delete_invalidate(self, model: SQLiteModel):
+        repo = model.expense_types()
+        repo.add('Аренда', 5000, 'Utilities')
+        assert repo.get('Аренда').default_price == 5000
+        repo.delete('Аренда')
+        assert repo.get('Аренда') is None
+
+    def test_raw_write_on_same_connection_is_seen(self, model: SQLiteModel):
+        model.utils().get_unit_names()
+        model._conn.execute("INSERT INTO units (name) VALUES ('box')")
+        model._conn.commit()
+        assert model.utils().get_unit_names()[-1] == 'box'
+
+    def test_change_from_other_connection_reloads(self, tmp_path):
+        """Изменение, сделанное другим соединением в обход кэша, видно по счетчику версии."""
+        db_file = str(tmp_path / "reference.db")
+        first, second = SQLiteModel(db_file), SQLiteModel(db_file)
+        # Отдельные кэши - как у двух процессов
+        first.reference.cache = ReferenceCache()
+        second.reference.cache = ReferenceCache()
+        try:
+            assert 'box' not in first.utils().get_unit_names()
+            second._conn.execute("INSERT INTO units (name) VALUES ('box')")
+            second._conn.commit()
+            assert first.utils().get_unit_names()[-1] == 'box'
+            assert first.reference.cache.stats()['version_checks'] == 1
+        finally:
+            first.close()
+            second.close()
+
+    def test_rolled_back_change_leaves_no_snapshot(self, tmp_path):
+        """Снимок, прочитанный внутри откаченной единицы работы, не переживает откат."""
+        db_file = str(tmp_path / "rollback.db")
+        writer, reader = SQLiteModel(db_file), SQLiteModel(db_file)
+        try:
+            with pytest.raises(RuntimeError):
+                with writer.transaction():
+                    writer.expense_types().add('Призрак', 10, 'Other')
+                    assert writer.expense_types().get('Призрак') is not None
+                    raise RuntimeError("сбой")
+            assert writer.expense_types().get('Призрак') is None
+            assert reader.expense_types().get('Призрак') is None
+
+            # Откат вложенной операции при фиксации внешнего блока
+            with writer.transaction():
+                with pytest.raises(RuntimeError):
+                    with writer.transaction():
+                        writer.utils().add_expense_category('Аренда')
+                        assert 'Аренда' in writer.utils().get_expense_category_names()
+                        raise RuntimeError("сбой")
+                writer.expense_types().add('Вода', 5, 'Utilities')
+            assert 'Аренда' not in reader.utils().get_expense_category_names()
+            assert reader.expense_types().get('Вода').default_price == 5
+        finally:
+            writer.close()
+            reader.close()
+
+    def test_shared_per_database_file(self, tmp_path):
+        db_file = str(tmp_path / "shared.db")
+        assert ReferenceCache.for_database(db_file) is ReferenceCache.for_database(db_file)
+        assert ReferenceCache.for_database(':memory:') is not ReferenceCache.for_database(':memory:')
+
+    def test_triggers_bump_version(self, model: SQLiteModel):
+        version = lambda: model._conn.execute("SELECT version FROM reference_version").fetchone()[0]
+        before = version()
+        model._conn.execute("UPDATE stock_categories SET name = name || '!' WHERE id = 3")
+        model._conn.execute("DELETE FROM units WHERE name = 'pc'")
+        assert version() == before + 2
+
+
+class TestExpenseDocumentReferenceLookups:
+
+    def test_items_do_not_query_reference_tables(self, model: SQLiteModel):
+        model.stock().add('Мука', 'Materials', 0, 'kg')
+        model.expense_types().add('Дрожжи', 100, 'Materials', stock=True)
+        supplier = model.suppliers().add('Поставщик')
+        flour, yeast = model.expense_types().get('Мука'), model.expense_types().get('Дрожжи')
+        items = [
+            {'expense_type_id': flour.id, 'quantity': 5, 'price_per_unit': 100, 'unit_id': 1},
+            {'expense_type_id': yeast.id, 'quantity': 1, 'price_per_unit': 300, 'unit_id': 1},
+        ]
+
+        queries = reference_queries(model, lambda: model.expense_documents().add('2026-01-01 10:00', supplier.id, 800, '', items))
+        assert queries == []
+        assert model.stock().get('Дрожжи').quantity == 1
+
+    def test_unknown_expense_type(self, model: SQLiteModel):
+        supplier = model.suppliers().add('Поставщик')
+        with pytest.raises(ValueError):
+            model.expense_documents().add('2026-01-01 10:00', supplier.id, 1, '',
+                                          [{'expense_type_id': 999, 'quantity': 1, 'price_per_unit': 1, 'unit_id': 1}])
@@ -0,0 +1,112 @@
+import pytest
+
+from tests.core import SQLiteModel, conn, model
+
+
+class TestTimeseries:
+
+    @pytest.fixture(autouse=True)
+    def setup_data(self, model: SQLiteModel):
+        model.stock().add('Мука', 'Materials', 1000, 'kg')
+        model.products().add('Хлеб', 100, [{'name': 'Мука', 'quantity': 0.5}])
+        model.products().add('Булка', 40, [{'name': 'Мука', 'quantity': 0.1}])
+        self.bread = model.products().by_name('Хлеб')
+        self.bun = model.products().by_name('Булка')
+
+        model.expense_types().add('Аренда', 500, 'Utilities')
+        model.expense_types().add('Дрожжи', 10, 'Materials')
+        self.rent = model.expense_types().get('Аренда')
+        self.yeast = model.expense_types().get('Дрожжи')
+        self.landlord = model.suppliers().add('Арендодатель')
+        self.mill = model.suppliers().add('Мельница')
+
+    def sell_on(self, model: SQLiteModel, name: str, price: int, quantity: float, discount: int, date: str):
+        sale, = model.sales().add_basket([{'name': name, 'price': price, 'quantity': quantity, 'discount': discount}])
+        model._conn.execute(
+            "UPDATE sales SET date = ?, date_ts = CAST(strftime('%s', ?) AS INTEGER) WHERE id = ?",
+            (date, date, sale.id)
+        )
+        model._conn.commit()
+
+    def spend(self, model: SQLiteModel, date: str, supplier_id: int, lines: list):
+        items = [{'expense_type_id': t.id, 'quantity': q, 'price_per_unit': p, 'unit_id': 1} for t, q, p in lines]
+        model.expense_documents().add(date, supplier_id, sum(q * p for _, q, p in lines), '', items)
+
+    def test_revenue_by_day_and_product(self, model: SQLiteModel):
+        self.sell_on(model, 'Хлеб', 100, 2, 10, '2026-01-10 09:00')
+        self.sell_on(model, 'Булка', 40, 5, 0, '2026-01-10 12:00')
+        self.sell_on(model, 'Хлеб', 100, 1, 0, '2026-01-12 18:00')
+
+        report = model.reports().timeseries('revenue', 'day')
+        assert report['buckets'] == ['2026-01-10', '2026-01-12']
+        assert report['series'] == [{'key': None, 'name': 'total', 'values': [380.0, 100.0]}]
+
+        report = model.reports().timeseries('revenue', 'day', group_by='product')
+        assert report['series'] == [
+            {'key': self.bread.id, 'name': 'Хлеб', 'values': [180.0, 100.0]},
+            {'key': self.bun.id, 'name': 'Булка', 'values': [200.0, 0.0]},
+        ]
+
+    def test_week_and_month_buckets(self, model: SQLiteModel):
+        # 2026-01-04 - воскресенье, 2026-01-05 - понедельник
+        self.sell_on(model, 'Хлеб', 100, 1, 0, '2026-01-04 10:00')
+        self.sell_on(model, 'Хлеб', 100, 1, 0, '2026-01-05 10:00')
+        self.sell_on(model, 'Хлеб', 100, 1, 0, '2026-01-11 10:00')
+        self.sell_on(model, 'Хлеб', 100, 1, 0, '2026-02-01 10:00')
+
+        weeks = model.reports().timeseries('revenue', 'week')
+        assert weeks['buckets'] == ['2025-12-29', '2026-01-05', '2026-01-26']
+        assert weeks['series'][0]['values'] == [100.0, 200.0, 100.0]
+
+        months = model.reports().timeseries('revenue', 'month')
+        assert months['buckets'] == ['2026-01-01', '2026-02-01']
+        assert months['series'][0]['values'] == [300.0, 100.0]
+
+    def test_date_range_is_inclusive(self, model: SQLiteModel):
+        self.sell_on(model, 'Хлеб', 100, 1, 0, '2026-01-09 23:00')
+        self.sell_on(model, 'Хлеб', 100, 2, 0, '2026-01-10 00:30')
+        self.sell_on(model, 'Хлеб', 100, 3, 0, '2026-01-11 23:59')
+        self.sell_on(model, 'Хлеб', 100, 4, 0, '2026-01-12 00:00')
+        self.spend(model, '2026-01-10', self.landlord.id, [(self.rent, 1, 500)])
+        self.spend(model, '2026-01-12 08:00', self.landlord.id, [(self.rent, 1, 700)])
+
+        revenue = model.reports().timeseries('revenue', 'month', '2026-01-10', '2026-01-11')
+        assert revenue['series'][0]['values'] == [500.0]
+
+        expenses = model.reports().timeseries('expenses', 'day', '2026-01-10', '2026-01-11')
+        assert expenses['buckets'] == ['2026-01-10']
+        assert expenses['series'][0]['values'] == [500.0]
+
+    def test_expenses_by_supplier_and_category(self, model: SQLiteModel):
+        self.spend(model, '2026-01-10 09:00', self.landlord.id, [(self.rent, 1, 500)])
+        self.spend(model, '2026-01-10 10:00', self.mill.id, [(self.yeast, 3, 10), (self.rent, 1, 50)])
+        self.spend(model, '2026-02-03 10:00', self.mill.id, [(self.yeast, 2, 10)])
+
+        total = model.reports().timeseries('expenses', 'month')
+        assert total['buckets'] == ['2026-01-01', '2026-02-01']
+        assert total['series'][0]['values'] == [580.0, 20.0]
+
+        suppliers = model.reports().timeseries('expenses', 'month', group_by='supplier')
+        assert [(s['name'], s['values']) for s in suppliers['series']] == [
+            ('Арендодатель', [500.0, 0.0]),
+            ('Мельница', [80.0, 20.0]),
+        ]
+
+        categories = model.reports().timeseries('expenses', 'month', group_by='category')
+        values = {s['name']: s['values'] for s in categories['series']}
+        assert values == {'Utilities': [550.0, 0.0], 'Materials': [30.0, 20.0]}
+
+    def test_empty_period(self, model: SQLiteModel):
+        report = model.reports().timeseries('expenses', 'week', '2030-01-01', '2030-12-31')
+        assert report == {'metric': 'expenses', 'bucket': 'week', 'group_by': None, 'buckets': [], 'series': []}
+
+    @pytest.mark.parametrize("kwargs", [
+        {'metric': 'profit'},
+        {'bucket': 'year'},
+        {'metric': 'revenue', 'group_by': 'supplier'},
+        {'metric': 'expenses', 'group_by': 'product'},
+        {'date_from': '10.01.2026'},
+    ])
+    def test_invalid_arguments(self, model: SQLiteModel, kwargs: dict):
+        with pytest.raises(ValueError):
+            model.reports().timeseries(**kwargs)
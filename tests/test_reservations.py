@@ -0,0 +1,91 @@
+import pytest
+
+from tests.core import SQLiteModel, conn, model
+from sql_model.database import create_connection
+from sql_model.migrations import MIGRATIONS, migrate
+
+
+class TestStockReservations:
+
+    @pytest.fixture(autouse=True)
+    def setup_data(self, model: SQLiteModel):
+        model.stock().add('Мука', 'Materials', 10, 'kg')
+        model.stock().add('Соль', 'Materials', 1, 'kg')
+        model.products().add('Хлеб', 100, [{'name': 'Мука', 'quantity': 0.5}, {'name': 'Соль', 'quantity': 0.1}])
+        self.bread = model.products().by_name('Хлеб')
+
+    def reserved(self, model: SQLiteModel, name: str) -> float:
+        return model.stock().get(name).reserved
+
+    def test_pending_order_reserves_stock(self, model: SQLiteModel):
+        model.orders().add([{'product_id': self.bread.id, 'quantity': 4}])
+
+        assert self.reserved(model, 'Мука') == pytest.approx(2)
+        assert self.reserved(model, 'Соль') == pytest.approx(0.4)
+        flour = next(i for i in model.stock().listing() if i['name'] == 'Мука')
+        assert flour['quantity'] == 10
+        assert flour['available'] == pytest.approx(8)
+
+    def test_completion_releases_reservation(self, model: SQLiteModel):
+        order = model.orders().add([{'product_id': self.bread.id, 'quantity': 4}])
+        model.orders().complete(order.id)
+
+        assert self.reserved(model, 'Мука') == 0
+        assert model.stock().get('Мука').quantity == pytest.approx(8)
+
+    def test_batch_completion_releases_only_served_orders(self, model: SQLiteModel):
+        served = model.orders().add([{'product_id': self.bread.id, 'quantity': 6}])
+        short = model.orders().add([{'product_id': self.bread.id, 'quantity': 6}])
+
+        results = model.orders().complete_many([served.id, short.id])
+
+        assert [r['completed'] for r in results] == [True, False]
+        assert self.reserved(model, 'Мука') == pytest.approx(3)
+
+    def test_delete_and_status_changes_keep_reservation_in_step(self, model: SQLiteModel):
+        order = model.orders().add([{'product_id': self.bread.id, 'quantity': 2}])
+        model.orders().update_status(order.id, 'completed')
+        assert self.reserved(model, 'Мука') == 0
+        model.orders().update_status(order.id, 'pending')
+        assert self.reserved(model, 'Мука') == pytest.approx(1)
+        model.orders().delete(order.id)
+        assert self.reserved(model, 'Мука') == 0
+
+    def test_availability_counts_other_pending_orders(self, model: SQLiteModel):
+        model.orders().add([{'product_id': self.bread.id, 'quantity': 8}])  # 0.8 соли в резерве
+
+        lines = model.orders().availability([{'product_id': self.bread.id, 'quantity': 4}])
+
+        salt = next(line for line in lines if line['name'] == 'Соль')
+        assert salt['available'] == pytest.approx(0.2)
+        assert salt['required'] == pytest.approx(0.4)
+
+    def test_order_entry_does_not_read_other_orders(self, model: SQLiteModel):
+        for _ in range(20):
+            model.orders().add([{'product_id': self.bread.id, 'quantity': 0.1}])
+
+        statements = []
+        model._conn.raw.set_trace_callback(statements.append)
+        try:
+            model.orders().add([{'product_id': self.bread.id, 'quantity': 1}])
+        finally:
+            model._conn.raw.set_trace_callback(None)
+
+        assert not [s for s in statements if 'FROM order_items' in s or 'FROM order_reservations' in s]
+
+    def test_migration_reserves_existing_pending_orders(self):
+        conn = create_connection(':memory:')
+        migrate(conn, [m for m in MIGRATIONS if m.version < 7])
+        conn.execute("INSERT INTO stock (name, category_id, quantity, unit_id) VALUES ('Мука', 1, 10, 1)")
+        conn.execute("INSERT INTO products (name, price) VALUES ('Хлеб', 100)")
+        conn.execute("INSERT INTO product_stock (product_id, stock_id, quantity) VALUES (1, 1, 0.5)")
+        conn.execute("INSERT INTO orders (created_date, status) VALUES ('2026-01-01 10:00', 'pending')")
+        conn.execute("INSERT INTO orders (created_date, status) VALUES ('2026-01-01 11:00', 'completed')")
+        conn.execute("INSERT INTO order_items (order_id, product_id, product_name, quantity, price) VALUES (1, 1, 'Хлеб', 4, 100)")
+        conn.execute("INSERT INTO order_items (order_id, product_id, product_name, quantity, price) VALUES (2, 1, 'Хлеб', 6, 100)")
+        conn.commit()
+
+        migrate(conn)
+
+        assert conn.execute("SELECT reserved FROM stock WHERE id = 1").fetchone()[0] == pytest.approx(2)
+        conn.close()
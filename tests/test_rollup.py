@@ -0,0 +1,110 @@
+import pytest
+
+from tests.core import SQLiteModel, conn, model
+from sql_model.database import create_connection
+from sql_model.migrations import MIGRATIONS, migrate
+
+
+def summary(model: SQLiteModel) -> list:
+    rows = model._conn.execute(
+        "SELECT day, product_id, units, gross_revenue, revenue, sales_count FROM daily_sales_summary ORDER BY day, product_id"
+    ).fetchall()
+    return [tuple(row) for row in rows]
+
+
+class TestDailySalesSummary:
+
+    @pytest.fixture(autouse=True)
+    def setup_data(self, model: SQLiteModel):
+        model.stock().add('Мука', 'Materials', 1000, 'kg')
+        model.products().add('Хлеб', 100, [{'name': 'Мука', 'quantity': 0.5}])
+        model.products().add('Булка', 40, [{'name': 'Мука', 'quantity': 0.1}])
+        self.bread = model.products().by_name('Хлеб')
+        self.bun = model.products().by_name('Булка')
+
+    def sell_on(self, model: SQLiteModel, name: str, price: int, quantity: float, discount: int, date: str):
+        """Продажа с заданной датой (add() всегда ставит текущее время)."""
+        sale, = model.sales().add_basket([{'name': name, 'price': price, 'quantity': quantity, 'discount': discount}])
+        model._conn.execute(
+            "UPDATE sales SET date = ?, date_ts = CAST(strftime('%s', ?) AS INTEGER) WHERE id = ?",
+            (date, date, sale.id)
+        )
+        model._conn.commit()
+        return sale
+
+    def test_triggers_follow_inserts_updates_and_deletes(self, model: SQLiteModel):
+        self.sell_on(model, 'Хлеб', 100, 2, 10, '2026-01-10 09:00')
+        self.sell_on(model, 'Хлеб', 100, 1, 0, '2026-01-10 18:00')
+        bun = self.sell_on(model, 'Булка', 40, 5, 0, '2026-01-11 08:00')
+
+        assert summary(model) == [
+            ('2026-01-10', self.bread.id, 3.0, 300.0, 280.0, 2),
+            ('2026-01-11', self.bun.id, 5.0, 200.0, 200.0, 1),
+        ]
+
+        model._conn.execute("DELETE FROM sales WHERE id = ?", (bun.id,))
+        model._conn.commit()
+        assert [row[0] for row in summary(model)] == ['2026-01-10']
+
+    def test_rebuild_matches_triggers(self, model: SQLiteModel):
+        for day in range(1, 6):
+            self.sell_on(model, 'Хлеб', 100, day, day, f'2026-02-0{day} 10:00')
+            self.sell_on(model, 'Булка', 40, 1, 0, f'2026-02-0{day} 11:00')
+        maintained = summary(model)
+
+        model._conn.execute("DELETE FROM daily_sales_summary")
+        assert model.sales().rebuild_summary() == 10
+        assert summary(model) == maintained
+
+    def test_revenue_queries_read_the_rollup(self, model: SQLiteModel):
+        self.sell_on(model, 'Хлеб', 100, 2, 50, '2026-03-01 10:00')
+        self.sell_on(model, 'Булка', 40, 3, 0, '2026-03-02 10:00')
+
+        statements = []
+        model._conn.raw.set_trace_callback(statements.append)
+        try:
+            income = model.calculate_income()
+            revenue = model.sales().revenue_by_day('2026-03-01', '2026-03-31')
+            by_product = {row['product_name']: row['total_price'] for row in model.sales().salesByProduct()}
+        finally:
+            model._conn.raw.set_trace_callback(None)
+
+        assert income == 220.0
+        assert revenue == {'2026-03-01': 100.0, '2026-03-02': 120.0}
+        assert by_product == {'Хлеб': 200.0, 'Булка': 120.0}
+        assert not [s for s in statements if 'FROM sales' in s]
+
+    def test_net_amount_is_filled_and_kept_current(self, model: SQLiteModel):
+        sale = self.sell_on(model, 'Хлеб', 100, 3, 10, '2026-04-01 10:00')
+        assert sale.net_amount == pytest.approx(270)
+
+        model._conn.execute("UPDATE sales SET discount = 50 WHERE id = ?", (sale.id,))
+        model._conn.commit()
+        assert model.sales().data()[0].net_amount == pytest.approx(150)
+        assert summary(model) == [('2026-04-01', self.bread.id, 3.0, 300.0, 150.0, 1)]
+
+    def test_revenue_for_partial_days(self, model: SQLiteModel):
+        self.sell_on(model, 'Хлеб', 100, 1, 0, '2026-05-01 08:00')
+        self.sell_on(model, 'Хлеб', 100, 2, 0, '2026-05-01 14:00')
+        self.sell_on(model, 'Булка', 40, 1, 50, '2026-05-02 09:00')
+
+        assert model.sales().revenue('2026-05-01 12:00', '2026-05-02') == pytest.approx(220)
+        assert model.sales().revenue(date_to='2026-05-01 08:00') == pytest.approx(100)
+        assert model.sales().revenue('2027-01-01') == 0.0
+
+
+def test_migration_fills_net_amount_of_existing_sales():
+    conn = create_connection(':memory:')
+    migrate(conn, [m for m in MIGRATIONS if m.version < 9])
+    conn.execute("INSERT INTO products (name, price) VALUES ('Хлеб', 100)")
+    conn.execute(
+        "INSERT INTO sales (product_id, product_name, price, quantity, discount, date, date_ts) "
+        "VALUES (1, 'Хлеб', 100, 2, 25, '2026-01-01 10:00', 1767261600)"
+    )
+    conn.commit()
+
+    migrate(conn)
+
+    assert conn.execute("SELECT net_amount FROM sales").fetchone()[0] == 150
+    assert conn.execute("SELECT revenue FROM daily_sales_summary").fetchone()[0] == 150
+    conn.close()
@@ -48,6 +48,121 @@ class TestSalesRepository:
         
         data = repo.data()
         assert len(data) == 2
-        assert data[0].quantity == 1.0
-        assert data[1].discount == 10
+        # Сначала новые, в том числе внутри одной минуты
+        assert data[0].quantity == 2.0
+        assert data[0].discount == 10
         assert data[1].product_name == 'Булочка'
+
+    def _sell_on(self, model: SQLiteModel, date: str, quantity: float = 1.0):
+        """Продажа с заданной датой (add() всегда ставит текущее время)."""
+        model.sales().add(name='Булочка', price=80, quantity=quantity, discount=0)
+        model._conn.execute(
+            "UPDATE sales SET date = ?, date_ts = CAST(strftime('%s', ?) AS INTEGER) "
+            "WHERE id = (SELECT MAX(id) FROM sales)",
+            (date, date)
+        )
+
+    def test_add_sets_date_ts(self, model: SQLiteModel):
+        model.sales().add(name='Булочка', price=80, quantity=1.0, discount=0)
+        row = model._conn.execute("SELECT date, CAST(strftime('%s', date) AS INTEGER) AS ts, date_ts FROM sales").fetchone()
+        assert row['date_ts'] == row['ts']
+
+    def test_query_by_date_range(self, model: SQLiteModel):
+        self._sell_on(model, '2026-01-10 09:00', 1.0)
+        self._sell_on(model, '2026-01-31 23:59', 2.0)
+        self._sell_on(model, '2026-02-01 00:00', 3.0)
+
+        repo = model.sales()
+        january = repo.query(date_from='2026-01-01', date_to='2026-01-31')
+        assert [s.quantity for s in january] == [2.0, 1.0]
+        assert [s.quantity for s in repo.query(date_from='2026-01-31 23:59', order='asc')] == [2.0, 3.0]
+        assert [s.quantity for s in repo.query(order='asc', limit=2)] == [1.0, 2.0]
+
+    def test_query_by_product(self, model: SQLiteModel):
+        model.products().add(name='Багет', price=100, materials=[{'name': 'Мука', 'quantity': 0.5}])
+        model.sales().add(name='Булочка', price=80, quantity=1.0, discount=0)
+        model.sales().add(name='Багет', price=100, quantity=2.0, discount=0)
+
+        baguette = model.products().by_name('Багет')
+        assert [s.product_name for s in model.sales().query(product_id=baguette.id)] == ['Багет']
+        assert [s.product_name for s in model.sales().query(product='Бул')] == ['Булочка']
+        assert model.sales().query(product='Торт') == []
+
+    def test_query_rejects_bad_arguments(self, model: SQLiteModel):
+        with pytest.raises(ValueError):
+            model.sales().query(date_from='31.01.2026')
+        with pytest.raises(ValueError):
+            model.sales().query(order='random')
+
+    def test_search_by_date_prefix_and_name(self, model: SQLiteModel):
+        self._sell_on(model, '2025-12-31 18:00', 1.0)
+        self._sell_on(model, '2026-01-15 10:00', 2.0)
+
+        repo = model.sales()
+        assert [s.quantity for s in repo.search('2026-01')] == [2.0]
+        assert [s.quantity for s in repo.search('2025')] == [1.0]
+        assert len(repo.search('Булоч')) == 2
+
+    def test_search_finds_sales_of_renamed_product(self, model: SQLiteModel):
+        model.sales().add(name='Булочка', price=80, quantity=1.0, discount=0)
+        bun = model.products().by_name('Булочка')
+        model.products().update(bun.id, 'Плюшка', 80, [{'name': 'Мука', 'quantity': 0.1}])
+        model.sales().add(name='Плюшка', price=80, quantity=2.0, discount=0)
+
+        repo = model.sales()
+        # Список показывает название на момент продажи, поиск находит по нему
+        assert [s.product_name for s in repo.search('Булоч')] == ['Булочка']
+        # Текущее название находит все продажи продукта
+        assert [s.quantity for s in repo.search('Плюш')] == [2.0, 1.0]
+        assert [s.quantity for s in repo.query(product_id=bun.id, product='Булоч')] == [1.0]
+        assert repo.query(product_id=bun.id + 1, product='Булоч') == []
+
+    def test_search_finds_sales_of_deleted_product(self, model: SQLiteModel):
+        model.sales().add(name='Булочка', price=80, quantity=1.0, discount=0)
+        # Удаление в обход репозитория (проданный продукт он удалить не даст)
+        model._conn.execute("DELETE FROM product_stock")
+        model._conn.execute("DELETE FROM products WHERE name = 'Булочка'")
+        model._conn.commit()
+        assert [s.product_name for s in model.sales().search('Булоч')] == ['Булочка']
+
+    def test_add_many_returns_created_rows(self, model: SQLiteModel, monkeypatch):
+        import repositories.sales as sales_module
+        monkeypatch.setattr(sales_module, 'INSERT_BATCH_SIZE', 2)
+        bun = model.products().by_name('Булочка')
+
+        statements = []
+        model._conn.raw.set_trace_callback(statements.append)
+        sales = model.sales().add_many([{'product_id': bun.id, 'quantity': 1, 'discount': n} for n in range(5)])
+        model._conn.raw.set_trace_callback(None)
+
+        assert [s.discount for s in sales] == [0, 1, 2, 3, 4]
+        assert [s.id for s in sales] == sorted(s.id for s in model.sales().data())
+        assert all(s.price == 80 and s.date_ts for s in sales)
+        assert model.stock().get('Мука').quantity == 7.5
+        # Одно списание склада и три многострочные вставки по 2 строки
+        assert len([s for s in statements if 'UPDATE stock' in s]) == 1
+        # Триггер дневной сводки повторяет вставку в трассировке: считаем уникальные
+        assert len({s for s in statements if 'INSERT INTO sales' in s}) == 3
+        assert not [s for s in statements if 'SELECT' in s and 'FROM sales' in s]
+
+    def test_add_many_reports_all_bad_lines(self, model: SQLiteModel):
+        bun = model.products().by_name('Булочка')
+        with pytest.raises(ValueError, match="строка 2.*строка 3"):
+            model.sales().add_many([
+                {'product_id': bun.id, 'quantity': 1},
+                {'product_id': 12345, 'quantity': 1},
+                {'product_id': bun.id, 'quantity': 0},
+            ])
+        assert model.sales().empty()
+
+    def test_revenue_by_day(self, model: SQLiteModel):
+        self._sell_on(model, '2026-01-09 23:59', 1.0)
+        self._sell_on(model, '2026-01-10 09:00', 1.0)
+        self._sell_on(model, '2026-01-10 18:00', 2.0)
+        model._conn.execute("UPDATE sales SET discount = 50 WHERE id = (SELECT MAX(id) FROM sales)")
+        self._sell_on(model, '2026-01-12 00:00', 1.0)
+        self._sell_on(model, '2026-01-13 00:00', 5.0)
+
+        revenue = model.sales().revenue_by_day('2026-01-10', '2026-01-12')
+        assert revenue == {'2026-01-10': 160.0, '2026-01-12': 80.0}
+        assert model.sales().revenue_by_day('2025-01-01', '2025-01-07') == {}
@@ -92,3 +92,28 @@ class TestStockRepository:
         # Проверяем, что количество не изменилось (rollback)
         item_after_fail = model.stock().get('Мука')
         assert item_after_fail.quantity == 10.0
+
+    def test_listing_resolves_names(self, model: SQLiteModel):
+        model.stock().add('Мука', 'Materials', 10, 'kg')
+        model.stock().add('Коробка', 'Packaging', 5, 'pc')
+
+        statements = []
+        model._conn.raw.set_trace_callback(statements.append)
+        items = model.stock().listing()
+        model._conn.raw.set_trace_callback(None)
+
+        assert len(statements) == 1
+        assert [(i['name'], i['category_name'], i['unit_name']) for i in items] == [
+            ('Мука', 'Materials', 'kg'), ('Коробка', 'Packaging', 'pc')
+        ]
+
+    def test_listing_filters(self, model: SQLiteModel):
+        model.stock().add('Мука пшеничная', 'Materials', 10, 'kg')
+        model.stock().add('Мука ржаная', 'Materials', 10, 'kg')
+        model.stock().add('Коробка', 'Packaging', 5, 'pc')
+
+        repo = model.stock()
+        assert [i['name'] for i in repo.listing(search='мука')] == ['Мука пшеничная', 'Мука ржаная']
+        assert [i['name'] for i in repo.listing(category='Packaging')] == ['Коробка']
+        assert [i['name'] for i in repo.listing(search='МУКА', limit=1)] == ['Мука пшеничная']
+        assert repo.listing(search='мука', category='Packaging') == []
@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from tests.core import SQLiteModel, conn, model
+from repositories.stock import InsufficientStockError
+
+
+def stock_writes(model: SQLiteModel, action) -> list:
+    """Выполняет action и возвращает выполненные UPDATE склада."""
+    statements = []
+    model._conn.raw.set_trace_callback(statements.append)
+    try:
+        action()
+    finally:
+        model._conn.raw.set_trace_callback(None)
+    return [s for s in statements if 'UPDATE stock' in s]
+
+
+class TestStockDeduction:
+
+    @pytest.fixture(autouse=True)
+    def setup_data(self, model: SQLiteModel):
+        for name, quantity in (('Мука', 10), ('Соль', 1), ('Сахар', 2), ('Масло', 5)):
+            model.stock().add(name, 'Materials', quantity, 'kg')
+        model.products().add('Хлеб', 100, [{'name': 'Мука', 'quantity': 1}, {'name': 'Соль', 'quantity': 0.1}])
+        model.products().add('Булка', 80, [{'name': 'Мука', 'quantity': 0.5}, {'name': 'Сахар', 'quantity': 0.5},
+                                           {'name': 'Масло', 'quantity': 0.2}])
+
+    def test_basket_is_one_update(self, model: SQLiteModel):
+        basket = [
+            {'name': 'Хлеб', 'price': 100, 'quantity': 2},
+            {'name': 'Булка', 'price': 80, 'quantity': 2},
+            {'name': 'Хлеб', 'price': 100, 'quantity': 1},
+        ]
+        assert len(stock_writes(model, lambda: model.sales().add_basket(basket))) == 1
+        assert model.sales().len() == 3
+        assert model.stock().get('Мука').quantity == 6
+        assert model.stock().get('Соль').quantity == pytest.approx(0.7)
+        assert model.stock().get('Сахар').quantity == 1
+
+    def test_reports_every_short_ingredient(self, model: SQLiteModel):
+        with pytest.raises(InsufficientStockError) as excinfo:
+            model.sales().add_basket([
+                {'name': 'Хлеб', 'price': 100, 'quantity': 12},
+                {'name': 'Булка', 'price': 80, 'quantity': 6},
+            ])
+        assert [s[0] for s in excinfo.value.shortages] == ['Мука', 'Соль', 'Сахар']
+        assert "Недостаточно запаса для 'Сахар'. Требуется списание 3.00, текущий остаток 2.00." in str(excinfo.value)
+        # Масло хватало, но частичное списание откатано
+        assert model.stock().get('Масло').quantity == 5
+        assert model.stock().get('Мука').quantity == 10
+        assert model.sales().len() == 0
+
+    def test_exact_float_demand(self, model: SQLiteModel):
+        model.stock().set('Соль', 0.3)
+        model.sales().add('Хлеб', 100, 3, 0)  # 3 * 0.1 без погрешности float
+        assert model.stock().get('Соль').quantity == pytest.approx(0)
+
+    def test_product_writeoff_lists_shortages(self, model: SQLiteModel):
+        with pytest.raises(ValueError, match="Не хватает ингредиента") as excinfo:
+            model.writeoffs().add('Хлеб', 'product', 20, 'Брак')
+        assert {s[0] for s in excinfo.value.shortages} == {'Мука', 'Соль'}
+        assert model.writeoffs().len() == 0
+
+
+def test_concurrent_sellers_do_not_lose_updates(tmp_path):
+    """Два процесса-продавца на одном файле: списано ровно столько, сколько продано."""
+    db_file = str(tmp_path / "concurrent.db")
+    setup = SQLiteModel(db_file)
+    setup.stock().add('Мука', 'Materials', 30, 'kg')
+    setup.products().add('Хлеб', 100, [{'name': 'Мука', 'quantity': 1}])
+    setup.close()
+
+    sold, failed = [], []
+
+    def seller():
+        model = SQLiteModel(db_file)
+        try:
+            for _ in range(20):
+                try:
+                    model.sales().add('Хлеб', 100, 1, 0)
+                    sold.append(1)
+                except InsufficientStockError:
+                    failed.append(1)
+        finally:
+            model.close()
+
+    threads = [threading.Thread(target=seller) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    check = SQLiteModel(db_file)
+    try:
+        assert len(sold) == 30 and len(failed) == 10
+        assert check.sales().len() == 30
+        assert check.stock().get('Мука').quantity == 0
+    finally:
+        check.close()
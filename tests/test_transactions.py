@@ -0,0 +1,111 @@
+import pytest
+
+from tests.core import SQLiteModel, conn, model
+
+
+def count_commits(model: SQLiteModel, action) -> int:
+    """Выполняет action и возвращает число фиксаций транзакций."""
+    statements = []
+    model._conn.raw.set_trace_callback(statements.append)
+    try:
+        action()
+    finally:
+        model._conn.raw.set_trace_callback(None)
+    return sum(1 for s in statements if s.strip().upper() == 'COMMIT')
+
+
+class TestUnitOfWork:
+
+    @pytest.fixture(autouse=True)
+    def setup_data(self, model: SQLiteModel):
+        model.stock().add('Мука', 'Materials', 10, 'kg')
+        model.stock().add('Соль', 'Materials', 2, 'kg')
+        model.products().add('Хлеб', 100, [{'name': 'Мука', 'quantity': 1}, {'name': 'Соль', 'quantity': 0.1}])
+        model.products().add('Соленый хлеб', 120, [{'name': 'Мука', 'quantity': 1}, {'name': 'Соль', 'quantity': 1}])
+        self.bread = model.products().by_name('Хлеб')
+        self.salty = model.products().by_name('Соленый хлеб')
+        self.supplier = model.suppliers().add('Поставщик')
+
+    def test_sale_commits_once(self, model: SQLiteModel):
+        assert count_commits(model, lambda: model.sales().add('Хлеб', 100, 2, 0)) == 1
+        assert model.stock().get('Мука').quantity == 8
+
+    def test_writeoff_commits_once(self, model: SQLiteModel):
+        assert count_commits(model, lambda: model.writeoffs().add('Хлеб', 'product', 1, 'Брак')) == 1
+        assert model.stock().get('Соль').quantity == pytest.approx(1.9)
+
+    def test_expense_document_commits_once(self, model: SQLiteModel):
+        flour = model.expense_types().get('Мука')
+        items = [{'expense_type_id': flour.id, 'quantity': 5, 'price_per_unit': 10, 'unit_id': 1}] * 3
+        doc_ids = []
+        add = lambda: doc_ids.append(model.expense_documents().add('2026-01-01 10:00', self.supplier.id, 150, '', items))
+        assert count_commits(model, add) == 1
+        assert len(model.expense_documents().get_document_items(doc_ids[0])) == 3
+
+    def test_order_completion_commits_once(self, model: SQLiteModel):
+        order = model.orders().add([
+            {'product_id': self.bread.id, 'quantity': 2},
+            {'product_id': self.salty.id, 'quantity': 1},
+        ])
+        assert count_commits(model, lambda: model.orders().complete(order.id)) == 1
+        assert model.sales().len() == 2
+        assert model.orders().by_id(order.id).status == 'completed'
+
+    def test_failed_order_completion_leaves_no_trace(self, model: SQLiteModel):
+        # Первая строка проходит, на второй не хватает соли
+        order = model.orders().add([
+            {'product_id': self.bread.id, 'quantity': 2},
+            {'product_id': self.salty.id, 'quantity': 2},
+        ])
+        with pytest.raises(ValueError):
+            model.orders().complete(order.id)
+
+        assert model.sales().len() == 0
+        assert model.stock().get('Мука').quantity == 10
+        assert model.stock().get('Соль').quantity == 2
+        assert model.orders().by_id(order.id).status == 'pending'
+        assert not model._conn.in_transaction
+
+    def test_model_transaction_spans_repositories(self, model: SQLiteModel):
+        def work():
+            with model.transaction():
+                model.sales().add('Хлеб', 100, 1, 0)
+                model.writeoffs().add('Мука', 'stock', 1, 'Брак')
+        assert count_commits(model, work) == 1
+        assert model.stock().get('Мука').quantity == 8
+
+    def test_outer_failure_rolls_back_everything(self, model: SQLiteModel):
+        with pytest.raises(RuntimeError):
+            with model.transaction():
+                model.sales().add('Хлеб', 100, 1, 0)
+                raise RuntimeError("сбой")
+        assert model.sales().len() == 0
+        assert model.stock().get('Мука').quantity == 10
+
+    def test_nested_failure_rolls_back_to_savepoint(self, model: SQLiteModel):
+        with model.transaction():
+            model.sales().add('Хлеб', 100, 1, 0)
+            with pytest.raises(ValueError):
+                model.sales().add('Соленый хлеб', 120, 5, 0)
+            model.sales().add('Хлеб', 100, 1, 0)
+        assert model.sales().len() == 2
+        assert model.stock().get('Мука').quantity == 8
+        assert model.stock().get('Соль').quantity == pytest.approx(1.8)
+
+    def test_after_commit_waits_for_outer_commit(self, model: SQLiteModel):
+        done = []
+        with model.transaction():
+            model._conn.after_commit(lambda: done.append('outer'))
+            with pytest.raises(ValueError):
+                with model.transaction():
+                    model._conn.after_commit(lambda: done.append('failed'))
+                    raise ValueError("сбой")
+            assert done == []
+        assert done == ['outer']
+
+        with pytest.raises(RuntimeError):
+            with model.transaction():
+                model._conn.after_commit(lambda: done.append('rolled back'))
+                raise RuntimeError("сбой")
+        model._conn.after_commit(lambda: done.append('now'))
+        assert done == ['outer', 'now']
@@ -247,9 +247,41 @@ class TestWriteOffsRepository:
         assert len(all_write_offs) == 2
         
         # Проверяем, что первый элемент (самый новый, т.к. ORDER BY date DESC) - это Мука
-        assert all_write_offs[1].quantity == 1.0
-        assert all_write_offs[1].product_id is None # Мука - Materials, product_id пуст
+        assert all_write_offs[0].quantity == 1.0
+        assert all_write_offs[0].product_id is None # Мука - Materials, product_id пуст
         
         # Проверяем, что второй элемент - это Круассан
-        assert all_write_offs[0].quantity == 2.0
-        assert all_write_offs[0].product_id == write_off_data['croissant_id'] # Круассан - продукт, product_id заполнен
+        assert all_write_offs[1].quantity == 2.0
+        assert all_write_offs[1].product_id == write_off_data['croissant_id'] # Круассан - продукт, product_id заполнен
+
+    def test_journal_resolves_names(self, write_off_data: dict):
+        """Журнал подставляет названия и единицы одним запросом."""
+        model = write_off_data['model']
+        w_repo = model.writeoffs()
+        w_repo.add("Круассан", "product", 2.0, "Брак")
+        w_repo.add("Мука", "stock", 1.0, "Просрочка")
+
+        statements = []
+        model._conn.raw.set_trace_callback(statements.append)
+        journal = w_repo.journal()
+        model._conn.raw.set_trace_callback(None)
+
+        assert len(statements) == 1
+        assert [(r['item_name'], r['item_type'], r['unit_name']) for r in journal] == [
+            ("Мука", "stock", "kg"), ("Круассан", "product", None)
+        ]
+
+    def test_journal_filters(self, write_off_data: dict):
+        model = write_off_data['model']
+        w_repo = model.writeoffs()
+        for date, reason in [('2026-01-10 09:00', 'Брак'), ('2026-01-31 18:00', 'Просрочка'), ('2026-02-01 08:00', 'брак партии')]:
+            w_repo.add("Мука", "stock", 1.0, reason)
+            model._conn.execute("UPDATE writeoffs SET date = ? WHERE id = (SELECT MAX(id) FROM writeoffs)", (date,))
+
+        january = w_repo.journal(date_from='2026-01-01', date_to='2026-01-31')
+        assert [r['reason'] for r in january] == ['Просрочка', 'Брак']
+        assert [r['reason'] for r in w_repo.journal(reason='БРАК')] == ['брак партии', 'Брак']
+
+        first = w_repo.journal(limit=1)
+        rest = w_repo.journal(after=f"{first[0]['id']}:{first[0]['date']}")
+        assert [r['id'] for r in first + rest] == [r['id'] for r in w_repo.journal()]
@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from sql_model.database import create_connection, initialize_db
+from sql_model.model import SQLiteModel
+from sql_model.writer import WriteExecutor
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / "writer.db")
+
+
+@pytest.fixture
+def executor(db_file):
+    conn = create_connection(db_file)
+    initialize_db(conn)
+    model = SQLiteModel(db_file, conn=conn)
+    # Широкое окно, чтобы параллельные операции гарантированно попали в одну пачку
+    executor = WriteExecutor(model, group_window=0.2)
+    executor.start()
+    yield executor
+    executor.stop()
+    model.close()
+
+
+def run_concurrently(executor: WriteExecutor, operations):
+    """Ставит операции в очередь одновременно и возвращает их Future."""
+    futures = []
+    barrier = threading.Barrier(len(operations))
+    lock = threading.Lock()
+
+    def worker(op):
+        barrier.wait()
+        future = executor.submit(op)
+        with lock:
+            futures.append(future)
+
+    threads = [threading.Thread(target=worker, args=(op,)) for op in operations]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return futures
+
+
+class TestWriteExecutor:
+
+    def test_concurrent_operations_group_committed(self, executor: WriteExecutor, db_file):
+        ops = [lambda m, i=i: m.suppliers().add(f"Поставщик {i}") for i in range(10)]
+        futures = run_concurrently(executor, ops)
+        for f in futures:
+            f.result()
+
+        stats = executor.stats()
+        assert stats['operations'] == 10
+        assert stats['batches'] < 10
+        assert stats['batch_size_max'] > 1
+
+        # Изменения видны через отдельное соединение, т.е. зафиксированы
+        other = SQLiteModel(db_file)
+        assert other.suppliers().len() == 10
+        other.close()
+
+    def test_failed_operation_does_not_affect_batch(self, executor: WriteExecutor, db_file):
+        executor.call(lambda m: m.suppliers().add("Дубликат"))
+
+        ops = [lambda m, i=i: m.suppliers().add(f"Поставщик {i}") for i in range(4)]
+        ops.append(lambda m: m.suppliers().add("Дубликат"))
+        futures = run_concurrently(executor, ops)
+
+        errors = [f.exception() for f in futures if f.exception() is not None]
+        assert len(errors) == 1
+        assert isinstance(errors[0], ValueError)
+
+        other = SQLiteModel(db_file)
+        assert other.suppliers().len() == 5
+        other.close()
+
+    def test_failed_operation_rolls_back_partial_changes(self, executor: WriteExecutor, db_file):
+        def partial(model):
+            model._conn.execute("INSERT INTO units (name) VALUES ('box')")
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            executor.call(partial)
+
+        assert 'box' not in executor.call(lambda m: m.utils().get_unit_names())
+
+    def test_proxy_model_runs_on_writer(self, executor: WriteExecutor):
+        model = executor.model()
+        model.stock().add('Мука', "Materials", 10, 'kg')
+        model.stock().update('Мука', -4)
+
+        assert model.stock().get('Мука').quantity == 6
+        with pytest.raises(ValueError):
+            model.stock().update('Мука', -100)
+        with pytest.raises(KeyError):
+            model.stock().update('Сахар', 1)
+        assert executor.stats()['failed_operations'] == 2